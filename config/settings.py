@@ -40,9 +40,72 @@ SETTINGS = {
     "BROKER": os.getenv('BROKER', 'POCKET_OPTION'),
     "TELEGRAM_ENABLED": os.getenv('TELEGRAM_ENABLED', 'True') == 'True',
     "LOG_LEVEL": os.getenv('LOG_LEVEL', 'INFO'),
-    "SECURE_MODE": os.getenv('SECURE_MODE', 'True') == 'True'
+    "SECURE_MODE": os.getenv('SECURE_MODE', 'True') == 'True',
+    "TICK_WRITE_BEHIND": os.getenv('TICK_WRITE_BEHIND', 'True') == 'True',
+    "TICK_FLUSH_ROWS": int(os.getenv('TICK_FLUSH_ROWS', 500)),
+    "TICK_FLUSH_INTERVAL": float(os.getenv('TICK_FLUSH_INTERVAL', 1.0)),
+    "TICK_QUEUE_SIZE": int(os.getenv('TICK_QUEUE_SIZE', 100000)),
+    "TICK_RETENTION_DAYS": int(os.getenv('TICK_RETENTION_DAYS', 30)),
+    "TICK_LIVE_DAYS": int(os.getenv('TICK_LIVE_DAYS', 2)),
+    "TICK_BUFFER_SIZE": int(os.getenv('TICK_BUFFER_SIZE', 4096)),
+    "CANDLE_TIMEFRAMES": [int(tf) for tf in os.getenv('CANDLE_TIMEFRAMES', '60').split(',')],
+    "CANDLE_HISTORY": int(os.getenv('CANDLE_HISTORY', 500)),
+    "CANDLE_CLOSE_GRACE": float(os.getenv('CANDLE_CLOSE_GRACE', 1.0)),
+    "HISTORY_CACHE_TTL": float(os.getenv('HISTORY_CACHE_TTL', 5)),
+    "HISTORY_CACHE_BARS": int(os.getenv('HISTORY_CACHE_BARS', 1000)),
+    "HISTORY_CACHE_INSTRUMENTS": int(os.getenv('HISTORY_CACHE_INSTRUMENTS', 200)),
+    "REST_RATE_LIMIT": float(os.getenv('REST_RATE_LIMIT', 10)),
+    "REST_BURST": int(os.getenv('REST_BURST', 20)),
+    "REST_POOL_SIZE": int(os.getenv('REST_POOL_SIZE', 10)),
+    "REST_RETRIES": int(os.getenv('REST_RETRIES', 3)),
+    "REST_BACKOFF": float(os.getenv('REST_BACKOFF', 0.5)),
+    "SENTIMENT_TTL": int(os.getenv('SENTIMENT_TTL', 900)),
+    "SENTIMENT_REFRESH_AHEAD": int(os.getenv('SENTIMENT_REFRESH_AHEAD', 120)),
+    "RETRAIN_WORKERS": int(os.getenv('RETRAIN_WORKERS', 0)),
+    "RETRAIN_TIME_BUDGET": int(os.getenv('RETRAIN_TIME_BUDGET', 300)),
+    "RETRAIN_CPUS": [int(cpu) for cpu in os.getenv('RETRAIN_CPUS', '').split(',') if cpu],
+    "RETRAIN_NICE": int(os.getenv('RETRAIN_NICE', 10)),
+    "MODEL_MEMORY_BUDGET_MB": int(os.getenv('MODEL_MEMORY_BUDGET_MB', 512)),
+    "MODEL_MMAP_MODE": os.getenv('MODEL_MMAP_MODE', ''),
+    "ONLINE_BATCH_SIZE": int(os.getenv('ONLINE_BATCH_SIZE', 8)),
+    "ONLINE_REPLAY_SIZE": int(os.getenv('ONLINE_REPLAY_SIZE', 32)),
+    "ONLINE_BUFFER_SIZE": int(os.getenv('ONLINE_BUFFER_SIZE', 2000)),
+    "MODEL_CHECKPOINT_INTERVAL": int(os.getenv('MODEL_CHECKPOINT_INTERVAL', 300)),
+    "MODEL_REGISTRY_KEEP": int(os.getenv('MODEL_REGISTRY_KEEP', 5)),
+    "FEATURE_STORE_ROWS": int(os.getenv('FEATURE_STORE_ROWS', 5000)),
+    "XGB_CONTINUATION_ROUNDS": int(os.getenv('XGB_CONTINUATION_ROUNDS', 50)),
+    "XGB_EARLY_STOPPING_ROUNDS": int(os.getenv('XGB_EARLY_STOPPING_ROUNDS', 20)),
+    "FULL_REBUILD_EVERY": int(os.getenv('FULL_REBUILD_EVERY', 24)),
+    "CONTINUATION_MIN_ROWS": int(os.getenv('CONTINUATION_MIN_ROWS', 200)),
+    "DRIFT_PSI_THRESHOLD": float(os.getenv('DRIFT_PSI_THRESHOLD', 0.25)),
+    "DRIFT_WINDOW": int(os.getenv('DRIFT_WINDOW', 200)),
+    "DRIFT_ACCURACY_WINDOW": int(os.getenv('DRIFT_ACCURACY_WINDOW', 30)),
+    "DRIFT_MIN_TRADES": int(os.getenv('DRIFT_MIN_TRADES', 10)),
+    "DRIFT_ACCURACY_TOLERANCE": float(os.getenv('DRIFT_ACCURACY_TOLERANCE', 0.1)),
+    "DRIFT_SUSPEND_SCORE": float(os.getenv('DRIFT_SUSPEND_SCORE', 2.0)),
+    "RETRAIN_CYCLE_BUDGET": float(os.getenv('RETRAIN_CYCLE_BUDGET', 600)),
+    "RETRAIN_DEFAULT_COST": float(os.getenv('RETRAIN_DEFAULT_COST', 30)),
+    "SIGNAL_MODE": os.getenv('SIGNAL_MODE', 'event'),
+    "SIGNAL_WORKERS": int(os.getenv('SIGNAL_WORKERS', 2)),
+    "SIGNAL_QUEUE_SIZE": int(os.getenv('SIGNAL_QUEUE_SIZE', 256)),
+    "SIGNAL_DEBOUNCE": float(os.getenv('SIGNAL_DEBOUNCE', 2.0)),
+    "SIGNAL_TICK_THRESHOLD": float(os.getenv('SIGNAL_TICK_THRESHOLD', 0.0005)),
+    "SIGNAL_REFRESH_INTERVAL": int(os.getenv('SIGNAL_REFRESH_INTERVAL', 60)),
+    "TRADE_WORKERS": int(os.getenv('TRADE_WORKERS', 4)),
+    "TRADE_POLL_INTERVAL": float(os.getenv('TRADE_POLL_INTERVAL', 1.0)),
+    "RUNTIME": os.getenv('RUNTIME', 'threaded'),  # threaded or async
+    "ASYNC_CPU_WORKERS": int(os.getenv('ASYNC_CPU_WORKERS', 4)),
+    "SCAN_WORKERS": int(os.getenv('SCAN_WORKERS', 8)),
+    "SCAN_DEADLINE": float(os.getenv('SCAN_DEADLINE', 10.0)),  # Seconds per scan
+    "SCAN_MIN_INTERVAL": float(os.getenv('SCAN_MIN_INTERVAL', 30)),  # Hottest instruments
+    "SCAN_MAX_INTERVAL": float(os.getenv('SCAN_MAX_INTERVAL', 600)),  # Coldest instruments
+    "SCAN_VOLATILITY_TICKS": int(os.getenv('SCAN_VOLATILITY_TICKS', 300))
 }
 
+# Per-endpoint REST limits: path prefix -> (requests per second, burst).
+# Unlisted paths share one bucket at REST_RATE_LIMIT/REST_BURST.
+REST_ENDPOINT_LIMITS = {}
+
 # API Keys
 API_KEYS = {
     'NEWS_API': decrypted_secrets.get('NEWS_API_KEY', ''),
@@ -53,5 +116,9 @@ API_KEYS = {
 
 # Directories
 MODEL_DIR = "data/models/"
+MODEL_REGISTRY_DIR = "data/models/registry/"
+INDICATOR_CHECKPOINT = "data/models/indicators.json"
+FEATURE_STORE_DIR = "data/features/"
 HISTORICAL_DIR = "data/historical/"
+TICK_ARCHIVE_DIR = "data/historical/archive/"
 LOG_DIR = "data/logs/"
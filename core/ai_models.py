@@ -6,124 +6,560 @@ from sklearn.metrics import accuracy_score
 from sklearn.neural_network import MLPClassifier
 import joblib
 import os
+import time
+import copy
+import threading
+import weakref
+from collections import OrderedDict
 import xgboost as xgb
 from config import settings
+from .indicators import FEATURE_COLUMNS
+from .model_registry import ModelRegistry
+from .inference_kernels import MLPKernel, StackedMLPKernel, TreeEnsembleKernel
+from .drift_monitor import reference_profile
+from .rest_client import SingleFlight
 import logging
 
-logger = logging.getLogger(_name_)
+logger = logging.getLogger(__name__)
 
 MODEL_PATH = settings.MODEL_DIR
 
+
+def array_bytes(obj, depth=3):
+    """Bytes held in NumPy arrays reachable from an estimator's attributes"""
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if depth == 0:
+        return 0
+    if isinstance(obj, (list, tuple)):
+        return sum(array_bytes(item, depth - 1) for item in obj)
+    if isinstance(obj, dict):
+        return sum(array_bytes(item, depth - 1) for item in obj.values())
+    if hasattr(obj, '__dict__'):
+        return sum(array_bytes(item, depth - 1) for item in vars(obj).values())
+    return 0
+
+
+class ModelCache:
+    """LRU of resident estimators bounded by an approximate memory budget
+
+    Estimators are loaded from disk on first use (optionally with joblib's
+    mmap_mode, so large arrays stay in the page cache instead of the heap)
+    and the least recently used ones are evicted once the resident total
+    exceeds `budget_bytes`. Concurrent loads of one key share a single
+    read. Sizes come from the artifact on disk, or for models put in
+    memory, from the caller or the arrays the estimator holds.
+
+    mmap_mode 'r' is served as copy-on-write ('c'): online updates write
+    to the weight arrays, which read-only maps refuse. Pinned keys (models
+    carrying online updates not yet checkpointed) are never evicted.
+    """
+
+    def __init__(self, budget_bytes, mmap_mode=None):
+        self.budget_bytes = budget_bytes
+        self.mmap_mode = 'c' if mmap_mode == 'r' else mmap_mode
+        self.entries = OrderedDict()
+        self.resident_bytes = 0
+        self.metrics = {}
+        self.stats = {'hits': 0, 'loads': 0, 'evictions': 0}
+        self.pinned = set()
+        self._lock = threading.Lock()
+        self._loads = SingleFlight()
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self.entries
+
+    def get(self, key, path):
+        """Resident estimator for key, loading it from path if needed"""
+        with self._lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return self.entries[key][0]
+        if not path or not os.path.exists(path):
+            return None
+        return self._loads.do((key, path), lambda: self._load(key, path))
+
+    def _load(self, key, path):
+        start = time.perf_counter()
+        model = joblib.load(path, mmap_mode=self.mmap_mode)
+        load_seconds = time.perf_counter() - start
+        size = os.path.getsize(path)
+        with self._lock:
+            # A model put while we were reading is newer than the file
+            if key in self.entries:
+                return self.entries[key][0]
+            self.stats['loads'] += 1
+            self.metrics[key] = {
+                'load_seconds': load_seconds,
+                'resident_bytes': size,
+                'loads': self.metrics.get(key, {}).get('loads', 0) + 1
+            }
+            self._insert(key, model, size)
+        logger.info(f"Loaded model for {key} in {load_seconds:.3f}s ({size / 2**20:.1f} MB)")
+        return model
+
+    def put(self, key, model, size=None):
+        """Make a freshly trained estimator resident (None discards it)
+
+        `size` is the bytes to account for it; by default the size of the
+        entry it replaces, else the estimator's array payload.
+        """
+        if model is None:
+            self.discard(key)
+            return
+        with self._lock:
+            if size is None:
+                size = self.entries[key][1] if key in self.entries else array_bytes(model)
+            self.metrics.setdefault(key, {'load_seconds': 0.0, 'loads': 0})['resident_bytes'] = size
+            self._insert(key, model, size)
+
+    def pin(self, key):
+        """Keep key resident until unpin (its in-memory state is not on disk yet)"""
+        with self._lock:
+            self.pinned.add(key)
+
+    def unpin(self, key):
+        with self._lock:
+            self.pinned.discard(key)
+
+    def discard(self, key):
+        with self._lock:
+            if key in self.entries:
+                self.resident_bytes -= self.entries.pop(key)[1]
+
+    def _insert(self, key, model, size):
+        """Add or replace an entry and evict down to the budget; caller holds the lock"""
+        if key in self.entries:
+            self.resident_bytes -= self.entries.pop(key)[1]
+        self.entries[key] = (model, size)
+        self.resident_bytes += size
+        # Always keep the model just inserted and pinned ones, even over budget
+        for evicted in list(self.entries):
+            if self.resident_bytes <= self.budget_bytes:
+                break
+            if evicted == key or evicted in self.pinned:
+                continue
+            self.resident_bytes -= self.entries.pop(evicted)[1]
+            self.stats['evictions'] += 1
+            logger.debug(f"Evicted model for {evicted} from memory")
+
+    def get_metrics(self):
+        with self._lock:
+            resident = {key: size for key, (_, size) in self.entries.items()}
+        return {
+            'resident_models': len(resident),
+            'resident_bytes': sum(resident.values()),
+            'budget_bytes': self.budget_bytes,
+            'stats': dict(self.stats),
+            'models': {key: dict(metrics, resident=key in resident)
+                       for key, metrics in self.metrics.items()}
+        }
+
+
+model_cache = ModelCache(
+    settings.SETTINGS["MODEL_MEMORY_BUDGET_MB"] * 2**20,
+    mmap_mode=settings.SETTINGS["MODEL_MMAP_MODE"] or None
+)
+
+model_registry = ModelRegistry(settings.MODEL_REGISTRY_DIR, keep=settings.SETTINGS["MODEL_REGISTRY_KEEP"])
+
+
+_kernels = weakref.WeakKeyDictionary()
+
+
+def compile_model(model):
+    """Exported NumPy kernel for a fitted estimator (memoized), or None
+
+    Kernels give bit-identical predictions without the per-call
+    validation overhead of sklearn/xgboost; unsupported estimators
+    return None and are served directly.
+    """
+    try:
+        return _kernels[model]
+    except (KeyError, TypeError):
+        pass
+    kernel = None
+    try:
+        if isinstance(model, MLPClassifier):
+            kernel = MLPKernel.export(model)
+        elif isinstance(model, xgb.XGBClassifier):
+            kernel = TreeEnsembleKernel.export(model)
+    except Exception as e:
+        logger.warning(f"Model export failed, using estimator: {str(e)}")
+    try:
+        _kernels[model] = kernel
+    except TypeError:
+        pass
+    return kernel
+
+
+def build_dataset(df):
+    """Create (features, target) training data from an indicator-enriched frame
+
+    The frame is not modified. Rows with incomplete features (indicator
+    warm-up, the first price change) are dropped; when the frame has a
+    timestamp column it becomes the index of the result.
+    """
+    # Add technical features
+    features = df.assign(
+        price_change=df['close'].pct_change(),
+        volatility=df['high'] - df['low']
+    )[FEATURE_COLUMNS]
+    
+    # Target: next candle direction (1 = up, 0 = down)
+    target = pd.Series(np.where(df['close'].shift(-1) > df['close'], 1, 0), index=df.index, name='Target')
+    
+    if 'timestamp' in df:
+        features = features.set_axis(df['timestamp'], axis=0)
+        target = target.set_axis(df['timestamp'], axis=0)
+    
+    features, target = features[:-1], target[:-1]  # Exclude last row
+    complete = features.notna().all(axis=1).to_numpy()
+    return features[complete], target[complete]
+
+
+def _plain(value):
+    """JSON-friendly scalar (numpy numbers to Python, timestamps to ISO strings)"""
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value.item() if hasattr(value, 'item') else value
+
+
+def training_metadata(X, accuracy, seconds, mode='full', continuations=0):
+    """Registry metadata describing a model trained on the dataset X"""
+    return {
+        'accuracy': float(accuracy),
+        'train_seconds': round(float(seconds), 3),
+        'trained_at': time.time(),
+        'reference': reference_profile(X),
+        'feature_schema': list(FEATURE_COLUMNS),
+        'data_window': [_plain(X.index.min()), _plain(X.index.max())] if len(X) else None,
+        'samples': len(X),
+        'mode': mode,
+        'continuations': continuations
+    }
+
+
+def fit_model(X, y, n_jobs=None, base_model=None):
+    """Fit on a time-ordered dataset; returns (model, accuracy)
+
+    With an XGBClassifier base_model, new trees are boosted on top of its
+    booster from (X, y) alone instead of fitting from scratch; (X, y) must
+    then hold only rows the base model never saw, so the accuracy is
+    measured on unseen data. XGBoost fits stop early on a validation tail
+    taken from the end of the training split, ahead of the held-out test
+    tail.
+    """
+    # Split data
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, random_state=42, shuffle=False
+    )
+    
+    # Choose model based on data size
+    if base_model is not None or len(X_train) > 1000:
+        # Use XGBoost for larger datasets
+        model = xgb.XGBClassifier(
+            n_estimators=settings.SETTINGS["XGB_CONTINUATION_ROUNDS"] if base_model is not None else 200,
+            max_depth=6,
+            learning_rate=0.05,
+            subsample=0.8,
+            colsample_bytree=0.8,
+            random_state=42,
+            n_jobs=n_jobs,
+            early_stopping_rounds=settings.SETTINGS["XGB_EARLY_STOPPING_ROUNDS"]
+        )
+        X_fit, X_val, y_fit, y_val = train_test_split(
+            X_train, y_train, test_size=0.15, shuffle=False
+        )
+        booster = None
+        if base_model is not None:
+            # Continue from the trees predict() actually uses
+            booster = base_model.get_booster()
+            booster = booster[:base_model.best_iteration + 1]
+        model.fit(X_fit, y_fit, eval_set=[(X_val, y_val)], verbose=False, xgb_model=booster)
+    else:
+        # Use Neural Network for smaller datasets
+        model = MLPClassifier(
+            hidden_layer_sizes=(50, 25, 10),
+            activation='relu',
+            solver='adam',
+            max_iter=500,
+            random_state=42
+        )
+        model.fit(X_train, y_train)
+    
+    # Evaluate
+    preds = model.predict(X_test)
+    return model, accuracy_score(y_test, preds)
+
+
 class AIModel:
-    def _init_(self, instrument_id):
+    def __init__(self, instrument_id):
         self.instrument_id = instrument_id
-        self.model = None
-        self.accuracy = 0
-        self.model_file = f"{MODEL_PATH}model_{instrument_id}.pkl"
+        # Serialises swaps of the live estimator (install, online update, rollback)
+        self._lock = threading.RLock()
+        self.online_parent = None
         
         # Create models directory if not exists
         os.makedirs(MODEL_PATH, exist_ok=True)
         
-        # Load model if exists
-        if os.path.exists(self.model_file):
-            try:
-                self.model = joblib.load(self.model_file)
-                logger.info(f"Loaded existing model for {instrument_id}")
-            except Exception as e:
-                logger.error(f"Error loading model for {instrument_id}: {str(e)}")
+        # Adopt a pre-registry model file as the first version
+        legacy_file = f"{MODEL_PATH}model_{instrument_id}.pkl"
+        if model_registry.current(instrument_id) is None and os.path.exists(legacy_file):
+            model_registry.publish(instrument_id, source=legacy_file, metadata={'source': 'legacy'})
+        
+        self.accuracy = model_registry.metadata(instrument_id).get('accuracy', 0)
+        
+        # The estimator itself is loaded lazily on first use via model_cache
+    
+    @property
+    def model_file(self):
+        """Artifact of the live registry version (None before the first train)"""
+        return model_registry.current_path(self.instrument_id)
+    
+    @property
+    def version(self):
+        return model_registry.current(self.instrument_id)
+    
+    @property
+    def metadata(self):
+        """Registry metadata of the live version ({} if none)"""
+        return model_registry.metadata(self.instrument_id)
+    
+    @property
+    def model(self):
+        """Estimator for this instrument, loaded on first use"""
+        try:
+            return model_cache.get(self.instrument_id, self.model_file)
+        except Exception as e:
+            logger.error(f"Error loading model for {self.instrument_id}: {str(e)}")
+            return None
+    
+    @model.setter
+    def model(self, model):
+        model_cache.put(self.instrument_id, model)
+    
+    def has_model(self):
+        """Whether a trained model exists, without loading it"""
+        return self.instrument_id in model_cache or self.version is not None
     
     def create_dataset(self, df):
         """Create training dataset from historical data"""
-        # Add technical features
-        df['price_change'] = df['close'].pct_change()
-        df['volatility'] = df['high'] - df['low']
-        
-        # Target: next candle direction (1 = up, 0 = down)
-        df['Target'] = np.where(df['close'].shift(-1) > df['close'], 1, 0)
-        
-        # Feature selection
-        features = df[[
-            'ema5', 'ema20', 'rsi6', 'macd', 'macd_signal', 'macd_hist',
-            'price_change', 'volatility'
-        ]]
-        
-        target = df['Target']
-        return features[:-1], target[:-1]  # Exclude last row
+        return build_dataset(df)
     
-    def train(self, df):
-        """Train/re-train model"""
+    def train(self, X, y):
+        """Train/re-train model on a (features, target) dataset"""
         try:
-            X, y = self.create_dataset(df)
-            
             if len(X) < 100:
                 logger.warning(f"Insufficient data for {self.instrument_id} ({len(X)} samples)")
                 return 0
             
-            # Split data
-            X_train, X_test, y_train, y_test = train_test_split(
-                X, y, test_size=0.2, random_state=42, shuffle=False
-            )
-            
-            # Choose model based on data size
-            if len(X_train) > 1000:
-                # Use XGBoost for larger datasets
-                self.model = xgb.XGBClassifier(
-                    n_estimators=200,
-                    max_depth=6,
-                    learning_rate=0.05,
-                    subsample=0.8,
-                    colsample_bytree=0.8,
-                    random_state=42
-                )
-            else:
-                # Use Neural Network for smaller datasets
-                self.model = MLPClassifier(
-                    hidden_layer_sizes=(50, 25, 10),
-                    activation='relu',
-                    solver='adam',
-                    max_iter=500,
-                    random_state=42
-                )
-            
-            # Train
-            self.model.fit(X_train, y_train)
-            
-            # Evaluate
-            preds = self.model.predict(X_test)
-            self.accuracy = accuracy_score(y_test, preds)
-            
-            # Save model
-            joblib.dump(self.model, self.model_file)
-            logger.info(f"Model trained for {self.instrument_id} | Accuracy: {self.accuracy:.2%}")
-            
-            return self.accuracy
+            start = time.perf_counter()
+            model, accuracy = fit_model(X, y)
+            self.install(model, accuracy, training_metadata(X, accuracy, time.perf_counter() - start))
+            return accuracy
         except Exception as e:
             logger.error(f"Error training model for {self.instrument_id}: {str(e)}")
             return 0
     
+    def install(self, model, accuracy, metadata=None):
+        """Publish a trained estimator as a new version and swap it in"""
+        metadata = dict(metadata or {}, accuracy=float(accuracy))
+        with self._lock:
+            version = model_registry.publish(self.instrument_id, model, metadata)
+            # Single reference swap, so concurrent predict() calls see
+            # either the old or the new estimator, never a partial one
+            model_cache.put(self.instrument_id, model, size=os.path.getsize(self.model_file))
+            model_cache.unpin(self.instrument_id)
+            self.accuracy = accuracy
+            self.online_parent = None
+        logger.info(f"Model trained for {self.instrument_id} ({version}) | Accuracy: {self.accuracy:.2%}")
+    
+    def continuation(self, X, y):
+        """(base_model, X_new, y_new, continuations) for extending the live
+        XGBoost model, or None when a full rebuild is due (no XGBoost model,
+        unknown window, fewer than CONTINUATION_MIN_ROWS rows newer than it,
+        or FULL_REBUILD_EVERY continuations since the last rebuild)
+
+        Only rows newer than the model's data window are returned: the new
+        trees, their early-stopping tail and the test tail must all be data
+        the base booster was not trained on.
+        """
+        metadata = model_registry.metadata(self.instrument_id)
+        continuations = metadata.get('continuations', 0)
+        window = metadata.get('data_window')
+        if continuations >= settings.SETTINGS["FULL_REBUILD_EVERY"] or not window:
+            return None
+        if not isinstance(window[1], (int, float)) or not pd.api.types.is_numeric_dtype(X.index):
+            return None
+        model = self.model
+        if not isinstance(model, xgb.XGBClassifier):
+            return None
+        new = X.index > window[1]
+        if new.sum() < settings.SETTINGS["CONTINUATION_MIN_ROWS"]:
+            return None
+        return model, X[new], y[new], continuations + 1
+    
+    def rollback(self):
+        """Return to the previously published version; returns it or None"""
+        with self._lock:
+            version = model_registry.rollback(self.instrument_id)
+            if version:
+                # Dropped from memory; the restored version is loaded on next use
+                model_cache.unpin(self.instrument_id)
+                model_cache.discard(self.instrument_id)
+                self.accuracy = model_registry.metadata(self.instrument_id).get('accuracy', 0)
+                self.online_parent = None
+        return version
+    
     def predict(self, features):
         """Make prediction"""
-        if not self.model:
+        model = self.model
+        if not model:
             return None
         try:
-            return self.model.predict(features.reshape(1, -1))[0]
+            model = compile_model(model) or model
+            return model.predict(features.reshape(1, -1))[0]
         except Exception as e:
             logger.error(f"Prediction error: {str(e)}")
             return None
     
-    def update(self, features, target):
-        """Online learning update"""
-        if self.model:
+    def update(self, X, y):
+        """Incremental mini-batch update; returns True if the model changed
+
+        The update is applied to a copy that is then swapped in, so
+        concurrent predictions never see a half-updated estimator. If a
+        retrain or rollback replaced the live version meanwhile, the update
+        is dropped rather than overwriting it. Models without partial_fit
+        (XGBoost) ignore outcomes and only learn at the next retrain, from
+        the feature store. Publishing is left to save(); until then the
+        updated model is pinned in model_cache so eviction cannot drop it.
+        """
+        with self._lock:
+            version = self.version
+            model = self.model
+        if not model or not hasattr(model, 'partial_fit'):
+            return False
+        try:
+            updated = copy.deepcopy(model)
+            updated.partial_fit(X, y)
+        except Exception as e:
+            logger.error(f"Model update error: {str(e)}")
+            return False
+        with self._lock:
+            if self.version != version:
+                logger.debug(f"Dropped online update for {self.instrument_id}: {version} was replaced")
+                return False
+            # Resident until save() has published it
+            model_cache.pin(self.instrument_id)
+            self.model = updated
+            self.online_parent = version
+        logger.debug(f"Model for {self.instrument_id} updated with {len(y)} samples")
+        return True
+    
+    def save(self):
+        """Publish the online-updated estimator as a new version
+
+        Does nothing unless the live estimator carries online updates on
+        top of the live version (a retrain or rollback since then wins).
+        """
+        with self._lock:
+            model = self.model
+            if model is None or self.online_parent is None or self.online_parent != self.version:
+                return False
+            # Keeps the training metadata (window, drift reference) of the parent
+            metadata = dict(self.metadata, accuracy=float(self.accuracy), source='online', parent=self.version)
+            model_registry.publish(self.instrument_id, model, metadata)
+            model_cache.unpin(self.instrument_id)
+            self.online_parent = None
+            return True
+
+
+class ModelPool:
+    """Per-instrument AIModels scored together in one pass per scan"""
+
+    def __init__(self):
+        self.models = {}
+        # Stacked MLP weights per architecture, rebuilt when a member model changes
+        self._stacks = {}
+
+    def __getitem__(self, instrument_id):
+        return self.models[instrument_id]
+
+    def __setitem__(self, instrument_id, model):
+        self.models[instrument_id] = model
+
+    def __contains__(self, instrument_id):
+        return instrument_id in self.models
+
+    def __len__(self):
+        return len(self.models)
+
+    def get(self, instrument_id, default=None):
+        return self.models.get(instrument_id, default)
+
+    def items(self):
+        return self.models.items()
+
+    def predict_batch(self, feature_matrix, instrument_ids):
+        """Score one feature row per instrument, batching across instruments
+
+        Rows are grouped by the estimator that serves them and scored on its
+        exported NumPy kernel (no sklearn/xgboost validation or DMatrix).
+        MLP kernels of the same architecture are then stacked, so all of
+        those instruments are scored in one batched forward pass; XGBoost
+        models are still scored one call per model. Returns (classes, probabilities):
+        classes holds 1/0, or -1 where no prediction was possible (no
+        model, incomplete features or an error); probabilities holds
+        P(class 1), NaN where unavailable.
+        """
+        X = np.asarray(feature_matrix, dtype=np.float64)
+        classes = np.full(len(instrument_ids), -1, dtype=np.int8)
+        probabilities = np.full(len(instrument_ids), np.nan)
+        complete = ~np.isnan(X).any(axis=1)
+
+        groups = {}
+        for row, instrument_id in enumerate(instrument_ids):
+            ai_model = self.models.get(instrument_id)
+            if ai_model is None or not complete[row]:
+                continue
+            estimator = ai_model.model
+            if estimator is None:
+                continue
+            groups.setdefault(id(estimator), (estimator, []))[1].append(row)
+
+        for scorer, rows, index in self._scorers(groups.values()):
             try:
-                # For XGBoost models
-                if hasattr(self.model, 'partial_fit'):
-                    self.model.partial_fit(features.reshape(1, -1), [target])
-                # For Neural Networks
-                elif hasattr(self.model, 'warm_start'):
-                    self.model.warm_start = True
-                    self.model.fit(features.reshape(1, -1), [target])
-                
-                joblib.dump(self.model, self.model_file)
-                logger.debug("Model updated with new data point")
+                proba = scorer.predict_proba(X[rows]) if index is None else scorer.predict_proba(X[rows], index)
+                positive = list(scorer.classes_).index(1) if 1 in scorer.classes_ else None
+                p_up = proba[:, positive] if positive is not None else np.zeros(len(rows))
+                classes[rows] = np.asarray(scorer.classes_)[proba.argmax(axis=1)]
+                probabilities[rows] = p_up
             except Exception as e:
-                logger.error(f"Model update error: {str(e)}")
+                logger.error(f"Batch prediction error: {str(e)}")
+        return classes, probabilities
+
+    def _scorers(self, groups):
+        """(scorer, rows, model index per row or None) covering every group"""
+        scorers, stackable = [], {}
+        for estimator, rows in groups:
+            kernel = compile_model(estimator)
+            if isinstance(kernel, MLPKernel):
+                stackable.setdefault(StackedMLPKernel.signature(kernel), []).append((kernel, rows))
+            else:
+                scorers.append((kernel or estimator, rows, None))
+        for signature, members in stackable.items():
+            if len(members) == 1:
+                scorers.append((members[0][0], members[0][1], None))
+                continue
+            kernels = tuple(kernel for kernel, _ in members)
+            stack = self._stacks.get(signature)
+            if stack is None or len(stack.kernels) != len(kernels) or any(
+                    a is not b for a, b in zip(stack.kernels, kernels)):
+                stack = self._stacks[signature] = StackedMLPKernel(kernels)
+            rows = [row for _, member_rows in members for row in member_rows]
+            index = np.repeat(np.arange(len(members)), [len(member_rows) for _, member_rows in members])
+            scorers.append((stack, rows, None if len(rows) == len(members) else index))
+        return scorers
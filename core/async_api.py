@@ -0,0 +1,148 @@
+"""
+async_api.py - PocketOptionAPI for the asyncio runtime
+
+The price stream is an aiohttp WebSocket read by a task on the event loop,
+and request() is an aiohttp session that shares the rate-limit buckets,
+retry policy and pool size of the threaded client's session. The broker
+REST endpoints themselves are still the threaded client's, awaited on the
+default executor (see AsyncTradingEngine).
+Ticks land in the same buffers, candles, tick store and listeners, and the
+inherited blocking methods stay available to code running in executor
+threads (signal preparation, retraining).
+"""
+
+import asyncio
+import logging
+from urllib.parse import urlparse
+import aiohttp
+from config import settings
+from .pocket_option_api import PocketOptionAPI
+from .rest_client import RETRY_STATUSES, IDEMPOTENT_METHODS, backoff_delay
+
+logger = logging.getLogger(__name__)
+
+WS_URL = "wss://api.pocketoption.com/"
+
+
+class AsyncPocketOptionAPI(PocketOptionAPI):
+    def __init__(self):
+        super().__init__()
+        self.loop = None
+        self.http = None
+        self.ws_task = None
+        self.adapter = self.session.get_adapter(self.base_url)
+
+    async def open(self):
+        """Bind to the running loop and open the HTTP session"""
+        if self.http is None:
+            self.loop = asyncio.get_running_loop()
+            self.http = aiohttp.ClientSession(
+                headers=dict(self.session.headers),
+                connector=aiohttp.TCPConnector(limit=settings.SETTINGS["REST_POOL_SIZE"]),
+                timeout=aiohttp.ClientTimeout(total=30)
+            )
+        return self
+
+    async def close(self):
+        if self.ws_task:
+            self.ws_task.cancel()
+            await asyncio.gather(self.ws_task, return_exceptions=True)
+        if self.http is not None:
+            await self.http.close()
+            self.http = None
+
+    async def request(self, method, url, **kwargs):
+        """Rate-limited HTTP call with retries; returns the decoded JSON body
+
+        Idempotent methods are retried on connection errors and retryable
+        statuses like the threaded session does, honouring Retry-After.
+        """
+        await self.open()
+        bucket = self.adapter.bucket_for(urlparse(url).path)
+        retries = self.adapter.retries if method in IDEMPOTENT_METHODS else 0
+        for attempt in range(retries + 1):
+            while True:
+                wait = bucket.reserve()
+                if not wait:
+                    break
+                await asyncio.sleep(wait)
+            try:
+                async with self.http.request(method, url, **kwargs) as response:
+                    if response.status not in RETRY_STATUSES or attempt == retries:
+                        response.raise_for_status()
+                        return await response.json(content_type=None)
+                    delay = self.adapter.retry_delay(attempt, response.headers.get('Retry-After', ''))
+                    logger.warning(f"{url} returned {response.status}, retrying in {delay:.2f}s")
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt == retries:
+                    raise
+                delay = backoff_delay(attempt, self.adapter.backoff, self.adapter.backoff_cap)
+                logger.warning(f"Request to {url} failed ({str(e)}), retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+    def start_websocket(self):
+        """Start the price stream as a task on the running loop"""
+        if self.demo_mode:
+            logger.info("Skipping WebSocket in demo mode")
+            return
+        if self.ws_task is None or self.ws_task.done():
+            self.ws_task = asyncio.get_running_loop().create_task(self.stream())
+            logger.info("WebSocket stream task started")
+
+    async def stream(self):
+        """Read the price stream, reconnecting after failures"""
+        await self.open()
+        attempt = 0
+        while True:
+            try:
+                async with self.http.ws_connect(WS_URL, heartbeat=30) as ws:
+                    logger.info("WebSocket connection opened")
+                    self.ws_connected = True
+                    attempt = 0
+                    for message in self.subscriptions(await self.get_instruments_async()):
+                        await ws.send_str(message)
+                    async for message in ws:
+                        if message.type == aiohttp.WSMsgType.TEXT:
+                            self.handle_message(message.data)
+                        elif message.type == aiohttp.WSMsgType.ERROR:
+                            logger.error(f"WebSocket error: {str(ws.exception())}")
+                            break
+                logger.warning("WebSocket closed")
+            except asyncio.CancelledError:
+                self.ws_connected = False
+                raise
+            except Exception as e:
+                logger.error(f"WebSocket error: {str(e)}")
+            self.ws_connected = False
+            delay = backoff_delay(attempt, 5, 60)
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def in_thread(self, func, *args, **kwargs):
+        """Run a blocking client method on the loop's default executor"""
+        return await asyncio.get_running_loop().run_in_executor(None, lambda: func(*args, **kwargs))
+
+    # The REST endpoints (instruments, history, orders) are implemented once,
+    # by the threaded client, whose session holds their rate limits, retries
+    # and single-flight history fetches; they run on the default executor so
+    # they never block the loop.
+
+    async def get_instruments_async(self):
+        return await self.in_thread(self.get_instruments)
+
+    async def get_history_async(self, instrument_id, limit=100):
+        return await self.in_thread(self.get_history, instrument_id, limit=limit)
+
+    async def get_last_price_async(self, instrument_id):
+        """Streamed price when fresh, otherwise the cached history close"""
+        price = self.get_realtime_price(instrument_id)
+        if price is not None:
+            return price
+        hist_data = await self.get_history_async(instrument_id, limit=1)
+        return float(hist_data[0]['close']) if hist_data else 0
+
+    async def place_trade_async(self, **order):
+        return await self.in_thread(self.place_trade, **order)
+
+    async def close_trade_async(self, trade_id):
+        return await self.in_thread(self.close_trade, trade_id)
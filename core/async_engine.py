@@ -0,0 +1,236 @@
+"""
+async_engine.py - TradingEngine on an asyncio event loop
+
+Selected with `--runtime async` (or RUNTIME=async). Scanning, order
+placement, trade monitoring, reporting and the retraining schedule are
+coroutines on one loop instead of sleeping threads, and the price stream
+is read by the loop itself. Work that is CPU-bound or still blocking
+(signal preparation and batched inference, retraining cycles, shutdown
+checkpoints) runs on a bounded executor so it never stalls the stream.
+The event-driven dispatcher keeps its worker threads and hands strong
+signals back to the loop.
+"""
+
+import time
+import random
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from config import settings
+from .trading_engine import TradingEngine
+from .async_api import AsyncPocketOptionAPI
+from .telegram_bot import AsyncTelegramBot
+from .trade_scheduler import AsyncTradeScheduler
+from .tick_buffer import symbol_for
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncTradingEngine(TradingEngine):
+    """TradingEngine whose loops, order placement and monitoring are coroutines
+
+    Broker REST calls (instruments, history, order placement and early
+    close) are not native aiohttp requests: the *_async wrappers of
+    AsyncPocketOptionAPI run the threaded client's blocking methods on the
+    loop's default executor. This is deliberate. Those endpoints are
+    implemented once, on the requests session that carries the rate
+    limits, retries and single-flight history fetches, and the loop only
+    awaits them. Telegram and the price stream use aiohttp directly, and
+    new broker endpoints should go through AsyncPocketOptionAPI.request().
+    """
+
+    def __init__(self, api: AsyncPocketOptionAPI):
+        # Must be created on the loop it will run on, after `await api.open()`
+        self.loop = asyncio.get_running_loop()
+        self.cpu_executor = ThreadPoolExecutor(
+            max_workers=settings.SETTINGS["ASYNC_CPU_WORKERS"], thread_name_prefix="engine-cpu"
+        )
+        self.tasks = []
+        super().__init__(api)
+
+    def create_telegram_bot(self):
+        return AsyncTelegramBot(self.api)
+
+    def create_trade_scheduler(self):
+        return AsyncTradeScheduler(
+            self.settle_trade,
+            price_source=lambda trade: self.api.get_last_price_async(trade.context['instrument_id']),
+            is_active=lambda: self.trading_active,
+            poll_interval=settings.SETTINGS["TRADE_POLL_INTERVAL"],
+            settle_workers=settings.SETTINGS["TRADE_WORKERS"]
+        )
+
+    async def cpu(self, func, *args):
+        """Run CPU-bound or blocking engine work off the loop"""
+        return await self.loop.run_in_executor(self.cpu_executor, func, *args)
+
+    async def initialize_models_async(self):
+        await self.cpu(self.initialize_models)
+
+    async def retrain_models_async(self):
+        """Hourly drift check; each cycle runs in the executor"""
+        while True:
+            try:
+                await self.cpu(self.retrain_cycle)
+                await asyncio.sleep(3600)
+            except Exception as e:
+                logger.error(f"Error in retrain task: {str(e)}")
+                await asyncio.sleep(60)
+
+    def start_trade(self, instrument, signal, confidence, features=None):
+        """Execute a strong signal as a task on the loop; callable from any thread
+        
+        Returns False if no concurrent-trade slot is free for the instrument.
+        """
+        if not self.reserve_trade(instrument):
+            return False
+        logger.info(f"Strong signal detected for {instrument['symbol']}: {signal} (Confidence: {confidence:.0%})")
+        asyncio.run_coroutine_threadsafe(self.execute_trade_async(instrument, signal, confidence, features),
+                                         self.loop)
+        return True
+
+    async def execute_trade_async(self, instrument, signal, confidence, features=None):
+        """Place a trade on a reserved slot without blocking the loop and hand
+        it to the scheduler; the slot is released afterwards"""
+        try:
+            if not self.trade_allowed():
+                return
+
+            instrument_id = instrument['id']
+            symbol = instrument['symbol']
+            position_size = self.risk_manager.calculate_position_size()
+            duration = settings.SETTINGS["TRADE_INTERVAL"]  # Seconds
+
+            if settings.SETTINGS["DEMO_MODE"]:
+                trade_id = f"DEMO_{int(time.time())}_{random.randint(1000,9999)}"
+                entry_price = await self.api.get_last_price_async(instrument_id)
+                logger.info(f"Demo trade placed: {symbol} {signal} at {entry_price}")
+            else:
+                trade = await self.api.place_trade_async(
+                    instrument_id=instrument_id,
+                    amount=position_size,
+                    direction=signal.lower(),
+                    duration=duration
+                )
+                if not trade.get('success'):
+                    logger.error(f"Trade failed for {symbol}")
+                    self.telegram_bot.send_message(f"❌ TRADE FAILED\n{symbol} {signal}")
+                    return
+                trade_id = trade['trade_id']
+                entry_price = trade['entry_price']
+                logger.info(f"Real trade placed: {trade_id} {symbol} {signal} at {entry_price}")
+
+            self.register_trade(instrument, signal, confidence, trade_id, entry_price, position_size, duration,
+                                features)
+        except Exception as e:
+            logger.error(f"Trade execution error for {instrument['symbol']}: {str(e)}")
+        finally:
+            self.release_trade(instrument)
+
+    async def scan_async(self, instruments):
+        """Evaluate every instrument once off the loop and trade the strong signals
+
+        Like scan(), only instruments that reached the trade decision are
+        marked as scanned.
+        """
+        evaluated = []
+        results = await self.cpu(self.generate_signals, instruments, evaluated)
+        scanned = self.scanned_without_signal(evaluated, results)
+        for instrument, signal, df, confidence, features in results:
+            if not self.trading_active:
+                break
+
+            if self.open_trade_count() >= self.risk_manager.max_concurrent_trades:
+                logger.info("Max concurrent trades reached")
+                break
+
+            scanned.add(instrument['id'])
+            if not signal or confidence < 0.7:
+                continue
+
+            self.start_trade(instrument, signal, confidence, features)
+            await asyncio.sleep(1)  # Stagger trade starts
+        self.scan_scheduler.mark_scanned(scanned)
+
+    async def run_events_async(self):
+        """Event-driven mode: refresh the universe and report dispatch latency"""
+        while True:
+            try:
+                instruments = await self.api.get_instruments_async()
+                # Instruments paying under the threshold are never evaluated
+                eligible = [inst for inst in instruments if self.scan_scheduler.eligible(inst)]
+                self.instruments_by_symbol = {symbol_for(inst['id']): inst for inst in eligible}
+                self.sentiment.prefetch(inst['symbol'] for inst in eligible)
+
+                if self.trading_active and not self.api.ws_connected:
+                    logger.warning("Price stream down; falling back to scheduled scans")
+                    await self.scan_async(self.due_instruments(instruments))
+
+                logger.info(f"Signal dispatch: {self.dispatcher.get_stats()}")
+            except Exception as e:
+                logger.error(f"Error in event loop: {str(e)}")
+            await asyncio.sleep(settings.SETTINGS["SIGNAL_REFRESH_INTERVAL"])
+
+    async def performance_reporting_async(self):
+        """Send periodic performance reports"""
+        while True:
+            try:
+                # Send hourly update during trading hours (08:00-20:00 UTC)
+                now = datetime.utcnow()
+                if 8 <= now.hour < 20:
+                    report = self.risk_manager.get_performance_report()
+                    if report['total_trades'] > 0:
+                        self.telegram_bot.send_performance_report(report)
+                        logger.info("Sent hourly performance report")
+                await asyncio.sleep(3600)
+            except Exception as e:
+                logger.error(f"Performance reporting error: {str(e)}")
+                await asyncio.sleep(60)
+
+    async def run_async(self):
+        """Main trading loop (asyncio runtime); models are initialized beforehand"""
+        self.tasks = [
+            asyncio.create_task(self.retrain_models_async()),
+            asyncio.create_task(self.performance_reporting_async())
+        ]
+
+        logger.info("=== TRADING SYSTEM ACTIVE (asyncio) ===")
+        logger.info(f"Initial Balance: {self.risk_manager.capital:.2f}")
+        logger.info(f"Risk Profile: {settings.SETTINGS['RISK_PROFILE'].title()}")
+
+        try:
+            if self.event_driven:
+                await self.run_events_async()
+
+            while True:
+                if not self.trading_active:
+                    logger.info("Trading paused...")
+                    await asyncio.sleep(10)
+                    continue
+
+                instruments = await self.api.get_instruments_async()
+                due = self.due_instruments(instruments)
+                logger.info(f"Scanning {len(due)} of {len(instruments)} instruments...")
+                self.sentiment.prefetch(inst['symbol'] for inst in due)
+                await self.scan_async(due)
+                logger.info(f"Scan: {self.scan_pool.get_stats()}")
+                logger.info(f"Scan schedule: {self.scan_scheduler.get_stats()}")
+
+                await asyncio.sleep(settings.SETTINGS["SCAN_MIN_INTERVAL"])  # Wait before next scan
+
+        except (KeyboardInterrupt, asyncio.CancelledError):
+            await self.shutdown_async()
+        except Exception as e:
+            logger.critical(f"Fatal error in trading loop: {str(e)}")
+            self.telegram_bot.send_message(f"🚨 CRITICAL ERROR\n{str(e)}")
+            await self.telegram_bot.drain()
+
+    async def shutdown_async(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        await self.cpu(self.shutdown)
+        await self.telegram_bot.drain()
+        self.cpu_executor.shutdown(wait=False)
+        await self.api.close()
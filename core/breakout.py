@@ -0,0 +1,123 @@
+"""
+breakout.py - Incremental breakout detection with monotonic deques
+
+A bar is a bullish breakout when its close is above the highest high of
+the previous `lookback` bars, and bearish when it is below the lowest low.
+Rolling extremes are kept in monotonic deques, so each new bar costs
+amortized O(1) regardless of the lookback. Whole histories are classified
+in one vectorized pass instead.
+"""
+
+from collections import deque
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+BULLISH = 1
+BEARISH = -1
+NEUTRAL = 0
+LABELS = {BULLISH: 'bullish', BEARISH: 'bearish', NEUTRAL: None}
+
+
+class RollingExtremes:
+    """Max of highs and min of lows over the last `window` pushed bars"""
+
+    def __init__(self, window):
+        self.window = window
+        self.index = 0
+        self.highs = deque()  # (index, high), highs strictly decreasing
+        self.lows = deque()   # (index, low), lows strictly increasing
+
+    def push(self, high, low):
+        i = self.index
+        while self.highs and self.highs[-1][1] <= high:
+            self.highs.pop()
+        self.highs.append((i, high))
+        while self.lows and self.lows[-1][1] >= low:
+            self.lows.pop()
+        self.lows.append((i, low))
+
+        expired = i - self.window
+        if self.highs[0][0] <= expired:
+            self.highs.popleft()
+        if self.lows[0][0] <= expired:
+            self.lows.popleft()
+        self.index += 1
+
+    def ready(self):
+        return self.index >= self.window
+
+    @property
+    def high(self):
+        return self.highs[0][1] if self.highs else float('nan')
+
+    @property
+    def low(self):
+        return self.lows[0][1] if self.lows else float('nan')
+
+    @property
+    def range(self):
+        return self.high - self.low
+
+    def state(self):
+        return {'window': self.window, 'index': self.index,
+                'highs': list(self.highs), 'lows': list(self.lows)}
+
+    @classmethod
+    def from_state(cls, state):
+        extremes = cls(state['window'])
+        extremes.index = state['index']
+        extremes.highs = deque(tuple(item) for item in state['highs'])
+        extremes.lows = deque(tuple(item) for item in state['lows'])
+        return extremes
+
+
+class BreakoutDetector:
+    """Breakout state for one instrument and lookback"""
+
+    def __init__(self, lookback=20):
+        self.lookback = lookback
+        self.extremes = RollingExtremes(lookback)
+        self.last = NEUTRAL
+
+    def classify(self, close):
+        """Breakout flag of a close against the previous `lookback` bars"""
+        if not self.extremes.ready():
+            return NEUTRAL
+        if close > self.extremes.high:
+            return BULLISH
+        if close < self.extremes.low:
+            return BEARISH
+        return NEUTRAL
+
+    def update(self, high, low, close):
+        """Fold in a closed bar and return its breakout flag"""
+        self.last = self.classify(close)
+        self.extremes.push(high, low)
+        return self.last
+
+    def state(self):
+        return {'lookback': self.lookback, 'last': self.last, 'extremes': self.extremes.state()}
+
+    @classmethod
+    def from_state(cls, state):
+        detector = cls(state['lookback'])
+        detector.last = state['last']
+        detector.extremes = RollingExtremes.from_state(state['extremes'])
+        return detector
+
+
+def detect_breakouts(high, low, close, lookback=20):
+    """Batch breakout flags (+1/-1/0) for every bar of a history
+
+    Same flags as feeding the bars through a BreakoutDetector one by one.
+    """
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+    flags = np.zeros(len(close), dtype=np.int8)
+    if len(close) > lookback:
+        resistance = sliding_window_view(high, lookback)[:-1].max(axis=1)
+        support = sliding_window_view(low, lookback)[:-1].min(axis=1)
+        recent = close[lookback:]
+        flags[lookback:] = np.where(recent > resistance, BULLISH, np.where(recent < support, BEARISH, NEUTRAL))
+    return flags
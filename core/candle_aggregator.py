@@ -0,0 +1,181 @@
+"""
+candle_aggregator.py - Incremental tick-to-OHLCV candle builder
+
+Consumes the WebSocket tick stream and keeps rolling candles per instrument
+for each configured timeframe, so signal generation can read bars without a
+REST round trip.
+"""
+
+import time
+import threading
+import logging
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class CandleAggregator:
+    """Rolling OHLCV bars per (symbol, timeframe)
+
+    Ticks may arrive late or out of order. Open and close are decided by tick
+    timestamp rather than arrival order, and a tick for an already closed bar
+    amends that bar if it is no more than `max_late_bars` bars old; older
+    ticks are dropped and counted. Bars of quiet instruments are closed by
+    `close_due`, driven by the clock thread from `start_clock`; a tick that
+    arrives after such a close amends the bar instead of reopening it.
+    """
+
+    def __init__(self, timeframes=(60,), max_bars=500, max_late_bars=2):
+        self.timeframes = tuple(timeframes)
+        self.max_bars = max_bars
+        self.max_late_bars = max_late_bars
+        self.closed = {}
+        self.current = {}
+        self.listeners = []
+        self.stats = {'ticks': 0, 'late': 0, 'dropped': 0, 'bars_closed': 0}
+        self._lock = threading.Lock()
+        self._clock_thread = None
+        self._clock_stop = threading.Event()
+
+    def add_listener(self, callback):
+        """Register callback(symbol, timeframe, bar) fired when a bar closes"""
+        self.listeners.append(callback)
+
+    def add_tick(self, symbol, timestamp, price, volume=0.0):
+        """Fold a tick into every timeframe for the symbol"""
+        closed_bars = []
+        with self._lock:
+            self.stats['ticks'] += 1
+            for timeframe in self.timeframes:
+                bar = self._add(symbol, timeframe, timestamp, price, volume)
+                if bar is not None:
+                    closed_bars.append((timeframe, bar))
+        self._emit(symbol, closed_bars)
+
+    def close_due(self, now):
+        """Close open bars whose period has ended, for quiet instruments"""
+        closed_bars = []
+        with self._lock:
+            for (symbol, timeframe), bar in list(self.current.items()):
+                if now >= bar['timestamp'] + timeframe:
+                    self._close(symbol, timeframe)
+                    closed_bars.append((symbol, timeframe, bar))
+        for symbol, timeframe, bar in closed_bars:
+            self._emit(symbol, [(timeframe, bar)])
+
+    def start_clock(self, interval=1.0, grace=1.0, clock=time.time):
+        """Call close_due every `interval` seconds from a background thread
+
+        A bar is closed `grace` seconds after its period ends, leaving time
+        for in-flight ticks of that period to arrive.
+        """
+        if self._clock_thread is not None:
+            return
+
+        def run():
+            while not self._clock_stop.wait(interval):
+                try:
+                    self.close_due(clock() - grace)
+                except Exception as e:
+                    logger.error(f"Bar clock error: {str(e)}")
+
+        self._clock_thread = threading.Thread(target=run, name="bar-clock", daemon=True)
+        self._clock_thread.start()
+
+    def stop_clock(self):
+        self._clock_stop.set()
+        if self._clock_thread is not None:
+            self._clock_thread.join(2)
+
+    def get_candles(self, symbol, timeframe=None, limit=None, include_open=False):
+        """Copies of the latest candles, oldest first"""
+        timeframe = timeframe or self.timeframes[0]
+        key = (symbol, timeframe)
+        with self._lock:
+            bars = list(self.closed.get(key, ()))
+            if include_open and key in self.current:
+                bars.append(self.current[key])
+            if limit:
+                bars = bars[-limit:]
+            return [self._public(bar) for bar in bars]
+
+    def _add(self, symbol, timeframe, timestamp, price, volume):
+        key = (symbol, timeframe)
+        start = timestamp - timestamp % timeframe
+        bar = self.current.get(key)
+        closed = None
+
+        if bar is None:
+            bars = self.closed.get(key)
+            if bars and start <= bars[-1]['timestamp']:
+                # The bar was already closed by close_due
+                self._amend(key, start, timestamp, price, volume, bars[-1]['timestamp'] + timeframe)
+            else:
+                self.current[key] = self._new_bar(start, timestamp, price, volume)
+        elif start > bar['timestamp']:
+            closed = self._close(symbol, timeframe)
+            self.current[key] = self._new_bar(start, timestamp, price, volume)
+        elif start == bar['timestamp']:
+            self._update(bar, timestamp, price, volume)
+        else:
+            self._amend(key, start, timestamp, price, volume, bar['timestamp'])
+        return closed
+
+    def _amend(self, key, start, timestamp, price, volume, frontier):
+        bars = self.closed.get(key, ())
+        lowest = frontier - self.max_late_bars * key[1]
+        if start >= lowest:
+            for bar in reversed(bars):
+                if bar['timestamp'] == start:
+                    self._update(bar, timestamp, price, volume)
+                    self.stats['late'] += 1
+                    return
+                if bar['timestamp'] < start:
+                    break
+        self.stats['dropped'] += 1
+
+    def _close(self, symbol, timeframe):
+        key = (symbol, timeframe)
+        bar = self.current.pop(key)
+        if key not in self.closed:
+            self.closed[key] = deque(maxlen=self.max_bars)
+        self.closed[key].append(bar)
+        self.stats['bars_closed'] += 1
+        return bar
+
+    def _emit(self, symbol, closed_bars):
+        for timeframe, bar in closed_bars:
+            for callback in self.listeners:
+                try:
+                    callback(symbol, timeframe, self._public(bar))
+                except Exception as e:
+                    logger.error(f"Bar close callback error: {str(e)}")
+
+    @staticmethod
+    def _new_bar(start, timestamp, price, volume):
+        return {
+            'timestamp': start,
+            'open': price,
+            'high': price,
+            'low': price,
+            'close': price,
+            'volume': volume,
+            'first_tick': timestamp,
+            'last_tick': timestamp
+        }
+
+    @staticmethod
+    def _update(bar, timestamp, price, volume):
+        bar['high'] = max(bar['high'], price)
+        bar['low'] = min(bar['low'], price)
+        bar['volume'] += volume
+        if timestamp < bar['first_tick']:
+            bar['first_tick'] = timestamp
+            bar['open'] = price
+        if timestamp >= bar['last_tick']:
+            bar['last_tick'] = timestamp
+            bar['close'] = price
+
+    @staticmethod
+    def _public(bar):
+        return {k: bar[k] for k in ('timestamp', 'open', 'high', 'low', 'close', 'volume')}
@@ -0,0 +1,182 @@
+"""
+drift_monitor.py - Decide which models need retraining
+
+Each model version carries a reference profile of its training features
+(per-feature quantile bins and their proportions). Recent feature rows are
+compared against it with the population stability index (PSI), and live
+accuracy is the hit rate of the model's latest next-bar direction calls,
+the same quantity as its validation accuracy. Instruments whose drift
+score crosses 1.0 are queued for retraining, highest score first, until
+the estimated training time of the cycle exceeds its budget. Models that
+drift far enough are suspended from trading until they are retrained.
+"""
+
+import time
+import threading
+import logging
+from collections import deque
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+PSI_FLOOR = 1e-4
+
+
+def reference_profile(X, bins=10):
+    """JSON-serialisable per-feature bin edges and proportions of X"""
+    values = np.asarray(X, dtype=np.float64)
+    edges, expected = [], []
+    for column in values.T:
+        column = column[~np.isnan(column)]
+        cuts = np.unique(np.quantile(column, np.linspace(0, 1, bins + 1)[1:-1])) if len(column) else np.array([])
+        counts = np.bincount(np.searchsorted(cuts, column, side='right'), minlength=len(cuts) + 1)
+        edges.append(cuts.tolist())
+        expected.append((counts / max(len(column), 1)).tolist())
+    return {'edges': edges, 'expected': expected}
+
+
+def population_stability(profile, X):
+    """PSI of each feature of X against a reference profile"""
+    values = np.asarray(X, dtype=np.float64)
+    psi = np.zeros(len(profile['edges']))
+    for i, (cuts, expected) in enumerate(zip(profile['edges'], profile['expected'])):
+        column = values[:, i]
+        column = column[~np.isnan(column)]
+        if not len(column):
+            continue
+        counts = np.bincount(np.searchsorted(cuts, column, side='right'), minlength=len(cuts) + 1)
+        actual = np.maximum(counts / len(column), PSI_FLOOR)
+        expected = np.maximum(np.asarray(expected), PSI_FLOOR)
+        psi[i] = np.sum((actual - expected) * np.log(actual / expected))
+    return psi
+
+
+class DriftMonitor:
+    def __init__(self, psi_threshold=0.25, accuracy_window=30, min_trades=10,
+                 accuracy_tolerance=0.1, max_age_hours=24, suspend_score=2.0):
+        self.psi_threshold = psi_threshold
+        self.accuracy_window = accuracy_window
+        self.min_trades = min_trades
+        self.accuracy_tolerance = accuracy_tolerance
+        self.max_age_hours = max_age_hours
+        self.suspend_score = suspend_score
+        self.outcomes = {}
+        self.predictions = {}
+        self.assessments = {}
+        self._lock = threading.Lock()
+
+    def record_outcome(self, instrument_id, win):
+        with self._lock:
+            if instrument_id not in self.outcomes:
+                self.outcomes[instrument_id] = deque(maxlen=self.accuracy_window)
+            self.outcomes[instrument_id].append(1 if win else 0)
+
+    def record_prediction(self, instrument_id, symbol, bar_time, close, prediction):
+        """Remember a model's direction call (1 = up) for the bar opening at
+        bar_time, made on a bar that closed at `close`"""
+        with self._lock:
+            self.predictions[symbol] = (instrument_id, bar_time, close, int(prediction))
+
+    def on_bar(self, symbol, bar_time, close):
+        """Score the pending call of `symbol` once its bar has closed
+
+        A call whose bar was skipped (no candle closed for it) is dropped.
+        """
+        with self._lock:
+            pending = self.predictions.get(symbol)
+            if pending is None or bar_time < pending[1]:
+                return
+            del self.predictions[symbol]
+        instrument_id, expected, previous, prediction = pending
+        if bar_time == expected:
+            self.record_outcome(instrument_id, (close > previous) == (prediction == 1))
+
+    def live_accuracy(self, instrument_id):
+        """Rolling live hit rate, or None with fewer than min_trades outcomes"""
+        with self._lock:
+            outcomes = self.outcomes.get(instrument_id)
+            if not outcomes or len(outcomes) < self.min_trades:
+                return None
+            return sum(outcomes) / len(outcomes)
+
+    def assess(self, instrument_id, X_recent, metadata):
+        """Drift score and its components for one instrument's live model
+
+        metadata is the registry metadata of the live version (empty when
+        there is none). A score of 1.0 or more means retraining is due.
+        """
+        assessment = {'instrument_id': instrument_id, 'psi': None, 'live_accuracy': None, 'reasons': []}
+        if not metadata:
+            # Nothing to suspend; train it first
+            assessment.update(score=float('inf'), suspended=False, reasons=['no model'])
+            return self._remember(assessment)
+
+        scores = [0.0]
+        profile = metadata.get('reference')
+        if profile and len(X_recent):
+            psi = population_stability(profile, X_recent)
+            assessment['psi'] = float(psi.max())
+            scores.append(assessment['psi'] / self.psi_threshold)
+            if assessment['psi'] >= self.psi_threshold:
+                schema = metadata.get('feature_schema') or []
+                worst = int(psi.argmax())
+                name = schema[worst] if worst < len(schema) else f"feature {worst}"
+                assessment['reasons'].append(f"psi {assessment['psi']:.2f} ({name})")
+
+        live_accuracy = self.live_accuracy(instrument_id)
+        if live_accuracy is not None:
+            assessment['live_accuracy'] = live_accuracy
+            shortfall = metadata.get('accuracy', 0) - live_accuracy
+            scores.append(shortfall / self.accuracy_tolerance)
+            if shortfall >= self.accuracy_tolerance:
+                assessment['reasons'].append(f"live accuracy {live_accuracy:.0%}")
+
+        trained_at = metadata.get('trained_at', metadata.get('created', 0))
+        age_hours = (time.time() - trained_at) / 3600
+        if self.max_age_hours and age_hours >= self.max_age_hours:
+            scores.append(1.0)
+            assessment['reasons'].append(f"age {age_hours:.0f}h")
+
+        assessment['score'] = max(scores)
+        assessment['suspended'] = assessment['score'] >= self.suspend_score
+        return self._remember(assessment)
+
+    def _remember(self, assessment):
+        with self._lock:
+            self.assessments[assessment['instrument_id']] = assessment
+        return assessment
+
+    def plan(self, assessments, budget_seconds, cost):
+        """Instruments to retrain this cycle, by descending score
+
+        cost(instrument_id) estimates training seconds; selection stops once
+        the budget is spent, but the top candidate is always taken.
+        """
+        due = sorted((a for a in assessments if a['score'] >= 1.0), key=lambda a: a['score'], reverse=True)
+        selected, spent = [], 0.0
+        for assessment in due:
+            estimate = cost(assessment['instrument_id'])
+            if selected and budget_seconds and spent + estimate > budget_seconds:
+                continue
+            selected.append(assessment['instrument_id'])
+            spent += estimate
+        if len(selected) < len(due):
+            logger.info(f"Retrain budget {budget_seconds}s spent; deferring {len(due) - len(selected)} drifted models")
+        return selected
+
+    def is_suspended(self, instrument_id):
+        """Whether the live model has drifted too far to trade on"""
+        assessment = self.assessments.get(instrument_id)
+        return assessment is not None and assessment['suspended']
+
+    def reset(self, instrument_id):
+        """Forget outcomes, pending calls and assessment after a new version goes live"""
+        with self._lock:
+            self.outcomes.pop(instrument_id, None)
+            self.predictions = {symbol: pending for symbol, pending in self.predictions.items()
+                                if pending[0] != instrument_id}
+            self.assessments.pop(instrument_id, None)
+
+    def get_stats(self):
+        with self._lock:
+            return {instrument_id: dict(assessment) for instrument_id, assessment in self.assessments.items()}
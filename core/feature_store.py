@@ -0,0 +1,152 @@
+"""
+feature_store.py - Persistent per-instrument feature rows
+
+One fixed-size file per instrument (<root>/<SYMBOL>.features) holding the
+last `capacity` closed-bar feature rows in columnar layout:
+
+    header   int64[6]   magic, version, columns, capacity, rows appended, -
+             float64    close of the last appended bar
+    ts       int64[capacity]            bar open time
+    values   float32[columns + 1, capacity]   FEATURE_COLUMNS then target
+
+Rows are written in a ring through np.memmap, so memory and disk use per
+instrument are fixed and appends touch a handful of pages. The target of
+a row (next bar closes higher) is filled in when the next bar arrives.
+"""
+
+import os
+import threading
+import logging
+import numpy as np
+import pandas as pd
+from .indicators import FEATURE_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+MAGIC = 0x46454154
+VERSION = 1
+HEADER_BYTES = 64
+
+
+class FeatureFile:
+    def __init__(self, path, n_columns, capacity):
+        self.path = path
+        self.n_columns = n_columns
+        self.capacity = capacity
+        size = HEADER_BYTES + capacity * (8 + 4 * (n_columns + 1))
+        if not self._compatible(path, size):
+            with open(path, 'wb') as f:
+                f.truncate(size)
+            self._map()
+            self.header[:4] = (MAGIC, VERSION, n_columns, capacity)
+            self.close[0] = np.nan
+            self.values[:] = np.nan
+            self.header.flush()
+        else:
+            self._map()
+
+    def _compatible(self, path, size):
+        if not os.path.exists(path) or os.path.getsize(path) != size:
+            return False
+        header = np.fromfile(path, dtype='<i8', count=4)
+        if tuple(header) != (MAGIC, VERSION, self.n_columns, self.capacity):
+            logger.warning(f"Feature file {path} has an old layout; starting fresh")
+            return False
+        return True
+
+    def _map(self):
+        cap = self.capacity
+        self.header = np.memmap(self.path, dtype='<i8', mode='r+', offset=0, shape=(6,))
+        self.close = np.memmap(self.path, dtype='<f8', mode='r+', offset=48, shape=(1,))
+        self.ts = np.memmap(self.path, dtype='<i8', mode='r+', offset=HEADER_BYTES, shape=(cap,))
+        self.values = np.memmap(self.path, dtype='<f4', mode='r+', offset=HEADER_BYTES + 8 * cap,
+                                shape=(self.n_columns + 1, cap))
+
+    @property
+    def count(self):
+        return int(self.header[4])
+
+    def last_timestamp(self):
+        count = self.count
+        return int(self.ts[(count - 1) % self.capacity]) if count else None
+
+    def append(self, timestamp, features, close):
+        count = self.count
+        slot = count % self.capacity
+        if count:
+            previous = (count - 1) % self.capacity
+            self.values[-1, previous] = 1.0 if close > self.close[0] else 0.0
+        self.values[:-1, slot] = features
+        self.values[-1, slot] = np.nan
+        self.ts[slot] = timestamp
+        self.close[0] = close
+        # The page cache may write pages back in any order, so the row has
+        # to reach disk before the count that publishes it
+        for array in (self.values, self.ts, self.close):
+            array.flush()
+        self.header[4] = count + 1
+
+    def slots(self, n=None):
+        """Ring positions of the last n rows, oldest first"""
+        count = self.count
+        n = min(count, self.capacity) if n is None else min(n, count, self.capacity)
+        return (np.arange(count - n, count) % self.capacity)
+
+    def flush(self):
+        for array in (self.values, self.ts, self.close, self.header):
+            array.flush()
+
+
+class FeatureStore:
+    def __init__(self, root, capacity=5000, columns=FEATURE_COLUMNS):
+        self.root = root
+        self.capacity = capacity
+        self.columns = list(columns)
+        self.files = {}
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _file(self, symbol):
+        if symbol not in self.files:
+            path = os.path.join(self.root, f"{symbol}.features")
+            self.files[symbol] = FeatureFile(path, len(self.columns), self.capacity)
+        return self.files[symbol]
+
+    def append(self, symbol, timestamp, features, close):
+        """Append a closed bar's feature row; stale or duplicate bars are ignored"""
+        with self._lock:
+            store = self._file(symbol)
+            last = store.last_timestamp()
+            if last is not None and int(timestamp) <= last:
+                return False
+            store.append(int(timestamp), np.asarray(features, dtype=np.float32), close)
+            return True
+
+    def count(self, symbol):
+        with self._lock:
+            return min(self._file(symbol).count, self.capacity)
+
+    def latest(self, symbol):
+        """Most recent feature row as float32, or None"""
+        with self._lock:
+            store = self._file(symbol)
+            slots = store.slots(1)
+            return store.values[:-1, slots[0]].copy() if len(slots) else None
+
+    def dataset(self, symbol, n=None):
+        """(X, y) of the last n labelled rows, X indexed by bar timestamp"""
+        with self._lock:
+            store = self._file(symbol)
+            slots = store.slots(None if n is None else n + 1)
+            values = store.values[:, slots]
+            timestamps = store.ts[slots]
+        labelled = ~np.isnan(values[-1])
+        X = pd.DataFrame(values[:-1, labelled].T, columns=self.columns,
+                         index=pd.Index(timestamps[labelled], name='timestamp'))
+        y = pd.Series(values[-1, labelled].astype(int), index=X.index, name='Target')
+        return X, y
+
+    def flush(self):
+        with self._lock:
+            for store in self.files.values():
+                store.flush()
@@ -0,0 +1,139 @@
+"""
+history_cache.py - Incremental per-instrument candle cache
+
+Serves any `limit` of historical candles from memory and tops the cache up
+with delta fetches of only the bars newer than the last cached timestamp.
+"""
+
+import math
+import time
+import threading
+import logging
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class HistoryCache:
+    """Bounded LRU of candle lists keyed by instrument id
+
+    `fetch(instrument_id, limit)` must return candles oldest first, each a
+    dict with a 'timestamp' (bar open, seconds). Entries younger than `ttl`
+    are served as-is; older ones are refreshed with a delta fetch sized to
+    the number of bars that can have appeared since the last cached bar.
+    When the broker returns fewer bars than requested the entry is marked
+    complete and serves any larger limit too.
+    """
+
+    def __init__(self, fetch, timeframe=60, ttl=5, max_bars=1000, max_instruments=200):
+        self.fetch = fetch
+        self.timeframe = timeframe
+        self.ttl = ttl
+        self.max_bars = max_bars
+        self.max_instruments = max_instruments
+        self.entries = OrderedDict()
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'delta_fetches': 0,
+            'bars_fetched': 0,
+            'evictions': 0
+        }
+        self._lock = threading.Lock()
+        self._refresh_locks = {}
+
+    def _key_lock(self, instrument_id):
+        with self._lock:
+            return self._refresh_locks.setdefault(instrument_id, threading.Lock())
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self.stats[name] += amount
+
+    def _lookup(self, instrument_id, limit, now):
+        """(entry, fresh enough to serve `limit` from memory)"""
+        with self._lock:
+            entry = self.entries.get(instrument_id)
+            if not entry:
+                return None, False
+            self.entries.move_to_end(instrument_id)
+            covers = len(entry['bars']) >= limit or entry['complete']
+            if covers and now - entry['fetched_at'] < self.ttl:
+                self.stats['hits'] += 1
+                return entry, True
+            return entry, False
+
+    def get(self, instrument_id, limit=100):
+        """Latest `limit` candles, oldest first
+
+        Refreshes of one instrument are serialised: a caller that waited for
+        another's fetch is served from the entry it stored.
+        """
+        limit = min(limit, self.max_bars)
+        entry, fresh = self._lookup(instrument_id, limit, time.time())
+        if fresh:
+            return entry['bars'][-limit:]
+
+        with self._key_lock(instrument_id):
+            now = time.time()
+            entry, fresh = self._lookup(instrument_id, limit, now)
+            if fresh:
+                return entry['bars'][-limit:]
+            if entry and (len(entry['bars']) >= limit or entry['complete']) and 'timestamp' in entry['bars'][-1]:
+                bars = self._delta(instrument_id, entry, now)
+            else:
+                self._count('misses')
+                requested = max(limit, entry and len(entry['bars']) or 0)
+                bars = self.fetch(instrument_id, limit=requested)
+                if bars:
+                    # Fewer bars than requested: that is all the history there is
+                    self._store(instrument_id, list(bars), now, complete=len(bars) < requested)
+        return bars[-limit:] if bars else bars
+
+    def _delta(self, instrument_id, entry, now):
+        """Fetch bars since the last cached one and merge them in (refresh lock held)"""
+        cached = entry['bars']
+        last_ts = cached[-1]['timestamp']
+        missing = math.ceil((now - last_ts) / self.timeframe) + 1
+        self._count('delta_fetches')
+        fresh = self.fetch(instrument_id, limit=min(max(missing, 1), self.max_bars))
+        if not fresh:
+            return cached
+        self._count('bars_fetched', len(fresh))
+
+        # The last cached bar may have been in progress; newer data replaces it
+        first_new = fresh[0].get('timestamp', last_ts)
+        if first_new > last_ts:
+            # Gap larger than the delta window; fall back to a full reload
+            merged = self.fetch(instrument_id, limit=len(cached)) or cached
+        else:
+            merged = [bar for bar in cached if bar['timestamp'] < first_new] + list(fresh)
+        self._store(instrument_id, merged, now, complete=entry['complete'])
+        return merged
+
+    def _store(self, instrument_id, bars, now, complete=False):
+        with self._lock:
+            self.entries[instrument_id] = {
+                'bars': bars[-self.max_bars:],
+                'fetched_at': now,
+                'complete': complete
+            }
+            self.entries.move_to_end(instrument_id)
+            while len(self.entries) > self.max_instruments:
+                self.entries.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def invalidate(self, instrument_id=None):
+        with self._lock:
+            if instrument_id is None:
+                self.entries.clear()
+            else:
+                self.entries.pop(instrument_id, None)
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+        lookups = stats['hits'] + stats['misses'] + stats['delta_fetches']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        stats['instruments'] = len(self.entries)
+        return stats
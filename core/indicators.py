@@ -0,0 +1,345 @@
+"""
+indicators.py - Incremental technical indicators
+
+Keeps the EMA/RSI/MACD state per instrument so a new bar costs O(1) instead
+of recomputing the whole frame. The recurrences replicate the pandas
+`ewm(adjust=False)` arithmetic used by the `ta` library step for step, so
+streaming values are identical to the batch computation.
+"""
+
+import json
+import math
+import os
+import threading
+import logging
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from .breakout import BreakoutDetector
+
+logger = logging.getLogger(__name__)
+
+NAN = float('nan')
+
+INDICATOR_COLUMNS = ['ema5', 'ema20', 'rsi6', 'macd', 'macd_signal', 'macd_hist']
+FEATURE_COLUMNS = INDICATOR_COLUMNS + ['price_change', 'volatility']
+BREAKOUT_LOOKBACK = 20
+
+
+class EWMState:
+    """Exponentially weighted mean, equivalent to pandas ewm(adjust=False)"""
+
+    def __init__(self, span=None, alpha=None, min_periods=0):
+        com = (span - 1) / 2 if span is not None else (1 - alpha) / alpha
+        self.alpha = 1.0 / (1.0 + com)
+        self.old_wt = 1.0 - self.alpha
+        self.min_periods = min_periods
+        self.value = NAN
+        self.nobs = 0
+
+    def step(self, x):
+        """Return the (value, nobs) after observing x without mutating state"""
+        if x != x:
+            return self.value, self.nobs
+        if self.value != self.value:
+            return x, self.nobs + 1
+        value = self.value
+        if value != x:
+            value = (self.old_wt * value + self.alpha * x) / (self.old_wt + self.alpha)
+        return value, self.nobs + 1
+
+    def update(self, x):
+        self.value, self.nobs = self.step(x)
+        return self.output(self.value, self.nobs)
+
+    def output(self, value, nobs):
+        return value if nobs >= self.min_periods else NAN
+
+
+class StreamingIndicators:
+    """EMA5/EMA20, RSI6 and MACD(12, 26, 9) plus the model's price features"""
+
+    def __init__(self):
+        self.ema5 = EWMState(span=5, min_periods=5)
+        self.ema20 = EWMState(span=20, min_periods=20)
+        self.rsi_up = EWMState(alpha=1 / 6, min_periods=6)
+        self.rsi_down = EWMState(alpha=1 / 6, min_periods=6)
+        self.ema12 = EWMState(span=12, min_periods=12)
+        self.ema26 = EWMState(span=26, min_periods=26)
+        self.signal = EWMState(span=9, min_periods=9)
+        self.breakout = BreakoutDetector(BREAKOUT_LOOKBACK)
+        self.prev_close = NAN
+        self.last_timestamp = None
+        self.bars = 0
+        self.values = dict.fromkeys(FEATURE_COLUMNS, NAN)
+        self.values['breakout'] = 0
+
+    def _compute(self, close, high, low, commit):
+        states = [self.ema5, self.ema20, self.rsi_up, self.rsi_down, self.ema12, self.ema26]
+        diff = close - self.prev_close
+        up = diff if diff > 0 else 0.0
+        down = -diff if diff < 0 else -0.0
+        inputs = [close, close, up, down, close, close]
+
+        outputs = []
+        for state, x in zip(states, inputs):
+            value, nobs = state.step(x)
+            if commit:
+                state.value, state.nobs = value, nobs
+            outputs.append(state.output(value, nobs))
+        ema5, ema20, emaup, emadn, fast, slow = outputs
+
+        macd = fast - slow
+        value, nobs = self.signal.step(macd)
+        if commit:
+            self.signal.value, self.signal.nobs = value, nobs
+        signal = self.signal.output(value, nobs)
+
+        if emadn != emadn:
+            rsi = NAN
+        elif emadn == 0:
+            rsi = 100.0
+        else:
+            rsi = 100 - (100 / (1 + emaup / emadn))
+
+        return {
+            'ema5': ema5,
+            'ema20': ema20,
+            'rsi6': rsi,
+            'macd': macd,
+            'macd_signal': signal,
+            'macd_hist': macd - signal,
+            'price_change': close / self.prev_close - 1,
+            'volatility': high - low,
+            'breakout': self.breakout.classify(close)
+        }
+
+    def update(self, close, high=None, low=None, timestamp=None):
+        """Fold a closed bar into the state and return its indicator values"""
+        high = close if high is None else high
+        low = close if low is None else low
+        self.values = self._compute(close, high, low, commit=True)
+        self.breakout.update(high, low, close)
+        self.prev_close = close
+        self.last_timestamp = timestamp
+        self.bars += 1
+        return self.values
+
+    def peek(self, close, high=None, low=None):
+        """Indicator values for a bar still in progress, leaving state untouched"""
+        high = close if high is None else high
+        low = close if low is None else low
+        return self._compute(close, high, low, commit=False)
+
+    def seed(self, bars):
+        """Replay historical bars (dicts with close/high/low/timestamp)"""
+        for bar in bars:
+            self.update(bar['close'], bar.get('high'), bar.get('low'), bar.get('timestamp'))
+        return self.values
+
+    def features(self, values=None):
+        values = values or self.values
+        return [values[column] for column in FEATURE_COLUMNS]
+
+    def ready(self):
+        return all(not math.isnan(self.values[column]) for column in FEATURE_COLUMNS)
+
+    def state(self):
+        """JSON-serialisable checkpoint"""
+        ewms = {name: [getattr(self, name).value, getattr(self, name).nobs]
+                for name in ('ema5', 'ema20', 'rsi_up', 'rsi_down', 'ema12', 'ema26', 'signal')}
+        return {
+            'ewm': ewms,
+            'breakout': self.breakout.state(),
+            'prev_close': self.prev_close,
+            'last_timestamp': self.last_timestamp,
+            'bars': self.bars,
+            'values': self.values
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        indicators = cls()
+        for name, (value, nobs) in state['ewm'].items():
+            ewm = getattr(indicators, name)
+            ewm.value, ewm.nobs = value, nobs
+        # Checkpoints written before breakout tracking have no detector;
+        # a fresh one reports neutral until it has seen `lookback` bars
+        if 'breakout' in state:
+            indicators.breakout = BreakoutDetector.from_state(state['breakout'])
+        indicators.prev_close = state['prev_close']
+        indicators.last_timestamp = state['last_timestamp']
+        indicators.bars = state['bars']
+        indicators.values = dict(state['values'])
+        indicators.values.setdefault('breakout', 0)
+        return indicators
+
+
+class IndicatorEngine:
+    """StreamingIndicators per instrument with checkpointing"""
+
+    def __init__(self):
+        self.instruments = {}
+        self._lock = threading.RLock()
+
+    def get(self, instrument):
+        with self._lock:
+            if instrument not in self.instruments:
+                self.instruments[instrument] = StreamingIndicators()
+            return self.instruments[instrument]
+
+    def on_bar(self, instrument, bar):
+        """Feed a closed bar; bars at or before the last one seen are ignored"""
+        with self._lock:
+            indicators = self.get(instrument)
+            last = indicators.last_timestamp
+            if last is not None and bar.get('timestamp') is not None and bar['timestamp'] <= last:
+                return indicators.values
+            return indicators.update(bar['close'], bar.get('high'), bar.get('low'), bar.get('timestamp'))
+
+    def values_for(self, instrument, bars):
+        """Latest indicator values for a candle list whose last bar may be in progress
+
+        Only bars newer than the state are folded in, so a warm instrument
+        costs O(new bars). The state is re-seeded when the bars no longer
+        overlap it (first run, gaps, or bars without timestamps).
+        """
+        if not bars:
+            return None
+        with self._lock:
+            indicators = self.get(instrument)
+            closed, current = bars[:-1], bars[-1]
+            last = indicators.last_timestamp
+            timestamps_known = last is not None and current.get('timestamp') is not None
+            if not timestamps_known or bars[0]['timestamp'] > last:
+                indicators = self.instruments[instrument] = StreamingIndicators()
+                indicators.seed(closed)
+            else:
+                for bar in closed:
+                    if bar['timestamp'] > indicators.last_timestamp:
+                        indicators.update(bar['close'], bar.get('high'), bar.get('low'), bar['timestamp'])
+
+            if indicators.last_timestamp is not None and current.get('timestamp') == indicators.last_timestamp:
+                return indicators.values
+            return indicators.peek(current['close'], current.get('high'), current.get('low'))
+
+    def features_for(self, instrument, bars):
+        """Latest feature row (FEATURE_COLUMNS order) for a candle list"""
+        values = self.values_for(instrument, bars)
+        return [values[column] for column in FEATURE_COLUMNS] if values else None
+
+    def save(self, path):
+        """Write a checkpoint of every instrument's state"""
+        with self._lock:
+            states = {name: ind.state() for name, ind in self.instruments.items()}
+        tmp = f"{path}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(states, f)
+        os.replace(tmp, path)
+
+    def load(self, path):
+        """Restore states from a checkpoint, if present"""
+        if not os.path.exists(path):
+            return False
+        try:
+            with open(path) as f:
+                states = json.load(f)
+            with self._lock:
+                self.instruments = {name: StreamingIndicators.from_state(state)
+                                    for name, state in states.items()}
+            return True
+        except Exception as e:
+            logger.error(f"Error loading indicator checkpoint: {str(e)}")
+            return False
+
+
+def ewm_panel(values, span=None, alpha=None, min_periods=0):
+    """pandas ewm(adjust=False).mean() along axis 1 of an (instruments x bars) panel
+
+    Rows may be left-padded with NaN for instruments with shorter history;
+    each row starts at its first valid value, exactly like the 1-D case.
+    """
+    ewm = EWMState(span=span, alpha=alpha)
+    alpha, old_wt = ewm.alpha, ewm.old_wt
+    out = np.full(values.shape, np.nan)
+    weighted = values[:, 0].copy()
+    nobs = (~np.isnan(weighted)).astype(np.int64)
+    out[:, 0] = np.where(nobs >= min_periods, weighted, np.nan)
+    with np.errstate(invalid='ignore'):
+        for t in range(1, values.shape[1]):
+            x = values[:, t]
+            observed = ~np.isnan(x)
+            started = ~np.isnan(weighted)
+            blended = (old_wt * weighted + alpha * x) / (old_wt + alpha)
+            weighted = np.where(started & observed & (weighted != x), blended, weighted)
+            weighted = np.where(~started & observed, x, weighted)
+            nobs += observed
+            out[:, t] = np.where(nobs >= min_periods, weighted, np.nan)
+    return out
+
+
+def rolling_extreme_panel(values, window, fn):
+    """fn (np.max / np.min) over the `window` bars before each bar"""
+    out = np.full(values.shape, np.nan)
+    if values.shape[1] > window:
+        out[:, window:] = fn(sliding_window_view(values, window, axis=1)[:, :-1], axis=2)
+    return out
+
+
+def compute_indicator_panel(close, high=None, low=None, lookback=BREAKOUT_LOOKBACK):
+    """Vectorized indicators for every instrument at once
+
+    Takes aligned (instruments x bars) arrays and returns a dict of arrays of
+    the same shape for every FEATURE_COLUMNS entry plus the breakout
+    features (resistance, support, breakout = +1 bullish / -1 bearish / 0).
+    """
+    close = np.asarray(close, dtype=np.float64)
+    high = close if high is None else np.asarray(high, dtype=np.float64)
+    low = close if low is None else np.asarray(low, dtype=np.float64)
+    valid = ~np.isnan(close)
+
+    diff = np.full(close.shape, np.nan)
+    diff[:, 1:] = close[:, 1:] - close[:, :-1]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        up = np.where(valid, np.where(diff > 0, diff, 0.0), np.nan)
+        down = np.where(valid, np.where(diff < 0, -diff, -0.0), np.nan)
+        emaup = ewm_panel(up, alpha=1 / 6, min_periods=6)
+        emadn = ewm_panel(down, alpha=1 / 6, min_periods=6)
+        rsi = np.where(emadn == 0, 100.0, 100 - (100 / (1 + emaup / emadn)))
+
+        macd = (ewm_panel(close, span=12, min_periods=12)
+                - ewm_panel(close, span=26, min_periods=26))
+        macd_signal = ewm_panel(macd, span=9, min_periods=9)
+
+        price_change = np.full(close.shape, np.nan)
+        price_change[:, 1:] = close[:, 1:] / close[:, :-1] - 1
+
+        resistance = rolling_extreme_panel(high, lookback, np.max)
+        support = rolling_extreme_panel(low, lookback, np.min)
+        breakout = np.where(close > resistance, 1, np.where(close < support, -1, 0))
+
+    return {
+        'ema5': ewm_panel(close, span=5, min_periods=5),
+        'ema20': ewm_panel(close, span=20, min_periods=20),
+        'rsi6': rsi,
+        'macd': macd,
+        'macd_signal': macd_signal,
+        'macd_hist': macd - macd_signal,
+        'price_change': price_change,
+        'volatility': high - low,
+        'resistance': resistance,
+        'support': support,
+        'breakout': breakout
+    }
+
+
+def indicator_history(bars, lookback=BREAKOUT_LOOKBACK):
+    """Indicator series over a whole candle list in one vectorized pass
+
+    Returns the compute_indicator_panel dict for a single instrument, each
+    value an array with one entry per bar. Used to turn downloaded history
+    into training rows without replaying it through the streaming state.
+    """
+    close = np.array([[bar['close'] for bar in bars]], dtype=np.float64)
+    high = np.array([[bar.get('high', bar['close']) for bar in bars]], dtype=np.float64)
+    low = np.array([[bar.get('low', bar['close']) for bar in bars]], dtype=np.float64)
+    return {name: series[0] for name, series in compute_indicator_panel(close, high, low, lookback).items()}
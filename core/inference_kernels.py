@@ -0,0 +1,261 @@
+"""
+inference_kernels.py - Pure-NumPy evaluators for exported models
+
+Trained estimators are exported once into plain arrays (MLP weight
+matrices, XGBoost trees flattened into node arrays) and evaluated here
+without sklearn/xgboost input validation or DMatrix construction. Both
+kernels reproduce the original arithmetic operation for operation, so
+their outputs are bit-identical to predict / predict_proba.
+
+Kernels expose classes_, predict and predict_proba, so they can stand in
+for the estimator they were exported from. StackedMLPKernel evaluates
+several same-shaped MLP kernels (one per instrument) in one batched pass.
+"""
+
+import json
+import math
+import ctypes
+import ctypes.util
+import numpy as np
+
+# NumPy's vectorized exp may differ from the C library's exp/expf in the
+# last ulp, while scipy's expit (used by sklearn) and xgboost's sigmoid
+# call the latter, so the sigmoids below go through libm as well
+_libm_exp = np.frompyfunc(math.exp, 1, 1)
+
+
+def _load_expf():
+    try:
+        expf = ctypes.CDLL(ctypes.util.find_library('m') or 'libm.so.6').expf
+    except (OSError, AttributeError):
+        return None
+    expf.restype = ctypes.c_float
+    expf.argtypes = [ctypes.c_float]
+    return np.frompyfunc(expf, 1, 1)
+
+
+_libm_expf = _load_expf()
+
+
+def _relu(x):
+    return np.maximum(x, 0, out=x)
+
+
+def _logistic(x):
+    x[...] = 1 / (1 + _libm_exp(-x).astype(np.float64))
+    return x
+
+
+def _softmax(x):
+    x -= x.max(axis=1)[:, np.newaxis]
+    np.exp(x, out=x)
+    x /= x.sum(axis=1)[:, np.newaxis]
+    return x
+
+
+ACTIVATIONS = {
+    'identity': lambda x: x,
+    'relu': _relu,
+    'tanh': lambda x: np.tanh(x, out=x),
+    'logistic': _logistic,
+    'softmax': _softmax
+}
+
+
+class MLPKernel:
+    """Forward pass of a fitted MLPClassifier"""
+
+    def __init__(self, coefs, intercepts, activation, out_activation, classes):
+        self.coefs = [np.ascontiguousarray(c, dtype=np.float64) for c in coefs]
+        self.intercepts = [np.ascontiguousarray(b, dtype=np.float64) for b in intercepts]
+        self.activation = ACTIVATIONS[activation]
+        self.out_activation = ACTIVATIONS[out_activation]
+        self.classes_ = np.asarray(classes)
+
+    @classmethod
+    def export(cls, model):
+        return cls(model.coefs_, model.intercepts_, model.activation,
+                   model.out_activation_, model.classes_)
+
+    def _forward(self, X):
+        activation = np.asarray(X, dtype=np.float64)
+        if activation.ndim == 1:
+            activation = activation.reshape(1, -1)
+        last = len(self.coefs) - 1
+        for i, (coef, intercept) in enumerate(zip(self.coefs, self.intercepts)):
+            activation = activation @ coef
+            activation += intercept
+            if i != last:
+                self.activation(activation)
+        return self.out_activation(activation)
+
+    def predict_proba(self, X):
+        y = self._forward(X)
+        if y.shape[1] == 1:
+            y = y.ravel()
+            return np.vstack([1 - y, y]).T
+        return y
+
+    def predict(self, X):
+        y = self._forward(X)
+        if y.shape[1] == 1:
+            return self.classes_[(y.ravel() > 0.5).astype(int)]
+        return self.classes_[y.argmax(axis=1)]
+
+
+class StackedMLPKernel:
+    """Same-shaped MLPKernels evaluated together, one model per input row
+
+    Layer weights are stacked into (models, fan_in, fan_out) arrays, so
+    scoring one row for each of N instruments costs one batched matmul per
+    layer instead of N forward passes. Results match the individual kernels
+    up to floating-point rounding of the batched matmul.
+    """
+
+    def __init__(self, kernels):
+        first = kernels[0]
+        self.kernels = tuple(kernels)
+        self.coefs = [np.stack([kernel.coefs[i] for kernel in kernels]) for i in range(len(first.coefs))]
+        self.intercepts = [np.stack([kernel.intercepts[i] for kernel in kernels])[:, np.newaxis, :]
+                           for i in range(len(first.intercepts))]
+        self.activation = first.activation
+        self.out_activation = first.out_activation
+        self.classes_ = first.classes_
+
+    @staticmethod
+    def signature(kernel):
+        """Kernels with equal signatures can be stacked"""
+        return (tuple(coef.shape for coef in kernel.coefs), kernel.activation,
+                kernel.out_activation, tuple(kernel.classes_.tolist()))
+
+    def predict_proba(self, X, index=None):
+        """Row i is scored by model index[i] (by model i when index is None)"""
+        activation = np.asarray(X, dtype=np.float64)[:, np.newaxis, :]
+        last = len(self.coefs) - 1
+        for i, (coef, intercept) in enumerate(zip(self.coefs, self.intercepts)):
+            if index is not None:
+                coef, intercept = coef[index], intercept[index]
+            activation = activation @ coef
+            activation += intercept
+            if i != last:
+                self.activation(activation)
+        y = self.out_activation(activation[:, 0, :])
+        if y.shape[1] == 1:
+            y = y.ravel()
+            return np.vstack([1 - y, y]).T
+        return y
+
+
+class TreeEnsembleKernel:
+    """Binary-logistic gradient-boosted trees flattened into node arrays
+
+    All trees share one set of arrays; node ids are offset per tree and
+    leaves point to themselves, so evaluation is `depth` vectorized steps
+    over a (rows, trees) matrix of node ids.
+    """
+
+    def __init__(self, feature, threshold, left, right, default_left, value,
+                 roots, depth, base_margin, classes):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.default_left = default_left
+        self.value = value
+        self.roots = roots
+        self.depth = depth
+        self.base_margin = base_margin
+        self.classes_ = np.asarray(classes)
+
+    @classmethod
+    def export(cls, model):
+        """Flatten an XGBClassifier; None if its configuration is unsupported"""
+        booster = model.get_booster()
+        config = json.loads(booster.save_raw('json'))['learner']
+        gbtree = config['gradient_booster']
+        if gbtree['name'] != 'gbtree' or config['objective']['name'] != 'binary:logistic':
+            return None
+        trees = gbtree['model']['trees']
+        if any(any(tree['split_type']) for tree in trees):
+            return None  # categorical splits
+
+        # predict() uses trees up to best_iteration
+        try:
+            per_iteration = int(gbtree['model']['gbtree_model_param']['num_parallel_tree'])
+            trees = trees[:(model.best_iteration + 1) * per_iteration]
+        except AttributeError:
+            pass
+
+        feature, threshold, left, right, default_left, roots, depth = [], [], [], [], [], [], 0
+        offset = 0
+        for tree in trees:
+            tree_left = np.asarray(tree['left_children'], dtype=np.int64)
+            tree_right = np.asarray(tree['right_children'], dtype=np.int64)
+            nodes = np.arange(len(tree_left))
+            leaf = tree_left == -1
+            roots.append(offset)
+            feature.append(np.where(leaf, 0, tree['split_indices']))
+            threshold.append(tree['split_conditions'])
+            left.append(np.where(leaf, nodes, tree_left) + offset)
+            right.append(np.where(leaf, nodes, tree_right) + offset)
+            default_left.append(tree['default_left'])
+            depth = max(depth, cls._depth(tree_left, tree_right))
+            offset += len(tree_left)
+
+        # Leaf values live in split_conditions, like in the JSON model
+        conditions = np.concatenate(threshold).astype(np.float32)
+        base_score = np.float32(float(config['learner_model_param']['base_score']))
+        base_margin = -np.log(np.float32(1) / base_score - np.float32(1))
+        return cls(
+            feature=np.concatenate(feature).astype(np.int64),
+            threshold=conditions,
+            left=np.concatenate(left),
+            right=np.concatenate(right),
+            default_left=np.concatenate(default_left).astype(bool),
+            value=conditions,
+            roots=np.asarray(roots, dtype=np.int64),
+            depth=depth,
+            base_margin=np.float32(base_margin),
+            classes=model.classes_
+        )
+
+    @staticmethod
+    def _depth(left, right):
+        depth, frontier = 0, [0]
+        while True:
+            children = [c for n in frontier for c in (left[n], right[n]) if c != -1]
+            if not children:
+                return depth
+            depth += 1
+            frontier = children
+
+    def margin(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        rows = np.arange(len(X))[:, np.newaxis]
+        node = np.broadcast_to(self.roots, (len(X), len(self.roots))).copy()
+        for _ in range(self.depth):
+            x = X[rows, self.feature[node]]
+            go_left = np.where(np.isnan(x), self.default_left[node], x < self.threshold[node])
+            node = np.where(go_left, self.left[node], self.right[node])
+        # Sequential float32 accumulation, in tree order, like xgboost
+        leaves = np.concatenate(
+            [np.full((len(X), 1), self.base_margin, dtype=np.float32), self.value[node]], axis=1)
+        return np.cumsum(leaves, axis=1, dtype=np.float32)[:, -1]
+
+    def _probability(self, X):
+        margin = -self.margin(X)
+        if _libm_expf is not None:
+            e = _libm_expf(margin).astype(np.float32)
+        else:
+            # Correctly rounded fallback; may differ from libm by one ulp
+            e = np.exp(margin.astype(np.float64)).astype(np.float32)
+        return np.float32(1) / (np.float32(1) + e)
+
+    def predict_proba(self, X):
+        y = self._probability(X)
+        return np.vstack([1 - y, y]).T
+
+    def predict(self, X):
+        return self.classes_[(self._probability(X) > 0.5).astype(int)]
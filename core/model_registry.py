@@ -0,0 +1,166 @@
+"""
+model_registry.py - Versioned, immutable model artifacts
+
+Layout, one directory per instrument:
+
+    <root>/<instrument>/v000001.pkl    estimator (never rewritten)
+    <root>/<instrument>/v000001.json   metadata (accuracy, duration, schema, window)
+    <root>/<instrument>/CURRENT        name of the live version
+
+Every file is written to a temp file, fsynced and renamed into place, so a
+crash leaves either the previous or the new state. Promoting or rolling
+back a version only rewrites the CURRENT pointer.
+
+Online checkpoints (metadata source='online') are pruned separately from
+trained versions, so frequent checkpoints never push the last retrains out
+of the registry.
+"""
+
+import os
+import json
+import time
+import shutil
+import tempfile
+import threading
+import logging
+import joblib
+
+logger = logging.getLogger(__name__)
+
+POINTER = "CURRENT"
+
+
+def _atomic_write(path, write):
+    """Write via write(fileobj) to a temp file in the same directory, then rename"""
+    directory = os.path.dirname(path)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def version_name(number):
+    return f"v{number:06d}"
+
+
+class ModelRegistry:
+    def __init__(self, root, keep=5):
+        self.root = root
+        self.keep = keep
+        self._current = {}
+        self._metadata = {}
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _dir(self, instrument_id):
+        return os.path.join(self.root, instrument_id.replace('/', '_'))
+
+    def artifact_path(self, instrument_id, version):
+        return os.path.join(self._dir(instrument_id), f"{version}.pkl")
+
+    def versions(self, instrument_id):
+        """Published versions, oldest first"""
+        directory = self._dir(instrument_id)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(name[:-4] for name in os.listdir(directory)
+                      if name.startswith('v') and name.endswith('.pkl'))
+
+    def current(self, instrument_id):
+        """Live version name, or None; reads a single small pointer file"""
+        if instrument_id not in self._current:
+            try:
+                with open(os.path.join(self._dir(instrument_id), POINTER)) as f:
+                    self._current[instrument_id] = f.read().strip() or None
+            except FileNotFoundError:
+                self._current[instrument_id] = None
+        return self._current[instrument_id]
+
+    def current_path(self, instrument_id):
+        version = self.current(instrument_id)
+        return self.artifact_path(instrument_id, version) if version else None
+
+    def metadata(self, instrument_id, version=None):
+        """Metadata of a version ({} if none); read once, versions are immutable"""
+        version = version or self.current(instrument_id)
+        if not version:
+            return {}
+        key = (instrument_id, version)
+        if key not in self._metadata:
+            try:
+                with open(os.path.join(self._dir(instrument_id), f"{version}.json")) as f:
+                    self._metadata[key] = json.load(f)
+            except FileNotFoundError:
+                return {}
+        return self._metadata[key]
+
+    def publish(self, instrument_id, model=None, metadata=None, source=None, promote=True):
+        """Store a new immutable version (from an estimator or an existing file)"""
+        directory = self._dir(instrument_id)
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            existing = self.versions(instrument_id)
+            number = int(existing[-1][1:]) + 1 if existing else 1
+            version = version_name(number)
+            if source:
+                with open(source, 'rb') as src:
+                    _atomic_write(self.artifact_path(instrument_id, version),
+                                  lambda f: shutil.copyfileobj(src, f))
+            else:
+                _atomic_write(self.artifact_path(instrument_id, version),
+                              lambda f: joblib.dump(model, f))
+            meta = json.dumps(dict(metadata or {}, version=version, created=time.time()), default=str)
+            _atomic_write(os.path.join(directory, f"{version}.json"), lambda f: f.write(meta.encode()))
+            self._metadata[(instrument_id, version)] = json.loads(meta)
+            if promote:
+                self._set_current(instrument_id, version)
+            self._prune(instrument_id)
+        logger.info(f"Published {instrument_id} {version}")
+        return version
+
+    def promote(self, instrument_id, version):
+        """Point CURRENT at an already published version"""
+        if not os.path.exists(self.artifact_path(instrument_id, version)):
+            raise ValueError(f"Unknown version {version} for {instrument_id}")
+        with self._lock:
+            self._set_current(instrument_id, version)
+
+    def rollback(self, instrument_id):
+        """Promote the version published before the current one; returns it or None"""
+        current = self.current(instrument_id)
+        older = [v for v in self.versions(instrument_id) if current is None or v < current]
+        if not older:
+            return None
+        self.promote(instrument_id, older[-1])
+        logger.warning(f"Rolled back {instrument_id} from {current} to {older[-1]}")
+        return older[-1]
+
+    def _set_current(self, instrument_id, version):
+        _atomic_write(os.path.join(self._dir(instrument_id), POINTER),
+                      lambda f: f.write(version.encode()))
+        self._current[instrument_id] = version
+
+    def _prune(self, instrument_id):
+        """Drop the oldest trained versions and the oldest online checkpoints
+        beyond `keep` each, never the live one"""
+        if not self.keep:
+            return
+        current = self.current(instrument_id)
+        versions = self.versions(instrument_id)
+        online = [v for v in versions if self.metadata(instrument_id, v).get('source') == 'online']
+        trained = [v for v in versions if v not in online]
+        stale = [v for v in trained[:-self.keep] + online[:-self.keep] if v != current]
+        directory = self._dir(instrument_id)
+        for version in stale:
+            for suffix in ('.pkl', '.json'):
+                path = os.path.join(directory, version + suffix)
+                if os.path.exists(path):
+                    os.remove(path)
+            self._metadata.pop((instrument_id, version), None)
@@ -0,0 +1,111 @@
+"""
+online_learning.py - Asynchronous replay-buffer online learning
+
+Closed-trade outcomes are queued from the trade path and applied on a
+worker thread: each instrument keeps a bounded replay buffer of labelled
+feature rows, and every `batch_size` new outcomes trigger one incremental
+mini-batch update mixing the new rows with a random replay sample.
+Checkpoints to disk are debounced to at most one per `checkpoint_interval`
+seconds per instrument.
+"""
+
+import time
+import queue
+import random
+import threading
+import logging
+from collections import deque
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class OnlineLearner:
+    def __init__(self, batch_size=8, replay_size=32, buffer_size=2000, checkpoint_interval=300):
+        self.batch_size = batch_size
+        self.replay_size = replay_size
+        self.buffer_size = buffer_size
+        self.checkpoint_interval = checkpoint_interval
+        self.buffers = {}
+        self.new_samples = {}
+        self.models = {}
+        self.dirty = set()
+        self.last_checkpoint = {}
+        self.stats = {'samples': 0, 'updates': 0, 'checkpoints': 0, 'errors': 0}
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="online-learner", daemon=True)
+        self._thread.start()
+
+    def submit(self, ai_model, features, target):
+        """Queue a labelled outcome; never blocks the caller"""
+        self._queue.put((ai_model, np.asarray(features, dtype=np.float64), target))
+
+    def stop(self, timeout=30):
+        """Apply queued outcomes and write pending checkpoints"""
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=1)
+            except queue.Empty:
+                self._checkpoint_due()
+                continue
+            if item is _STOP:
+                self._checkpoint_due(force=True)
+                return
+            try:
+                self._add(*item)
+            except Exception as e:
+                self.stats['errors'] += 1
+                logger.error(f"Online learning error: {str(e)}")
+            self._checkpoint_due()
+
+    def _add(self, ai_model, features, target):
+        instrument_id = ai_model.instrument_id
+        if instrument_id not in self.buffers:
+            self.buffers[instrument_id] = deque(maxlen=self.buffer_size)
+            self.new_samples[instrument_id] = 0
+        self.models[instrument_id] = ai_model
+        if np.isnan(features).any():
+            return
+        self.buffers[instrument_id].append((features, target))
+        self.new_samples[instrument_id] += 1
+        self.stats['samples'] += 1
+
+        if self.new_samples[instrument_id] >= self.batch_size:
+            self._train(ai_model, instrument_id)
+
+    def _train(self, ai_model, instrument_id):
+        buffer = self.buffers[instrument_id]
+        fresh = self.new_samples[instrument_id]
+        self.new_samples[instrument_id] = 0
+        history = list(buffer)[:-fresh]
+        batch = list(buffer)[-fresh:] + random.sample(history, min(self.replay_size, len(history)))
+        X = np.vstack([features for features, _ in batch])
+        y = np.array([target for _, target in batch])
+        if ai_model.update(X, y):
+            self.dirty.add(instrument_id)
+            self.stats['updates'] += 1
+
+    def _checkpoint_due(self, force=False):
+        now = time.monotonic()
+        for instrument_id in list(self.dirty):
+            if force or now - self.last_checkpoint.get(instrument_id, float('-inf')) >= self.checkpoint_interval:
+                try:
+                    self.models[instrument_id].save()
+                    self.stats['checkpoints'] += 1
+                except Exception as e:
+                    self.stats['errors'] += 1
+                    logger.error(f"Checkpoint error for {instrument_id}: {str(e)}")
+                self.last_checkpoint[instrument_id] = now
+                self.dirty.discard(instrument_id)
+
+    def get_stats(self):
+        stats = dict(self.stats)
+        stats['queue_depth'] = self._queue.qsize()
+        stats['buffered'] = {k: len(v) for k, v in self.buffers.items()}
+        return stats
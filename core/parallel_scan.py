@@ -0,0 +1,108 @@
+"""
+parallel_scan.py - Bounded fan-out of per-instrument scan work
+
+Preparing a signal (candles or history, indicators, sentiment) is mostly
+waiting on I/O, so a scan submits one job per instrument to a fixed pool
+and keeps whatever has finished when the scan deadline passes. Jobs that
+miss it are counted as late and their results dropped; the instrument is
+skipped by later scans until its job returns, so a stalled instrument
+never holds more than one worker. Every job's duration is recorded per
+instrument, late ones included, to show which symbols dominate scan time.
+"""
+
+import time
+import threading
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class ScanPool:
+    def __init__(self, prepare, workers=8, deadline=10.0, timing_samples=100):
+        self.prepare = prepare
+        self.deadline = deadline
+        self.timing_samples = timing_samples
+        self.timings = {}
+        self.busy = set()
+        self.last_scan_seconds = None
+        self.stats = {'scans': 0, 'submitted': 0, 'finished': 0, 'late': 0, 'busy': 0, 'errors': 0}
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scan")
+        self._lock = threading.Lock()
+
+    def run(self, instruments, finished=None):
+        """(instrument, result) for the jobs finished by the deadline, in input order
+
+        Jobs returning None (nothing to trade on) are left out. If given,
+        `finished` is extended with the ids of every instrument whose job
+        completed by the deadline, including those left out.
+        """
+        started = time.monotonic()
+        futures = {}
+        with self._lock:
+            self.stats['scans'] += 1
+            for instrument in instruments:
+                if instrument['id'] in self.busy:
+                    self.stats['busy'] += 1
+                    continue
+                self.busy.add(instrument['id'])
+                futures[self._pool.submit(self._timed, instrument)] = instrument
+            self.stats['submitted'] += len(futures)
+
+        done, late = wait(futures, timeout=self.deadline)
+        if late:
+            with self._lock:
+                self.stats['late'] += len(late)
+            symbols = sorted(futures[future]['symbol'] for future in late)
+            logger.warning(f"Scan deadline {self.deadline}s missed by {len(late)} of {len(futures)} "
+                           f"instruments: {', '.join(symbols[:10])}")
+
+        results = []
+        for future, instrument in futures.items():
+            if future in done:
+                if finished is not None:
+                    finished.append(instrument['id'])
+                result = future.result()
+                if result is not None:
+                    results.append((instrument, result))
+        self.last_scan_seconds = time.monotonic() - started
+        return results
+
+    def _timed(self, instrument):
+        start = time.monotonic()
+        try:
+            return self.prepare(instrument)
+        except Exception as e:
+            with self._lock:
+                self.stats['errors'] += 1
+            logger.error(f"Scan error for {instrument['symbol']}: {str(e)}")
+            return None
+        finally:
+            elapsed = time.monotonic() - start
+            with self._lock:
+                self.busy.discard(instrument['id'])
+                self.stats['finished'] += 1
+                if instrument['symbol'] not in self.timings:
+                    self.timings[instrument['symbol']] = deque(maxlen=self.timing_samples)
+                self.timings[instrument['symbol']].append(elapsed)
+
+    def slowest(self, n=5):
+        """[(symbol, mean ms, max ms)] of the n instruments with the highest mean time"""
+        with self._lock:
+            timings = {symbol: np.array(samples) * 1000 for symbol, samples in self.timings.items()}
+        ranked = sorted(timings.items(), key=lambda item: item[1].mean(), reverse=True)[:n]
+        return [(symbol, round(samples.mean(), 1), round(samples.max(), 1)) for symbol, samples in ranked]
+
+    def get_stats(self):
+        """Counters, last scan duration and the slowest instruments"""
+        with self._lock:
+            stats = dict(self.stats)
+        if self.last_scan_seconds is not None:
+            stats['last_scan_ms'] = round(self.last_scan_seconds * 1000, 1)
+        stats['slowest'] = self.slowest()
+        return stats
+
+    def stop(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -8,23 +8,43 @@ import logging
 import sqlite3
 from config import settings
 from data.historical.realtime_store import RealTimeStore
+from .tick_buffer import TickBufferSet, symbol_for
+from .candle_aggregator import CandleAggregator
+from .history_cache import HistoryCache
+from .rest_client import SingleFlight, create_session
 
-logger = logging.getLogger(_name_)
+logger = logging.getLogger(__name__)
 
 class PocketOptionAPI:
-    def _init_(self):
+    def __init__(self):
         self.base_url = "https://api.pocketoption.com"
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.session = create_session({
             'Authorization': f'Bearer {settings.API_KEYS["POCKET_OPTION"]}'
         })
+        self.single_flight = SingleFlight()
         self.demo_mode = settings.SETTINGS["DEMO_MODE"]
         self.ws = None
-        self.realtime_prices = {}
+        self.tick_buffers = TickBufferSet(settings.SETTINGS["TICK_BUFFER_SIZE"])
+        self.candles = CandleAggregator(
+            timeframes=settings.SETTINGS["CANDLE_TIMEFRAMES"],
+            max_bars=settings.SETTINGS["CANDLE_HISTORY"]
+        )
+        self.history = HistoryCache(
+            self.fetch_history,
+            timeframe=settings.SETTINGS["CANDLE_TIMEFRAMES"][0],
+            ttl=settings.SETTINGS["HISTORY_CACHE_TTL"],
+            max_bars=settings.SETTINGS["HISTORY_CACHE_BARS"],
+            max_instruments=settings.SETTINGS["HISTORY_CACHE_INSTRUMENTS"]
+        )
+        self.tick_listeners = []
         self.ws_thread = None
         self.ws_connected = False
         self.data_store = RealTimeStore()
         
+    def add_tick_listener(self, callback):
+        """Register callback(symbol, timestamp, price) for every streamed tick"""
+        self.tick_listeners.append(callback)
+    
     def start_websocket(self):
         """Start WebSocket connection for real-time prices"""
         if self.demo_mode:
@@ -35,31 +55,11 @@ class PocketOptionAPI:
             logger.info("WebSocket connection opened")
             self.ws_connected = True
             # Subscribe to all OTC instruments
-            instruments = self.get_instruments()
-            for inst in instruments:
-                ws.send(json.dumps({
-                    "name": "subscribe",
-                    "asset": inst['id'].split('-')[0].replace('/', '')
-                }))
+            for message in self.subscriptions(self.get_instruments()):
+                ws.send(message)
             
         def on_message(ws, message):
-            try:
-                data = json.loads(message)
-                if data.get('name') == 'ticker':
-                    asset = data['msg']['asset']
-                    price = float(data['msg']['price'])
-                    volume = float(data['msg'].get('volume', 0))
-                    
-                    # Update real-time cache
-                    self.realtime_prices[asset] = {
-                        'price': price,
-                        'timestamp': time.time()
-                    }
-                    
-                    # Save to persistent storage
-                    self.data_store.save_tick(asset, price, volume, "ws")
-            except Exception as e:
-                logger.error(f"WebSocket message error: {str(e)}")
+            self.handle_message(message)
                 
         def on_error(ws, error):
             logger.error(f"WebSocket error: {str(error)}")
@@ -86,6 +86,35 @@ class PocketOptionAPI:
         self.ws_thread.start()
         logger.info("WebSocket connection started")
         
+    def subscriptions(self, instruments):
+        """WebSocket subscribe messages for a list of instruments"""
+        return [json.dumps({
+            "name": "subscribe",
+            "asset": inst['id'].split('-')[0].replace('/', '')
+        }) for inst in instruments]
+    
+    def handle_message(self, message):
+        """Feed one WebSocket message into buffers, candles, storage and listeners"""
+        try:
+            data = json.loads(message)
+            if data.get('name') == 'ticker':
+                asset = data['msg']['asset']
+                price = float(data['msg']['price'])
+                volume = float(data['msg'].get('volume', 0))
+                
+                # Update real-time tick buffer and candles
+                now = time.time()
+                self.tick_buffers.append(asset, now, price, volume)
+                self.candles.add_tick(asset, now, price, volume)
+                
+                # Save to persistent storage
+                self.data_store.save_tick(asset, price, volume, "ws")
+                
+                for listener in self.tick_listeners:
+                    listener(asset, now, price)
+        except Exception as e:
+            logger.error(f"WebSocket message error: {str(e)}")
+        
     def get_realtime_price(self, instrument_id):
         """Get real-time price from WebSocket"""
         if self.demo_mode:
@@ -96,11 +125,10 @@ class PocketOptionAPI:
             return None
             
         # Use only the base symbol (EUR/USD-OTC -> EURUSD)
-        symbol = instrument_id.split('-')[0].replace('/', '')
-        price_data = self.realtime_prices.get(symbol)
+        tick = self.tick_buffers.last(symbol_for(instrument_id))
         
-        if price_data and time.time() - price_data['timestamp'] < 5:
-            return price_data['price']
+        if tick and time.time() - tick[0] < 5:
+            return float(tick[1])
         return None
         
     def get_last_price(self, instrument_id):
@@ -110,8 +138,27 @@ class PocketOptionAPI:
         if realtime_price is not None:
             return realtime_price
             
-        # Fallback to historical API
-        hist_data = self.get_historical_data(instrument_id, limit=1)
+        # Fallback to cached historical data
+        hist_data = self.get_history(instrument_id, limit=1)
         return float(hist_data[0]['close']) if hist_data else 0
+
+    def fetch_history(self, instrument_id, limit=100):
+        """Fetch historical data, sharing one request among concurrent callers"""
+        return self.single_flight.do(
+            ('history', instrument_id, limit),
+            lambda: self.get_historical_data(instrument_id, limit=limit)
+        )
+
+    def get_history(self, instrument_id, limit=100):
+        """Get historical candles through the incremental cache"""
+        return self.history.get(instrument_id, limit)
+
+    def get_candles(self, instrument_id, limit=None, timeframe=None):
+        """Get candles built from the tick stream (no REST call)"""
+        return self.candles.get_candles(symbol_for(instrument_id), timeframe, limit)
+
+    def get_recent_ticks_view(self, instrument_id, n):
+        """Zero-copy (timestamps, prices, volumes) views of the latest n ticks"""
+        return self.tick_buffers.view(symbol_for(instrument_id), n)
         
     # ... rest of existing PocketOptionAPI class ...
@@ -0,0 +1,186 @@
+"""
+rest_client.py - Shared HTTP plumbing for the broker REST API
+
+Provides single-flight request coalescing, per-endpoint token-bucket rate
+limiting and retry with jittered exponential backoff. The limiter and the
+retries live in a transport adapter mounted on the requests.Session, so
+every call made through the session is covered.
+"""
+
+import time
+import random
+import threading
+import logging
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS'}
+
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into one execution"""
+
+    def __init__(self):
+        self.calls = {}
+        self.stats = {'executed': 0, 'coalesced': 0}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = {'done': threading.Event(), 'result': None, 'error': None}
+                self.stats['executed'] += 1
+            else:
+                self.stats['coalesced'] += 1
+
+        if not leader:
+            call['done'].wait()
+        else:
+            try:
+                call['result'] = fn()
+            except Exception as e:
+                call['error'] = e
+            finally:
+                with self._lock:
+                    del self.calls[key]
+                call['done'].set()
+
+        if call['error'] is not None:
+            raise call['error']
+        return call['result']
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, up to `burst`"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Take one token if available; otherwise seconds until one is (0 when taken)"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self):
+        """Take one token, sleeping until one is available"""
+        while True:
+            wait = self.reserve()
+            if not wait:
+                return
+            time.sleep(wait)
+
+
+def parse_retry_after(value, now=None):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date), or None"""
+    value = (value or '').strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if when is None:
+        return None
+    return max(0.0, when.timestamp() - (time.time() if now is None else now))
+
+
+def backoff_delay(attempt, base, cap):
+    """Exponential backoff with equal jitter"""
+    delay = min(cap, base * 2 ** attempt)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class ThrottledAdapter(HTTPAdapter):
+    """HTTPAdapter with a sized keep-alive pool, rate limits and retries
+
+    `endpoint_limits` maps path prefixes to (rate, burst); all other paths
+    share one bucket with `default_limit`, which bounds the total rate of
+    unlisted endpoints. Only idempotent requests are retried on errors and
+    retryable statuses. A Retry-After from the server is waited out in full;
+    `backoff_cap` only caps our own backoff.
+    """
+
+    def __init__(self, default_limit=(10, 20), endpoint_limits=None, retries=3,
+                 backoff=0.5, backoff_cap=8.0, pool_size=10):
+        super().__init__(pool_connections=pool_size, pool_maxsize=pool_size, pool_block=True)
+        self.default_limit = default_limit
+        self.endpoint_limits = endpoint_limits or {}
+        self.retries = retries
+        self.backoff = backoff
+        self.backoff_cap = backoff_cap
+        self.buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket_for(self, path):
+        """Bucket of the longest matching prefix, or the shared default bucket"""
+        prefix = max((p for p in self.endpoint_limits if path.startswith(p)), key=len, default=None)
+        with self._lock:
+            if prefix not in self.buckets:
+                rate, burst = self.endpoint_limits.get(prefix, self.default_limit)
+                self.buckets[prefix] = TokenBucket(rate, burst)
+            return self.buckets[prefix]
+
+    def retry_delay(self, attempt, retry_after=''):
+        """Backoff before retry `attempt`, at least the server's Retry-After"""
+        delay = backoff_delay(attempt, self.backoff, self.backoff_cap)
+        requested = parse_retry_after(retry_after)
+        if requested is not None:
+            delay = max(delay, requested)
+        return delay
+
+    def send(self, request, **kwargs):
+        bucket = self.bucket_for(urlparse(request.url).path)
+        retries = self.retries if request.method in IDEMPOTENT_METHODS else 0
+        for attempt in range(retries + 1):
+            bucket.acquire()
+            try:
+                response = super().send(request, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == retries:
+                    raise
+                delay = backoff_delay(attempt, self.backoff, self.backoff_cap)
+                logger.warning(f"Request to {request.url} failed ({str(e)}), retrying in {delay:.2f}s")
+                time.sleep(delay)
+                continue
+
+            if response.status_code not in RETRY_STATUSES or attempt == retries:
+                return response
+            delay = self.retry_delay(attempt, response.headers.get('Retry-After', ''))
+            logger.warning(f"{request.url} returned {response.status_code}, retrying in {delay:.2f}s")
+            response.close()
+            time.sleep(delay)
+
+
+def create_session(headers=None):
+    """requests.Session using the configured ThrottledAdapter"""
+    session = requests.Session()
+    adapter = ThrottledAdapter(
+        default_limit=(settings.SETTINGS["REST_RATE_LIMIT"], settings.SETTINGS["REST_BURST"]),
+        endpoint_limits=settings.REST_ENDPOINT_LIMITS,
+        retries=settings.SETTINGS["REST_RETRIES"],
+        backoff=settings.SETTINGS["REST_BACKOFF"],
+        pool_size=settings.SETTINGS["REST_POOL_SIZE"]
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    if headers:
+        session.headers.update(headers)
+    return session
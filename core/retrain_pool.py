@@ -0,0 +1,146 @@
+"""
+retrain_pool.py - Parallel model retraining in a bounded process pool
+
+Training runs in separate processes so it neither holds the GIL of the
+trading process nor competes with it for the cores reserved for live
+trading. Workers return pickled estimators which the caller swaps in.
+
+The pool is created on first use and kept across cycles. A cycle that
+overruns its deadline terminates the pool's processes, since a worker
+stuck in native training code never sees its SIGALRM, and the next
+cycle starts a fresh pool.
+"""
+
+import os
+import time
+import pickle
+import signal
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+logger = logging.getLogger(__name__)
+
+
+def _init_worker(cpus, nice):
+    """Pin the worker to its CPU set and lower its scheduling priority"""
+    if cpus and hasattr(os, 'sched_setaffinity'):
+        try:
+            os.sched_setaffinity(0, cpus)
+        except OSError as e:
+            logger.warning(f"Could not set retrain worker affinity: {str(e)}")
+    if nice and hasattr(os, 'nice'):
+        os.nice(nice)
+
+
+def _on_budget_exceeded(signum, frame):
+    raise TimeoutError("retrain time budget exceeded")
+
+
+def _retrain_worker(instrument_id, X, y, base_model, budget):
+    """Train one instrument's model; runs inside a pool process"""
+    from core.ai_models import fit_model
+
+    start = time.perf_counter()
+    if budget and hasattr(signal, 'setitimer'):
+        signal.signal(signal.SIGALRM, _on_budget_exceeded)
+        signal.setitimer(signal.ITIMER_REAL, budget)
+    try:
+        if len(X) < 100:
+            return instrument_id, None, 0, time.perf_counter() - start, f"insufficient data ({len(X)} samples)"
+        # One thread per worker; parallelism comes from the pool
+        model, accuracy = fit_model(X, y, n_jobs=1, base_model=base_model)
+        return instrument_id, pickle.dumps(model), accuracy, time.perf_counter() - start, None
+    except Exception as e:
+        return instrument_id, None, 0, time.perf_counter() - start, f"{type(e).__name__}: {str(e)}"
+    finally:
+        if budget and hasattr(signal, 'setitimer'):
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def default_cpus():
+    """All cores but the first, which is left to the live trading process"""
+    cpus = sorted(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else list(range(os.cpu_count() or 1))
+    return cpus[1:] or cpus
+
+
+class ParallelRetrainer:
+    def __init__(self, workers=None, time_budget=300, cpus=None, nice=10, start_method='spawn', grace=60):
+        self.cpus = list(cpus) if cpus else default_cpus()
+        self.workers = workers or len(self.cpus)
+        self.time_budget = time_budget
+        self.nice = nice
+        self.start_method = start_method
+        self.grace = grace
+        self.executor = None
+
+    def _executor(self):
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context(self.start_method),
+                initializer=_init_worker,
+                initargs=(self.cpus, self.nice)
+            )
+        return self.executor
+
+    def _terminate(self):
+        """Kill the pool's processes and drop it"""
+        executor, self.executor = self.executor, None
+        if executor is None:
+            return
+        # ProcessPoolExecutor has no public way to stop running work
+        processes = list((getattr(executor, '_processes', None) or {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        for process in processes:
+            process.join(5)
+
+    def run(self, jobs):
+        """Retrain every (instrument_id, X, y, base_model) job in parallel
+
+        base_model is None for a fresh fit, or the XGBoost model to continue.
+
+        Yields (instrument_id, model, accuracy, seconds) for each model
+        that finished within its budget; failures and timeouts are logged
+        and skipped so the currently deployed model stays in place.
+        """
+        if not jobs:
+            return
+        # Leave room for queueing behind the other jobs on the same workers
+        rounds = -(-len(jobs) // self.workers)
+        deadline = self.time_budget * rounds + self.grace if self.time_budget else None
+
+        executor = self._executor()
+        futures = [executor.submit(_retrain_worker, instrument_id, X, y, base_model, self.time_budget)
+                   for instrument_id, X, y, base_model in jobs]
+        finished = False
+        try:
+            for future in as_completed(futures, timeout=deadline):
+                try:
+                    instrument_id, payload, accuracy, seconds, error = future.result()
+                except BrokenProcessPool as e:
+                    # A worker died (e.g. out of memory); the pool is unusable
+                    logger.error(f"Retrain pool broke: {str(e)}")
+                    break
+                except Exception as e:
+                    logger.error(f"Retrain worker failed: {str(e)}")
+                    continue
+                if error:
+                    logger.warning(f"Retrain skipped for {instrument_id}: {error} after {seconds:.1f}s")
+                    continue
+                yield instrument_id, pickle.loads(payload), accuracy, seconds
+            else:
+                finished = True
+        except FutureTimeout:
+            logger.error(f"Retrain cycle exceeded {deadline:.0f}s; terminating unfinished jobs")
+        finally:
+            if not finished:
+                # Overran, broke, or the caller stopped early: no worker may keep training
+                self._terminate()
+
+    def stop(self):
+        self._terminate()
@@ -4,10 +4,10 @@ from datetime import datetime
 from config import settings
 import logging
 
-logger = logging.getLogger(_name_)
+logger = logging.getLogger(__name__)
 
 class RiskManager:
-    def _init_(self, initial_capital):
+    def __init__(self, initial_capital):
         self.capital = initial_capital
         self.equity_curve = [initial_capital]
         self.trade_history = []
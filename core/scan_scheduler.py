@@ -0,0 +1,128 @@
+"""
+scan_scheduler.py - Decide which instruments a scan should cover
+
+Each instrument gets a priority in [0, 1] from three signals, recomputed
+on every scan:
+
+    payout      how far its payout sits above PAYOUT_THRESHOLD, relative
+                to the best payout in the universe
+    volatility  percentile rank of its recent tick-return volatility
+    accuracy    rolling live accuracy of its model (neutral until known)
+
+The priority maps geometrically onto a rescan interval between
+`min_interval` (priority 1) and `max_interval` (priority 0), so hot
+instruments are evaluated every scan and cold ones occasionally. An
+instrument counts as due from half a minimum interval before its rescan
+time, so a scan loop ticking every `min_interval` rounds each interval
+to the nearest tick. Instruments paying less than the threshold are not
+scanned at all. The rescan clock only restarts for instruments reported
+through mark_scanned, so ones a scan dropped (past its deadline, still
+busy, left over when it stopped early) stay due.
+"""
+
+import time
+import threading
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+NEUTRAL = 0.5
+
+
+def tick_volatility(prices):
+    """Standard deviation of log returns over a window of tick prices, or None"""
+    prices = np.asarray(prices, dtype=np.float64)
+    prices = prices[prices > 0]
+    if len(prices) < 3:
+        return None
+    return float(np.diff(np.log(prices)).std())
+
+
+class ScanScheduler:
+    def __init__(self, payout_threshold=0.92, min_interval=30, max_interval=600,
+                 weights=(0.3, 0.4, 0.3), clock=time.monotonic):
+        self.payout_threshold = payout_threshold
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.weights = np.asarray(weights, dtype=np.float64) / sum(weights)
+        self.clock = clock
+        self.last_scan = {}
+        self.priorities = {}
+        self.stats = {'scans': 0, 'scheduled': 0, 'deferred': 0, 'low_payout': 0}
+        self._lock = threading.Lock()
+
+    def eligible(self, instrument):
+        return instrument.get('payout', 0) >= self.payout_threshold
+
+    def interval(self, priority):
+        """Seconds between scans of an instrument with this priority"""
+        return self.max_interval * (self.min_interval / self.max_interval) ** priority
+
+    def prioritize(self, instruments, volatility, accuracy):
+        """{instrument id: priority} for instruments that pass the payout threshold
+
+        volatility(instrument) and accuracy(instrument id) may return None
+        when there is not enough data; those components count as neutral.
+        """
+        if not instruments:
+            return {}
+        payouts = np.array([instrument['payout'] for instrument in instruments], dtype=np.float64)
+        headroom = payouts.max() - self.payout_threshold
+        payout_score = (payouts - self.payout_threshold) / headroom if headroom > 0 else np.ones(len(payouts))
+
+        volatilities = [volatility(instrument) for instrument in instruments]
+        known = np.array([v for v in volatilities if v is not None])
+        volatility_score = np.array([
+            NEUTRAL if v is None or len(known) < 2 else (known < v).sum() / (len(known) - 1)
+            for v in volatilities
+        ])
+
+        accuracy_score = np.array([
+            NEUTRAL if a is None else a
+            for a in (accuracy(instrument['id']) for instrument in instruments)
+        ], dtype=np.float64)
+
+        scores = np.clip(np.vstack([payout_score, volatility_score, accuracy_score]), 0, 1)
+        priorities = self.weights @ scores
+        return {instrument['id']: float(p) for instrument, p in zip(instruments, priorities)}
+
+    def due(self, instruments, volatility, accuracy):
+        """The instruments to evaluate now, hottest first
+
+        They are not marked as scanned; report the ones actually evaluated
+        with mark_scanned.
+        """
+        now = self.clock()
+        eligible = [instrument for instrument in instruments if self.eligible(instrument)]
+        priorities = self.prioritize(eligible, volatility, accuracy)
+        selected = []
+        for instrument in eligible:
+            last = self.last_scan.get(instrument['id'])
+            if last is None or now - last >= self.interval(priorities[instrument['id']]) - self.min_interval / 2:
+                selected.append(instrument)
+        selected.sort(key=lambda instrument: priorities[instrument['id']], reverse=True)
+
+        with self._lock:
+            self.priorities = priorities
+            self.stats['scans'] += 1
+            self.stats['scheduled'] += len(selected)
+            self.stats['deferred'] += len(eligible) - len(selected)
+            self.stats['low_payout'] += len(instruments) - len(eligible)
+        return selected
+
+    def mark_scanned(self, instrument_ids):
+        """Restart the rescan clock of instruments that were evaluated"""
+        now = self.clock()
+        with self._lock:
+            for instrument_id in instrument_ids:
+                self.last_scan[instrument_id] = now
+
+    def get_stats(self):
+        """Counters plus the hottest instruments and their rescan intervals"""
+        with self._lock:
+            stats = dict(self.stats)
+            ranked = sorted(self.priorities.items(), key=lambda item: item[1], reverse=True)
+        stats['hottest'] = [(instrument_id, round(priority, 2), round(self.interval(priority)))
+                            for instrument_id, priority in ranked[:5]]
+        return stats
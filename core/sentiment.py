@@ -0,0 +1,126 @@
+"""
+sentiment.py - Shared market sentiment cache with background refresh
+
+Sentiment is looked up once per base currency (EUR for EUR/USD, EUR/GBP and
+EUR/JPY) and refreshed by a worker thread before it expires. Readers only
+ever see cached values and never wait on the network. A currency whose
+lookup failed is not fetched again until its backoff has passed.
+"""
+
+import time
+import queue
+import threading
+import logging
+from .rest_client import backoff_delay
+
+logger = logging.getLogger(__name__)
+
+
+def base_currency(symbol):
+    """EUR/USD-OTC -> EUR"""
+    return symbol.split('-')[0].split('/')[0]
+
+
+class SentimentService:
+    """TTL cache of `fetch(currency)` results per base currency
+
+    Entries are refreshed when they are within `refresh_ahead` seconds of
+    expiring. Lookups for a currency that is already queued or being
+    fetched are collapsed into that single request. After a failed fetch
+    the currency backs off exponentially (from `retry_base` up to
+    `retry_cap` seconds) and keeps serving its stale value or the default.
+    """
+
+    def __init__(self, fetch, ttl=900, refresh_ahead=120, default='neutral', workers=1,
+                 retry_base=5.0, retry_cap=300.0):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.refresh_ahead = refresh_ahead
+        self.default = default
+        self.retry_base = retry_base
+        self.retry_cap = retry_cap
+        self.cache = {}
+        self.pending = set()
+        self.failures = {}
+        self.retry_at = {}
+        self.stats = {'hits': 0, 'misses': 0, 'fetches': 0, 'errors': 0, 'collapsed': 0, 'backoff': 0}
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+        for i in range(workers):
+            thread = threading.Thread(target=self._worker, name=f"sentiment-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        self._scheduler = threading.Thread(target=self._refresh_loop, name="sentiment-refresh", daemon=True)
+        self._scheduler.start()
+
+    def get(self, symbol):
+        """Cached sentiment for a symbol's base currency; never blocks"""
+        currency = base_currency(symbol)
+        entry = self.cache.get(currency)
+        now = time.time()
+        if entry and now < entry['expires']:
+            self.stats['hits'] += 1
+            if now >= entry['expires'] - self.refresh_ahead:
+                self._schedule(currency)
+            return entry['value']
+        self.stats['misses'] += 1
+        self._schedule(currency)
+        # Serve the stale value while the refresh runs
+        return entry['value'] if entry else self.default
+
+    def prefetch(self, symbols):
+        """Queue lookups for every base currency in a universe"""
+        for symbol in symbols:
+            currency = base_currency(symbol)
+            if currency not in self.cache:
+                self._schedule(currency)
+
+    def _schedule(self, currency):
+        with self._lock:
+            if currency in self.pending:
+                self.stats['collapsed'] += 1
+                return
+            if time.time() < self.retry_at.get(currency, 0):
+                self.stats['backoff'] += 1
+                return
+            self.pending.add(currency)
+        self._queue.put(currency)
+
+    def _worker(self):
+        while not self._stop.is_set():
+            try:
+                currency = self._queue.get(timeout=1)
+            except queue.Empty:
+                continue
+            try:
+                self.stats['fetches'] += 1
+                value = self.fetch(currency)
+                self.cache[currency] = {'value': value, 'expires': time.time() + self.ttl}
+                with self._lock:
+                    self.failures.pop(currency, None)
+                    self.retry_at.pop(currency, None)
+            except Exception as e:
+                with self._lock:
+                    self.stats['errors'] += 1
+                    failures = self.failures.get(currency, 0)
+                    self.failures[currency] = failures + 1
+                    delay = backoff_delay(failures, self.retry_base, self.retry_cap)
+                    self.retry_at[currency] = time.time() + delay
+                logger.error(f"Sentiment lookup failed for {currency}: {str(e)}; retrying in {delay:.0f}s")
+            finally:
+                with self._lock:
+                    self.pending.discard(currency)
+
+    def _refresh_loop(self):
+        """Refresh entries ahead of expiry even if nobody reads them"""
+        interval = max(1.0, self.refresh_ahead / 4)
+        while not self._stop.wait(interval):
+            deadline = time.time() + self.refresh_ahead
+            for currency, entry in list(self.cache.items()):
+                if entry['expires'] <= deadline:
+                    self._schedule(currency)
+
+    def stop(self):
+        self._stop.set()
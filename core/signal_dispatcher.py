@@ -0,0 +1,105 @@
+"""
+signal_dispatcher.py - Event-driven signal evaluation
+
+Candle closes and large enough tick moves request an evaluation of one
+instrument. Requests are debounced per instrument (at most one run per
+`debounce` seconds), coalesced while one is already queued, and held in a
+bounded queue drained by a few worker threads; when the queue is full new
+requests are dropped and counted. The time from the triggering event (the
+bar's close time or the tick's timestamp) to the finished evaluation is
+recorded as tick-to-signal latency, so delivery and queueing delays count.
+"""
+
+import time
+import queue
+import threading
+import logging
+from collections import deque
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class SignalDispatcher:
+    def __init__(self, evaluate, workers=2, max_pending=256, debounce=2.0,
+                 tick_threshold=0.0005, latency_samples=1000):
+        self.evaluate = evaluate
+        self.debounce = debounce
+        self.tick_threshold = tick_threshold
+        self.pending = {}
+        self.last_run = {}
+        self.reference_price = {}
+        self.latencies = deque(maxlen=latency_samples)
+        self.stats = {'bar': 0, 'tick': 0, 'coalesced': 0, 'debounced': 0,
+                      'dropped': 0, 'evaluated': 0, 'errors': 0}
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._lock = threading.Lock()
+        self._running = True
+        self._threads = [threading.Thread(target=self._run, name=f"signal-worker-{i}", daemon=True)
+                         for i in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def on_bar(self, symbol, close_time):
+        """A candle of symbol closed at close_time (epoch seconds)"""
+        self.trigger(symbol, close_time, 'bar')
+
+    def on_tick(self, symbol, event_time, price):
+        """A tick arrived; evaluate if price moved tick_threshold since the last run"""
+        reference = self.reference_price.get(symbol)
+        if reference is None:
+            self.reference_price[symbol] = price
+            return
+        if reference and abs(price / reference - 1) >= self.tick_threshold:
+            self.trigger(symbol, event_time, 'tick', price)
+
+    def trigger(self, symbol, event_time, reason, price=None):
+        with self._lock:
+            if symbol in self.pending:
+                self.stats['coalesced'] += 1
+                return False
+            if time.monotonic() - self.last_run.get(symbol, float('-inf')) < self.debounce:
+                self.stats['debounced'] += 1
+                return False
+            try:
+                self._queue.put_nowait(symbol)
+            except queue.Full:
+                self.stats['dropped'] += 1
+                return False
+            self.pending[symbol] = event_time
+            self.stats[reason] += 1
+            if price is not None:
+                self.reference_price[symbol] = price
+            return True
+
+    def _run(self):
+        while self._running:
+            try:
+                symbol = self._queue.get(timeout=1)
+            except queue.Empty:
+                continue
+            with self._lock:
+                event_time = self.pending.pop(symbol)
+                self.last_run[symbol] = time.monotonic()
+            try:
+                self.evaluate(symbol)
+                self.stats['evaluated'] += 1
+            except Exception as e:
+                self.stats['errors'] += 1
+                logger.error(f"Signal evaluation error for {symbol}: {str(e)}")
+            self.latencies.append(time.time() - event_time)
+
+    def stop(self):
+        self._running = False
+        for thread in self._threads:
+            thread.join(2)
+
+    def get_stats(self):
+        """Trigger counters plus tick-to-signal latency percentiles in ms"""
+        stats = dict(self.stats, queue_depth=self._queue.qsize())
+        latencies = np.array(self.latencies)
+        if len(latencies):
+            p50, p95, p99 = np.percentile(latencies * 1000, [50, 95, 99])
+            stats['latency_ms'] = {'p50': round(p50, 1), 'p95': round(p95, 1), 'p99': round(p99, 1),
+                                   'max': round(latencies.max() * 1000, 1)}
+        return stats
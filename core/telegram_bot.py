@@ -1,12 +1,13 @@
 import requests
+import asyncio
 import datetime
 import logging
 from config import settings
 
-logger = logging.getLogger(_name_)
+logger = logging.getLogger(__name__)
 
 class TelegramBot:
-    def _init_(self):
+    def __init__(self):
         self.token = settings.API_KEYS['TELEGRAM_BOT_TOKEN']
         self.chat_id = settings.API_KEYS['TELEGRAM_CHAT_ID']
         self.base_url = f"https://api.telegram.org/bot{self.token}"
@@ -84,3 +85,43 @@ class TelegramBot:
         """Send important system alert"""
         text = f"🚨 SYSTEM ALERT 🚨\n{message}"
         return self.send_message(text)
+
+
+class AsyncTelegramBot(TelegramBot):
+    """TelegramBot for the asyncio runtime
+    
+    Sends are posted through the async client's HTTP session on its loop
+    and never block the caller, which may be the loop or an executor thread.
+    """
+    def __init__(self, client):
+        super().__init__()
+        self.client = client
+        self.pending = set()
+    
+    def send_message(self, text, parse_mode='Markdown'):
+        """Queue a message for delivery; True if it was queued"""
+        if not settings.SETTINGS["TELEGRAM_ENABLED"] or not self.token or not self.chat_id:
+            return False
+        
+        payload = {
+            "chat_id": self.chat_id,
+            "text": text,
+            "parse_mode": parse_mode
+        }
+        future = asyncio.run_coroutine_threadsafe(self._post(payload), self.client.loop)
+        self.pending.add(future)
+        future.add_done_callback(self.pending.discard)
+        return True
+    
+    async def _post(self, payload):
+        try:
+            await self.client.request('POST', f"{self.base_url}/sendMessage", json=payload)
+            return True
+        except Exception as e:
+            logger.error(f"Telegram send error: {str(e)}")
+            return False
+    
+    async def drain(self, timeout=10):
+        """Wait for queued messages, e.g. before closing the session"""
+        if self.pending:
+            await asyncio.wait([asyncio.wrap_future(f) for f in list(self.pending)], timeout=timeout)
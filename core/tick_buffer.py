@@ -0,0 +1,91 @@
+"""
+tick_buffer.py - Fixed-capacity in-memory tick history per instrument
+
+Each buffer stores parallel timestamp, price and volume arrays. Every tick
+is written twice (at i and i + capacity) so the latest n ticks are always a
+contiguous slice and can be handed out as zero-copy NumPy views.
+"""
+
+import threading
+import numpy as np
+
+
+def symbol_for(instrument_id):
+    """Map an instrument id to its WebSocket asset (EUR/USD-OTC -> EURUSD)"""
+    return instrument_id.split('-')[0].replace('/', '')
+
+
+class TickRingBuffer:
+    """Single-writer ring buffer of (timestamp, price, volume) ticks"""
+
+    def __init__(self, capacity=4096):
+        self.capacity = capacity
+        self.timestamps = np.zeros(2 * capacity, dtype=np.float64)
+        self.prices = np.zeros(2 * capacity, dtype=np.float64)
+        self.volumes = np.zeros(2 * capacity, dtype=np.float64)
+        self.count = 0
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def append(self, timestamp, price, volume=0.0):
+        """Add a tick, overwriting the oldest one when full"""
+        i = self.count % self.capacity
+        j = i + self.capacity
+        self.timestamps[i] = self.timestamps[j] = timestamp
+        self.prices[i] = self.prices[j] = price
+        self.volumes[i] = self.volumes[j] = volume
+        # Publish only after the slot is fully written
+        self.count += 1
+
+    def last(self):
+        """Latest (timestamp, price, volume) or None when empty"""
+        count = self.count
+        if not count:
+            return None
+        i = (count - 1) % self.capacity
+        return self.timestamps[i], self.prices[i], self.volumes[i]
+
+    def view(self, n):
+        """Zero-copy views of the latest n ticks, oldest first
+
+        Views alias the buffer: a view of n ticks stays valid for
+        `capacity - n` more appends, after which its oldest ticks start to be
+        overwritten. Copy it if it needs to outlive that.
+        """
+        count = self.count
+        n = min(n, count, self.capacity)
+        end = (count - 1) % self.capacity + self.capacity + 1 if count else 0
+        window = slice(end - n, end)
+        return self.timestamps[window], self.prices[window], self.volumes[window]
+
+
+class TickBufferSet:
+    """Per-instrument ring buffers, created on first tick"""
+
+    def __init__(self, capacity=4096):
+        self.capacity = capacity
+        self.buffers = {}
+        self._lock = threading.Lock()
+
+    def get(self, symbol):
+        return self.buffers.get(symbol)
+
+    def append(self, symbol, timestamp, price, volume=0.0):
+        buffer = self.buffers.get(symbol)
+        if buffer is None:
+            with self._lock:
+                buffer = self.buffers.setdefault(symbol, TickRingBuffer(self.capacity))
+        buffer.append(timestamp, price, volume)
+        return buffer
+
+    def last(self, symbol):
+        buffer = self.buffers.get(symbol)
+        return buffer.last() if buffer else None
+
+    def view(self, symbol, n):
+        buffer = self.buffers.get(symbol)
+        if buffer is None:
+            empty = np.empty(0, dtype=np.float64)
+            return empty, empty, empty
+        return buffer.view(n)
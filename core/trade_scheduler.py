@@ -0,0 +1,277 @@
+"""
+trade_scheduler.py - One lifecycle scheduler for all open trades
+
+Open trades sit in a min-heap keyed by expiry. A single scheduler thread
+sleeps until the earliest expiry (or until a new trade is opened) and
+settles trades exactly when they expire. Early-exit checks run from price
+updates: streamed ticks for the instruments with open positions, plus at
+most one poll per instrument per `poll_interval` when no tick has arrived
+recently. Polls (which may fall back to REST) and settlement callbacks
+run on small fixed pools, so a slow price fetch never delays another
+trade's expiry and the thread count does not depend on how many trades
+are open. AsyncTradeScheduler runs the same schedule as a task on an
+asyncio loop.
+"""
+
+import time
+import heapq
+import asyncio
+import itertools
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class OpenTrade:
+    __slots__ = ('trade_id', 'symbol', 'direction', 'entry_price', 'opened', 'expiry',
+                 'exit_after', 'last_price', 'last_update', 'context', 'settled')
+
+    def __init__(self, trade_id, symbol, direction, entry_price, opened, duration, exit_after, context):
+        self.trade_id = trade_id
+        self.symbol = symbol
+        self.direction = direction
+        self.entry_price = entry_price
+        self.opened = opened
+        self.expiry = opened + duration
+        self.exit_after = exit_after
+        self.last_price = entry_price
+        self.last_update = opened
+        self.context = context
+        self.settled = False
+
+    def profit_factor(self, price=None):
+        price = self.last_price if price is None else price
+        if self.direction == 'BUY':
+            return (price - self.entry_price) / self.entry_price
+        return (self.entry_price - price) / self.entry_price
+
+
+class TradeScheduler:
+    def __init__(self, on_settle, price_source=None, is_active=None, early_exit_loss=0.003,
+                 poll_interval=1.0, settle_workers=2, poll_workers=4, clock=time.monotonic):
+        self.on_settle = on_settle
+        self.price_source = price_source
+        self.is_active = is_active or (lambda: True)
+        self.early_exit_loss = early_exit_loss
+        self.poll_interval = poll_interval
+        self.clock = clock
+        self.trades = {}
+        self.by_symbol = {}
+        self.stats = {'opened': 0, 'settled': 0, 'early_exits': 0, 'price_updates': 0, 'polls': 0}
+        self._heap = []
+        self._polled = {}
+        self._polling = set()
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+        self._running = True
+        self._settlers = ThreadPoolExecutor(max_workers=settle_workers, thread_name_prefix="trade-settle")
+        self._pollers = ThreadPoolExecutor(max_workers=poll_workers, thread_name_prefix="trade-poll")
+        self._start()
+
+    def _start(self):
+        self._thread = threading.Thread(target=self._run, name="trade-scheduler", daemon=True)
+        self._thread.start()
+
+    def _wake(self):
+        self._cond.notify()
+
+    def open(self, trade_id, symbol, direction, entry_price, duration, exit_after, context=None):
+        """Track a placed trade until it expires or exits early"""
+        trade = OpenTrade(trade_id, symbol, direction, entry_price, self.clock(), duration, exit_after, context)
+        with self._cond:
+            self.trades[trade_id] = trade
+            self.by_symbol.setdefault(symbol, set()).add(trade_id)
+            heapq.heappush(self._heap, (trade.expiry, next(self._sequence), trade_id))
+            self.stats['opened'] += 1
+            self._wake()
+        logger.info(f"Monitoring trade {trade_id} for {symbol} ({direction} at {entry_price})")
+        return trade
+
+    def on_price(self, symbol, timestamp, price):
+        """Price update callback; checks early exit for the symbol's open trades"""
+        if symbol not in self.by_symbol or price is None or price <= 0:
+            return
+        now = self.clock()
+        exits = []
+        with self._cond:
+            self.stats['price_updates'] += 1
+            for trade_id in self.by_symbol.get(symbol, ()):
+                trade = self.trades[trade_id]
+                trade.last_price = price
+                trade.last_update = now
+                if (self.is_active() and trade.profit_factor() < -self.early_exit_loss
+                        and now - trade.opened > trade.exit_after):
+                    exits.append(trade)
+            for trade in exits:
+                self._remove(trade)
+                self.stats['early_exits'] += 1
+        for trade in exits:
+            logger.info(f"Early exit triggered for trade {trade.trade_id} at {price}")
+            self._settle(trade, "early_loss")
+
+    def _remove(self, trade):
+        trade.settled = True
+        del self.trades[trade.trade_id]
+        ids = self.by_symbol[trade.symbol]
+        ids.discard(trade.trade_id)
+        if not ids:
+            del self.by_symbol[trade.symbol]
+            self._polled.pop(trade.symbol, None)
+
+    def _settle(self, trade, result=None):
+        if result is None:
+            result = "win" if trade.profit_factor() > 0 else "loss"
+            logger.info(f"Trade {trade.trade_id} completed with result: {result}")
+        self.stats['settled'] += 1
+        self._settlers.submit(self._call_settle, trade, result)
+
+    def _call_settle(self, trade, result):
+        try:
+            self.on_settle(trade, result, trade.profit_factor())
+        except Exception as e:
+            logger.error(f"Settlement error for trade {trade.trade_id}: {str(e)}")
+
+    def _collect(self):
+        """(expired trades, trades due a price poll, seconds to wait if neither)
+
+        Called with the lock held; expired trades are removed.
+        """
+        now = self.clock()
+        due = []
+        # Heap entries of early-exited trades are discarded lazily
+        while self._heap and (self._heap[0][2] not in self.trades or self._heap[0][0] <= now):
+            _, _, trade_id = heapq.heappop(self._heap)
+            trade = self.trades.get(trade_id)
+            if trade is not None:
+                self._remove(trade)
+                due.append(trade)
+        stale = []
+        if self.price_source:
+            # Instruments with a poll in flight wait for its result
+            stale = [trade for trade in self.trades.values() if trade.symbol not in self._polling
+                     and now - max(trade.last_update, self._polled.get(trade.symbol, trade.opened)) >= self.poll_interval]
+        timeout = self.poll_interval if self.price_source and self.trades else None
+        if self._heap:
+            until_expiry = self._heap[0][0] - now
+            timeout = until_expiry if timeout is None else min(timeout, until_expiry)
+        return due, stale, timeout
+
+    def _run(self):
+        while self._running:
+            with self._cond:
+                due, stale, timeout = self._collect()
+                if not due and not stale:
+                    self._cond.wait(timeout)
+                    continue
+            for trade in due:
+                self._settle(trade)
+            if stale:
+                self._poll(stale)
+
+    def _poll_symbols(self, stale):
+        """One trade per instrument that has not ticked recently, marked in flight"""
+        polled = {}
+        with self._cond:
+            for trade in stale:
+                if trade.symbol not in polled and trade.symbol not in self._polling:
+                    polled[trade.symbol] = trade
+                    self._polled[trade.symbol] = self.clock()
+                    self._polling.add(trade.symbol)
+        return list(polled.values())
+
+    def _polled_price(self, trade, price=None, error=None):
+        """Apply a finished poll and clear its in-flight mark"""
+        with self._cond:
+            self._polling.discard(trade.symbol)
+            if error is None:
+                self.stats['polls'] += 1
+        if error is not None:
+            logger.error(f"Price poll error for {trade.symbol}: {str(error)}")
+            return
+        self.on_price(trade.symbol, None, price)
+
+    def _poll(self, stale):
+        """Fetch one price per instrument that has not ticked recently, on the poll pool"""
+        for trade in self._poll_symbols(stale):
+            self._pollers.submit(self._poll_one, trade)
+
+    def _poll_one(self, trade):
+        try:
+            price = self.price_source(trade)
+        except Exception as e:
+            self._polled_price(trade, error=e)
+            return
+        self._polled_price(trade, price)
+
+    def open_count(self):
+        return len(self.trades)
+
+    def stop(self, wait=True):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        self._thread.join(2)
+        self._pollers.shutdown(wait=False, cancel_futures=True)
+        self._settlers.shutdown(wait=wait)
+
+
+class AsyncTradeScheduler(TradeScheduler):
+    """TradeScheduler driven by a task on the running asyncio loop
+
+    Must be created on the loop. The scheduler task awaits the next expiry
+    instead of holding a thread, and `price_source` is a coroutine function
+    whose polls run as separate tasks, so they never delay an expiry. open and on_price remain safe to
+    call from any thread; settlement callbacks still run on the settle pool.
+    """
+
+    def _start(self):
+        self._loop = asyncio.get_running_loop()
+        self._event = asyncio.Event()
+        self._poll_tasks = set()
+        self._task = self._loop.create_task(self._run_async())
+
+    def _wake(self):
+        self._loop.call_soon_threadsafe(self._event.set)
+
+    async def _run_async(self):
+        while self._running:
+            with self._cond:
+                self._event.clear()
+                due, stale, timeout = self._collect()
+            if not due and not stale:
+                timer = self._loop.call_later(timeout, self._event.set) if timeout is not None else None
+                try:
+                    await self._event.wait()
+                finally:
+                    if timer:
+                        timer.cancel()
+                continue
+            for trade in due:
+                self._settle(trade)
+            if stale:
+                self._poll(stale)
+
+    def _poll(self, stale):
+        for trade in self._poll_symbols(stale):
+            task = self._loop.create_task(self._poll_one_async(trade))
+            self._poll_tasks.add(task)
+            task.add_done_callback(self._poll_tasks.discard)
+
+    async def _poll_one_async(self, trade):
+        try:
+            price = await self.price_source(trade)
+        except Exception as e:
+            self._polled_price(trade, error=e)
+            return
+        self._polled_price(trade, price)
+
+    def stop(self, wait=True):
+        with self._cond:
+            self._running = False
+            self._wake()
+        for task in list(self._poll_tasks):
+            self._loop.call_soon_threadsafe(task.cancel)
+        self._pollers.shutdown(wait=False)
+        self._settlers.shutdown(wait=wait)
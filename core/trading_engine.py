@@ -6,26 +6,99 @@ import queue
 import logging
 from datetime import datetime, timedelta
 from . import utils
-from .ai_models import AIModel
+from .ai_models import AIModel, ModelPool, build_dataset, training_metadata
 from .risk_manager import RiskManager
 from .telegram_bot import TelegramBot
 from .pocket_option_api import PocketOptionAPI
+from .indicators import IndicatorEngine, FEATURE_COLUMNS, INDICATOR_COLUMNS, indicator_history
+from .breakout import LABELS as breakout_labels
+from .sentiment import SentimentService
+from .retrain_pool import ParallelRetrainer
+from .online_learning import OnlineLearner
+from .feature_store import FeatureStore
+from .drift_monitor import DriftMonitor
+from .signal_dispatcher import SignalDispatcher
+from .trade_scheduler import TradeScheduler
+from .parallel_scan import ScanPool
+from .scan_scheduler import ScanScheduler, tick_volatility
+from concurrent.futures import ThreadPoolExecutor
+from .tick_buffer import symbol_for
 from config import settings
 import random
 
-logger = logging.getLogger(_name_)
+logger = logging.getLogger(__name__)
 
 class TradingEngine:
-    def _init_(self, api: PocketOptionAPI):
+    def __init__(self, api: PocketOptionAPI):
         self.api = api
-        self.ai_models = {}
+        self.ai_models = ModelPool()
         self.risk_manager = RiskManager(settings.SETTINGS["INITIAL_CAPITAL"])
-        self.telegram_bot = TelegramBot()
+        self.telegram_bot = self.create_telegram_bot()
         self.active_trades = {}
+        # Instruments with an order being placed; each holds a concurrent-trade slot
+        self.pending_trades = set()
+        self._trade_slots = threading.Lock()
         self.last_retrain = datetime.now()
         self.trading_active = True
         self.last_signal_time = None
         self.price_queue = queue.Queue()
+        self.sentiment = SentimentService(
+            utils.get_market_sentiment,
+            ttl=settings.SETTINGS["SENTIMENT_TTL"],
+            refresh_ahead=settings.SETTINGS["SENTIMENT_REFRESH_AHEAD"]
+        )
+        self.retrainer = ParallelRetrainer(
+            workers=settings.SETTINGS["RETRAIN_WORKERS"],
+            time_budget=settings.SETTINGS["RETRAIN_TIME_BUDGET"],
+            cpus=settings.SETTINGS["RETRAIN_CPUS"],
+            nice=settings.SETTINGS["RETRAIN_NICE"]
+        )
+        self.online_learner = OnlineLearner(
+            batch_size=settings.SETTINGS["ONLINE_BATCH_SIZE"],
+            replay_size=settings.SETTINGS["ONLINE_REPLAY_SIZE"],
+            buffer_size=settings.SETTINGS["ONLINE_BUFFER_SIZE"],
+            checkpoint_interval=settings.SETTINGS["MODEL_CHECKPOINT_INTERVAL"]
+        )
+        self.indicators = IndicatorEngine()
+        self.indicators.load(settings.INDICATOR_CHECKPOINT)
+        self.feature_store = FeatureStore(settings.FEATURE_STORE_DIR, settings.SETTINGS["FEATURE_STORE_ROWS"])
+        self.drift = DriftMonitor(
+            psi_threshold=settings.SETTINGS["DRIFT_PSI_THRESHOLD"],
+            accuracy_window=settings.SETTINGS["DRIFT_ACCURACY_WINDOW"],
+            min_trades=settings.SETTINGS["DRIFT_MIN_TRADES"],
+            accuracy_tolerance=settings.SETTINGS["DRIFT_ACCURACY_TOLERANCE"],
+            max_age_hours=settings.SETTINGS["RETRAIN_INTERVAL"],
+            suspend_score=settings.SETTINGS["DRIFT_SUSPEND_SCORE"]
+        )
+        self.trade_executor = ThreadPoolExecutor(
+            max_workers=settings.SETTINGS["TRADE_WORKERS"], thread_name_prefix="trade"
+        )
+        self.trade_scheduler = self.create_trade_scheduler()
+        self.api.add_tick_listener(self.trade_scheduler.on_price)
+        self.scan_pool = ScanPool(
+            self.prepare_signal,
+            workers=settings.SETTINGS["SCAN_WORKERS"],
+            deadline=settings.SETTINGS["SCAN_DEADLINE"]
+        )
+        self.scan_scheduler = ScanScheduler(
+            payout_threshold=settings.SETTINGS["PAYOUT_THRESHOLD"],
+            min_interval=settings.SETTINGS["SCAN_MIN_INTERVAL"],
+            max_interval=settings.SETTINGS["SCAN_MAX_INTERVAL"]
+        )
+        self.instruments_by_symbol = {}
+        self.dispatcher = None
+        self.event_driven = settings.SETTINGS["SIGNAL_MODE"] == "event" and not self.api.demo_mode
+        if self.event_driven:
+            self.dispatcher = SignalDispatcher(
+                self.evaluate_symbol,
+                workers=settings.SETTINGS["SIGNAL_WORKERS"],
+                max_pending=settings.SETTINGS["SIGNAL_QUEUE_SIZE"],
+                debounce=settings.SETTINGS["SIGNAL_DEBOUNCE"],
+                tick_threshold=settings.SETTINGS["SIGNAL_TICK_THRESHOLD"]
+            )
+            self.api.add_tick_listener(self.dispatcher.on_tick)
+        self.api.candles.add_listener(self.on_bar_close)
+        self.api.candles.start_clock(grace=settings.SETTINGS["CANDLE_CLOSE_GRACE"])
         self.api.start_websocket()
         
         # Send startup message
@@ -34,6 +107,19 @@ class TradingEngine:
         else:
             self.telegram_bot.send_message("🚀 TRADING SYSTEM STARTED (REAL ACCOUNT)")
     
+    def create_telegram_bot(self):
+        return TelegramBot()
+    
+    def create_trade_scheduler(self):
+        return TradeScheduler(
+            self.settle_trade,
+            price_source=lambda trade: self.api.get_last_price(trade.context['instrument_id']),
+            is_active=lambda: self.trading_active,
+            poll_interval=settings.SETTINGS["TRADE_POLL_INTERVAL"],
+            settle_workers=settings.SETTINGS["TRADE_WORKERS"],
+            poll_workers=settings.SETTINGS["TRADE_WORKERS"]
+        )
+    
     def initialize_models(self):
         """Initialize AI models for all instruments"""
         instruments = self.api.get_instruments()
@@ -43,83 +129,161 @@ class TradingEngine:
                 logger.info(f"Initialized model for {instrument['symbol']}")
                 
                 # Initial training if no model exists
-                if not self.ai_models[instrument['id']].model:
-                    hist_data = self.api.get_historical_data(instrument['id'], limit=200)
-                    if hist_data:
-                        df = pd.DataFrame(hist_data)
-                        df = utils.calculate_indicators(df)
-                        self.ai_models[instrument['id']].train(df)
+                if not self.ai_models[instrument['id']].has_model():
+                    X, y = self.training_data(instrument['id'], 200)
+                    if len(X):
+                        self.ai_models[instrument['id']].train(X, y)
             except Exception as e:
                 logger.error(f"Error initializing model for {instrument['symbol']}: {str(e)}")
     
+    def select_retrains(self):
+        """Instruments whose models drifted, by priority, within the cycle budget"""
+        assessments = []
+        for instrument_id, model in self.ai_models.items():
+            try:
+                X_recent, _ = self.feature_store.dataset(symbol_for(instrument_id), settings.SETTINGS["DRIFT_WINDOW"])
+                assessment = self.drift.assess(instrument_id, X_recent, model.metadata)
+                assessments.append(assessment)
+                if assessment['reasons']:
+                    logger.info(f"Drift {instrument_id}: score {assessment['score']:.2f} ({', '.join(assessment['reasons'])})")
+            except Exception as e:
+                logger.error(f"Drift check error for {instrument_id}: {str(e)}")
+        
+        def cost(instrument_id):
+            return self.ai_models[instrument_id].metadata.get('train_seconds', settings.SETTINGS["RETRAIN_DEFAULT_COST"])
+        
+        return self.drift.plan(assessments, settings.SETTINGS["RETRAIN_CYCLE_BUDGET"], cost)
+    
+    def retrain_cycle(self):
+        """One drift check: retrain the models that need it, then housekeeping"""
+        selected = self.select_retrains()
+        
+        if selected:
+            logger.info(f"Starting model retraining for {len(selected)} of {len(self.ai_models)} instruments")
+            self.telegram_bot.send_message(f"🔄 Retraining {len(selected)} drifted AI models with new market data")
+        
+            jobs, plans = [], {}
+            for instrument_id in selected:
+                model = self.ai_models[instrument_id]
+                try:
+                    # The whole stored window, enough rows for XGBoost
+                    X, y = self.training_data(instrument_id, settings.SETTINGS["FEATURE_STORE_ROWS"])
+                    if not len(X):
+                        continue
+                    # Extend the live booster with new bars unless a full rebuild is due;
+                    # the drift reference is still profiled from the full window
+                    continuation = model.continuation(X, y)
+                    if continuation:
+                        base_model, X_tail, y_tail, continuations = continuation
+                        jobs.append((instrument_id, X_tail, y_tail, base_model))
+                        plans[instrument_id] = (X, 'continuation', continuations)
+                    else:
+                        jobs.append((instrument_id, X, y, None))
+                        plans[instrument_id] = (X, 'full', 0)
+                except Exception as e:
+                    logger.error(f"Error retraining {instrument_id}: {str(e)}")
+        
+            # Train in worker processes, swap models in as they finish
+            cycle = {'full': [], 'continuation': []}
+            for instrument_id, model, accuracy, seconds in self.retrainer.run(jobs):
+                X, mode, continuations = plans[instrument_id]
+                metadata = training_metadata(X, accuracy, seconds, mode, continuations)
+                self.ai_models[instrument_id].install(model, accuracy, metadata)
+                self.drift.reset(instrument_id)
+                cycle[mode].append((seconds, accuracy))
+                logger.info(f"Retrained {instrument_id} ({mode}) in {seconds:.1f}s | Accuracy: {accuracy:.2%}")
+        
+            for mode, results in cycle.items():
+                if results:
+                    seconds, accuracy = np.mean(results, axis=0)
+                    logger.info(f"{mode.capitalize()} retrains: {len(results)} models | "
+                                f"avg {seconds:.1f}s | avg accuracy {accuracy:.2%}")
+        
+            self.last_retrain = datetime.now()
+            self.telegram_bot.send_message("✅ Model retraining completed successfully")
+        
+        # Update risk manager at midnight
+        self.risk_manager.start_new_day()
+        
+        # Checkpoint streaming indicator state and feature rows
+        self.indicators.save(settings.INDICATOR_CHECKPOINT)
+        self.feature_store.flush()
+        
+        # Move closed tick partitions out of the live database
+        self.api.data_store.compact_to_archive()
+        self.api.data_store.apply_retention()
+    
     def retrain_models(self):
-        """Periodically retrain all models"""
+        """Hourly drift check; retrain only the models that need it"""
         while True:
             try:
-                current_time = datetime.now()
-                hours_since = (current_time - self.last_retrain).total_seconds() / 3600
-                
-                if hours_since >= settings.SETTINGS["RETRAIN_INTERVAL"]:
-                    logger.info("Starting model retraining")
-                    self.telegram_bot.send_message("🔄 Retraining AI models with new market data")
-                    
-                    for instrument_id, model in self.ai_models.items():
-                        try:
-                            hist_data = self.api.get_historical_data(instrument_id, limit=500)
-                            if not hist_data:
-                                continue
-                                
-                            df = pd.DataFrame(hist_data)
-                            df = utils.calculate_indicators(df)
-                            accuracy = model.train(df)
-                            logger.info(f"Retrained {instrument_id} | Accuracy: {accuracy:.2%}")
-                        except Exception as e:
-                            logger.error(f"Error retraining {instrument_id}: {str(e)}")
-                    
-                    self.last_retrain = datetime.now()
-                    self.telegram_bot.send_message("✅ Model retraining completed successfully")
-                
-                # Update risk manager at midnight
-                self.risk_manager.start_new_day()
+                self.retrain_cycle()
                 time.sleep(3600)  # Check hourly
             except Exception as e:
                 logger.error(f"Error in retrain thread: {str(e)}")
                 time.sleep(60)
     
-    def generate_signal(self, instrument):
-        """Generate trading signal with AI and technical analysis"""
+    def training_data(self, instrument_id, limit):
+        """(X, y) from the feature store, downloading history only while it is short
+
+        The download is capped at HISTORY_CACHE_BARS, the most the history
+        cache serves, and only replaces the stored rows if it yields more.
+        """
+        X, y = self.feature_store.dataset(symbol_for(instrument_id), limit)
+        fetch = min(limit, settings.SETTINGS["HISTORY_CACHE_BARS"])
+        if len(X) >= fetch - 1:
+            return X, y
+        hist_data = self.api.get_history(instrument_id, limit=fetch)
+        if not hist_data:
+            return X, y
+        indicators = indicator_history(hist_data)
+        df = pd.DataFrame(hist_data).assign(**{column: indicators[column] for column in INDICATOR_COLUMNS})
+        X_hist, y_hist = build_dataset(df)
+        return (X_hist, y_hist) if len(X_hist) > len(X) else (X, y)
+    
+    def on_bar_close(self, symbol, timeframe, bar):
+        """Advance streaming indicators and store the feature row when a candle closes"""
+        if timeframe == settings.SETTINGS["CANDLE_TIMEFRAMES"][0]:
+            self.indicators.on_bar(symbol, bar)
+            self.drift.on_bar(symbol, bar['timestamp'], bar['close'])
+            indicators = self.indicators.get(symbol)
+            if indicators.ready():
+                self.feature_store.append(symbol, bar['timestamp'], indicators.features(), bar['close'])
+            if self.dispatcher:
+                self.dispatcher.on_bar(symbol, bar['timestamp'] + timeframe)
+    
+    def prepare_signal(self, instrument):
+        """Gather market data, features and context for one instrument"""
         instrument_id = instrument['id']
         symbol = instrument['symbol']
         
-        # Get historical data
-        hist_data = self.api.get_historical_data(instrument_id)
+        # Prefer candles built from the tick stream, fall back to REST while warming up
+        hist_data = self.api.get_candles(instrument_id)
+        if len(hist_data) < 30:
+            hist_data = self.api.get_history(instrument_id)
         if not hist_data or len(hist_data) < 30:
-            return None, None, 0
+            return None
             
         df = pd.DataFrame(hist_data)
-        df = utils.calculate_indicators(df)
         if len(df) < 2:
-            return None, None, 0
-        
-        # Get market sentiment
-        sentiment = utils.get_market_sentiment(symbol.split('-')[0])
-        
-        # Detect breakout patterns
-        breakout = utils.detect_breakout(df)
-        
-        # Get AI prediction
-        ai_model = self.ai_models.get(instrument_id)
-        if ai_model:
-            try:
-                current_features = df.iloc[-1][['ema5', 'ema20', 'rsi6', 'macd', 'macd_signal', 'macd_hist']].values
-                ai_prediction = ai_model.predict(current_features)
-            except Exception as e:
-                logger.error(f"AI prediction error: {str(e)}")
-                ai_prediction = None
-        else:
-            ai_prediction = None
-        
-        # Signal generation logic
+            return None
+        
+        # Indicator and breakout state is incremental; only unseen bars are folded in
+        values = self.indicators.values_for(symbol_for(instrument_id), hist_data)
+        
+        return {
+            'df': df,
+            'features': [values[column] for column in FEATURE_COLUMNS],
+            # Market sentiment (cached per base currency, refreshed in background)
+            'sentiment': self.sentiment.get(symbol),
+            # Breakout patterns
+            'breakout': breakout_labels[values['breakout']]
+        }
+    
+    def decide_signal(self, context, ai_prediction):
+        """Combine AI prediction, breakout and sentiment into a signal"""
+        breakout = context['breakout']
+        sentiment = context['sentiment']
         signal = None
         confidence = 0
         
@@ -131,75 +295,95 @@ class TradingEngine:
             signal = 'SELL'
             confidence = 0.9 if breakout and ai_prediction == 0 else 0.7
         
-        return signal, df, confidence
+        return signal, confidence
     
-    def monitor_trade(self, trade_id, instrument_id, entry_price, direction, payout):
-        """Real-time trade monitoring with early exit"""
-        start_time = datetime.now()
-        duration = settings.SETTINGS["TRADE_INTERVAL"]
-        exit_threshold = settings.SETTINGS["EARLY_EXIT_THRESHOLD"] * duration
-        last_price = entry_price
-        profit_factor = 0
-        
-        logger.info(f"Monitoring trade {trade_id} for {instrument_id} ({direction} at {entry_price})")
-        
-        while (datetime.now() - start_time).seconds < duration:
-            if not self.trading_active:
-                logger.info(f"Trade {trade_id} paused by system")
-                time.sleep(1)
-                continue
-                
-            # Get real-time price
-            current_price = self.api.get_last_price(instrument_id)
-            if current_price is None or current_price <= 0:
-                time.sleep(0.1)
-                continue
-                
-            # Calculate profit factor
-            if direction == 'BUY':
-                profit_factor = (current_price - entry_price) / entry_price
-            else:  # SELL
-                profit_factor = (entry_price - current_price) / entry_price
-            
-            # Track last price
-            last_price = current_price
-            
-            # Check exit conditions
-            elapsed = (datetime.now() - start_time).seconds
-            if profit_factor < -0.003 and elapsed > exit_threshold:
-                logger.info(f"Early exit triggered for trade {trade_id} at {current_price}")
-                return "early_loss", profit_factor
-                
-            time.sleep(0.2)  # Check 5 times per second
+    def generate_signal(self, instrument):
+        """Generate trading signal with AI and technical analysis"""
+        if self.drift.is_suspended(instrument['id']):
+            return None, None, 0
+        context = self.prepare_signal(instrument)
+        if context is None:
+            return None, None, 0
         
-        # Final calculation
-        current_price = last_price
-        if direction == 'BUY':
-            profit_factor = (current_price - entry_price) / entry_price
+        # Get AI prediction
+        ai_model = self.ai_models.get(instrument['id'])
+        if ai_model:
+            try:
+                ai_prediction = ai_model.predict(np.array(context['features']))
+            except Exception as e:
+                logger.error(f"AI prediction error: {str(e)}")
+                ai_prediction = None
         else:
-            profit_factor = (entry_price - current_price) / entry_price
-            
-        result = "win" if profit_factor > 0 else "loss"
-        logger.info(f"Trade {trade_id} completed with result: {result}")
-        return result, profit_factor
+            ai_prediction = None
         
-    def execute_trade(self, instrument, signal, confidence):
-        """Execute and monitor trade with real-time processing"""
+        self.record_prediction(instrument, context, ai_prediction)
+        signal, confidence = self.decide_signal(context, ai_prediction)
+        return signal, context['df'], confidence
+    
+    def record_prediction(self, instrument, context, ai_prediction):
+        """Hand the model's next-bar call to the drift monitor, which scores it
+        when that bar closes"""
+        df = context['df']
+        if ai_prediction is None or 'timestamp' not in df:
+            return
+        self.drift.record_prediction(
+            instrument['id'],
+            symbol_for(instrument['id']),
+            df['timestamp'].iloc[-1] + settings.SETTINGS["CANDLE_TIMEFRAMES"][0],
+            df['close'].iloc[-1],
+            ai_prediction
+        )
+    
+    def generate_signals(self, instruments, evaluated=None):
+        """Generate signals for a whole universe with one batched inference pass
+        
+        Returns (instrument, signal, df, confidence, features) per prepared
+        instrument, features being the row the signal was scored on.
+        Market data is gathered in parallel on the scan pool; instruments that
+        miss the scan deadline are left out of this pass. If given,
+        `evaluated` is extended with the ids of the instruments the pool
+        finished, with or without a signal context.
+        """
+        # Models that drifted too far sit out until they are retrained
+        eligible = [instrument for instrument in instruments if not self.drift.is_suspended(instrument['id'])]
+        prepared = self.scan_pool.run(eligible, evaluated)
+        if not prepared:
+            return []
+        
+        predictions, _ = self.ai_models.predict_batch(
+            [context['features'] for _, context in prepared],
+            [instrument['id'] for instrument, _ in prepared]
+        )
+        
+        results = []
+        for (instrument, context), prediction in zip(prepared, predictions):
+            ai_prediction = int(prediction) if prediction >= 0 else None
+            self.record_prediction(instrument, context, ai_prediction)
+            signal, confidence = self.decide_signal(context, ai_prediction)
+            results.append((instrument, signal, context['df'], confidence, context['features']))
+        return results
+    
+    def trade_allowed(self):
+        """Whether a new trade may be placed now"""
         if not self.trading_active:
             logger.info("Trading paused, skipping trade execution")
-            return
-            
-        instrument_id = instrument['id']
-        symbol = instrument['symbol']
-        payout = instrument['payout']
+            return False
         
         # Check risk management
         can_trade, reason = self.risk_manager.can_trade()
         if not can_trade:
             logger.warning(f"Trade blocked: {reason}")
             self.telegram_bot.send_message(f"⛔ TRADE BLOCKED\n{reason}")
+            return False
+        return True
+    
+    def execute_trade(self, instrument, signal, confidence, features=None):
+        """Place a trade and hand it to the lifecycle scheduler"""
+        if not self.trade_allowed():
             return
-        
+            
+        instrument_id = instrument['id']
+        symbol = instrument['symbol']
         position_size = self.risk_manager.calculate_position_size()
         duration = settings.SETTINGS["TRADE_INTERVAL"]  # Seconds
         
@@ -223,6 +407,20 @@ class TradingEngine:
             entry_price = trade['entry_price']
             logger.info(f"Real trade placed: {trade_id} {symbol} {signal} at {entry_price}")
         
+        self.register_trade(instrument, signal, confidence, trade_id, entry_price, position_size, duration,
+                            features)
+    
+    def register_trade(self, instrument, signal, confidence, trade_id, entry_price, position_size, duration,
+                       features=None):
+        """Book a placed trade and hand it to the lifecycle scheduler
+        
+        `features` is the row the signal was scored on; it becomes the
+        online-learning sample once the trade settles.
+        """
+        instrument_id = instrument['id']
+        symbol = instrument['symbol']
+        payout = instrument['payout']
+        
         # Register trade with risk manager
         self.risk_manager.trade_history.append({
             'id': trade_id,
@@ -248,14 +446,26 @@ class TradingEngine:
         self.telegram_bot.send_signal(symbol, signal, entry_price, confidence)
         self.last_signal_time = datetime.now()
         
-        # Monitor trade
-        result, profit_factor = self.monitor_trade(
-            trade_id, 
-            instrument_id, 
-            entry_price, 
+        # Monitor until expiry or early exit; settle_trade runs at the end
+        self.trade_scheduler.open(
+            trade_id,
+            symbol_for(instrument_id),
             signal,
-            payout
+            entry_price,
+            duration,
+            settings.SETTINGS["EARLY_EXIT_THRESHOLD"] * duration,
+            context={'instrument_id': instrument_id, 'symbol': symbol,
+                     'size': position_size, 'payout': payout, 'features': features}
         )
+    
+    def settle_trade(self, trade, result, profit_factor):
+        """Book a finished trade (scheduler callback)"""
+        trade_id = trade.trade_id
+        instrument_id = trade.context['instrument_id']
+        symbol = trade.context['symbol']
+        signal = trade.direction
+        position_size = trade.context['size']
+        payout = trade.context['payout']
         
         # Calculate P&L
         if result == "win":
@@ -274,15 +484,12 @@ class TradingEngine:
         ai_model = self.ai_models.get(instrument_id)
         if ai_model:
             try:
-                # Get latest features
-                hist_data = self.api.get_historical_data(instrument_id, limit=1)
-                if hist_data:
-                    df = pd.DataFrame(hist_data)
-                    df = utils.calculate_indicators(df)
-                    if not df.empty:
-                        features = df.iloc[-1][['ema5', 'ema20', 'rsi6', 'macd', 'macd_signal', 'macd_hist']].values
-                        target = 1 if result == "win" else 0
-                        ai_model.update(features, target)
+                # Queue the outcome for asynchronous replay-buffer learning, labelled
+                # with the realised direction of the row the signal was scored on
+                features = trade.context.get('features')
+                if features is not None:
+                    target = 1 if (signal == 'BUY') == (result == "win") else 0
+                    self.online_learner.submit(ai_model, features, target)
             except Exception as e:
                 logger.error(f"Model update error: {str(e)}")
         
@@ -313,6 +520,131 @@ class TradingEngine:
                 logger.info(f"Trade {trade_id} closed early")
                 break
     
+    def open_trade_count(self):
+        """Open trades plus orders still being placed"""
+        return len(self.active_trades) + len(self.pending_trades)
+    
+    def trade_in_progress(self, instrument_id):
+        """Whether the instrument has an open trade or an order in flight"""
+        return instrument_id in self.pending_trades or symbol_for(instrument_id) in self.trade_scheduler.by_symbol
+    
+    def reserve_trade(self, instrument):
+        """Claim a concurrent-trade slot for the instrument
+        
+        Returns False if the instrument already trades or every slot is
+        taken. Check and claim happen under one lock, so concurrent
+        dispatcher workers cannot all pass max_concurrent_trades together.
+        """
+        with self._trade_slots:
+            if (self.trade_in_progress(instrument['id'])
+                    or self.open_trade_count() >= self.risk_manager.max_concurrent_trades):
+                return False
+            self.pending_trades.add(instrument['id'])
+            return True
+    
+    def release_trade(self, instrument):
+        """Free the slot claimed by reserve_trade (the order is booked or failed)"""
+        with self._trade_slots:
+            self.pending_trades.discard(instrument['id'])
+    
+    def start_trade(self, instrument, signal, confidence, features=None):
+        """Execute a strong signal on the trade worker pool; False if no slot is free"""
+        if not self.reserve_trade(instrument):
+            return False
+        logger.info(f"Strong signal detected for {instrument['symbol']}: {signal} (Confidence: {confidence:.0%})")
+        self.trade_executor.submit(self.execute_reserved_trade, instrument, signal, confidence, features)
+        return True
+    
+    def execute_reserved_trade(self, instrument, signal, confidence, features=None):
+        """execute_trade on a reserved slot, releasing it afterwards"""
+        try:
+            self.execute_trade(instrument, signal, confidence, features)
+        except Exception as e:
+            logger.error(f"Trade execution error for {instrument['symbol']}: {str(e)}")
+        finally:
+            self.release_trade(instrument)
+    
+    def scan(self, instruments):
+        """Evaluate every instrument once and trade the strong signals
+        
+        Only instruments that were evaluated and reached the trade decision
+        count as scanned for the adaptive schedule; the rest stay due.
+        """
+        evaluated = []
+        results = self.generate_signals(instruments, evaluated)
+        scanned = self.scanned_without_signal(evaluated, results)
+        for instrument, signal, df, confidence, features in results:
+            if not self.trading_active:
+                break
+                
+            if self.open_trade_count() >= self.risk_manager.max_concurrent_trades:
+                logger.info("Max concurrent trades reached")
+                break
+            
+            scanned.add(instrument['id'])
+            if not signal or confidence < 0.7:
+                continue
+            
+            self.start_trade(instrument, signal, confidence, features)
+            time.sleep(1)  # Stagger trade starts
+        self.scan_scheduler.mark_scanned(scanned)
+    
+    def scanned_without_signal(self, evaluated, results):
+        """Ids of evaluated instruments that produced no signal context"""
+        return set(evaluated) - {instrument['id'] for instrument, *_ in results}
+    
+    def instrument_volatility(self, instrument):
+        """Tick-return volatility over the latest streamed ticks, or None"""
+        _, prices, _ = self.api.get_recent_ticks_view(instrument['id'], settings.SETTINGS["SCAN_VOLATILITY_TICKS"])
+        return tick_volatility(prices)
+    
+    def due_instruments(self, instruments):
+        """Instruments the adaptive schedule wants evaluated now
+        
+        Empty while every trade slot is taken: nothing could be traded, and
+        preparing them would only be thrown away.
+        """
+        if self.open_trade_count() >= self.risk_manager.max_concurrent_trades:
+            logger.info("Max concurrent trades reached; skipping scan")
+            return []
+        return self.scan_scheduler.due(instruments, self.instrument_volatility, self.drift.live_accuracy)
+    
+    def evaluate_symbol(self, symbol):
+        """Event-driven signal pipeline for one instrument (dispatcher worker)"""
+        instrument = self.instruments_by_symbol.get(symbol)
+        if instrument is None or not self.trading_active:
+            return
+        # Cheap pre-checks before inference; start_trade re-checks under the lock
+        if (self.trade_in_progress(instrument['id'])
+                or self.open_trade_count() >= self.risk_manager.max_concurrent_trades):
+            return
+        for instrument, signal, df, confidence, features in self.generate_signals([instrument]):
+            if signal and confidence >= 0.7:
+                self.start_trade(instrument, signal, confidence, features)
+    
+    def run_events(self):
+        """Event-driven mode: evaluations run on bar closes and tick moves
+        
+        This loop only refreshes the instrument universe and reports
+        dispatch latency; while the stream is down it sweeps instead.
+        """
+        while True:
+            try:
+                instruments = self.api.get_instruments()
+                # Instruments paying under the threshold are never evaluated
+                eligible = [inst for inst in instruments if self.scan_scheduler.eligible(inst)]
+                self.instruments_by_symbol = {symbol_for(inst['id']): inst for inst in eligible}
+                self.sentiment.prefetch(inst['symbol'] for inst in eligible)
+                
+                if self.trading_active and not self.api.ws_connected:
+                    logger.warning("Price stream down; falling back to scheduled scans")
+                    self.scan(self.due_instruments(instruments))
+                
+                logger.info(f"Signal dispatch: {self.dispatcher.get_stats()}")
+            except Exception as e:
+                logger.error(f"Error in event loop: {str(e)}")
+            time.sleep(settings.SETTINGS["SIGNAL_REFRESH_INTERVAL"])
+    
     def run(self):
         """Main trading loop"""
         # Initialize models
@@ -331,6 +663,9 @@ class TradingEngine:
         logger.info(f"Risk Profile: {settings.SETTINGS['RISK_PROFILE'].title()}")
         
         try:
+            if self.event_driven:
+                self.run_events()
+            
             while True:
                 if not self.trading_active:
                     logger.info("Trading paused...")
@@ -338,40 +673,39 @@ class TradingEngine:
                     continue
                     
                 instruments = self.api.get_instruments()
-                logger.info(f"Scanning {len(instruments)} instruments...")
-                
-                for instrument in instruments:
-                    if not self.trading_active:
-                        break
-                        
-                    if len(self.active_trades) >= self.risk_manager.max_concurrent_trades:
-                        logger.info("Max concurrent trades reached")
-                        break
-                    
-                    signal, df, confidence = self.generate_signal(instrument)
-                    if not signal or confidence < 0.7:
-                        continue
-                    
-                    logger.info(f"Strong signal detected for {instrument['symbol']}: {signal} (Confidence: {confidence:.0%})")
-                    
-                    # Execute trade in separate thread
-                    trade_thread = threading.Thread(
-                        target=self.execute_trade,
-                        args=(instrument, signal, confidence)
-                    )
-                    trade_thread.daemon = True
-                    trade_thread.start()
-                    time.sleep(1)  # Stagger trade starts
+                due = self.due_instruments(instruments)
+                logger.info(f"Scanning {len(due)} of {len(instruments)} instruments...")
+                self.sentiment.prefetch(inst['symbol'] for inst in due)
+                self.scan(due)
+                logger.info(f"Scan: {self.scan_pool.get_stats()}")
+                logger.info(f"Scan schedule: {self.scan_scheduler.get_stats()}")
                 
-                time.sleep(30)  # Wait before next scan
+                time.sleep(settings.SETTINGS["SCAN_MIN_INTERVAL"])  # Wait before next scan
         
         except KeyboardInterrupt:
-            logger.info("\nShutting down trading system...")
-            self.display_performance()
+            self.shutdown()
         except Exception as e:
             logger.critical(f"Fatal error in trading loop: {str(e)}")
             self.telegram_bot.send_message(f"🚨 CRITICAL ERROR\n{str(e)}")
     
+    def shutdown(self):
+        """Checkpoint state, stop workers and report"""
+        logger.info("\nShutting down trading system...")
+        self.api.candles.stop_clock()
+        self.api.data_store.close()
+        self.indicators.save(settings.INDICATOR_CHECKPOINT)
+        self.feature_store.flush()
+        self.online_learner.stop()
+        self.retrainer.stop()
+        self.trade_scheduler.stop(wait=False)
+        self.trade_executor.shutdown(wait=False)
+        self.scan_pool.stop()
+        logger.info(f"Scan: {self.scan_pool.get_stats()}")
+        if self.dispatcher:
+            self.dispatcher.stop()
+            logger.info(f"Signal dispatch: {self.dispatcher.get_stats()}")
+        self.display_performance()
+    
     def performance_reporting(self):
         """Send periodic performance reports"""
         while True:
@@ -440,6 +774,11 @@ class TradingEngine:
         )
         return True
     
+    @property
+    def demo_mode(self):
+        """Whether trades are simulated instead of sent to the broker"""
+        return settings.SETTINGS["DEMO_MODE"]
+    
     def set_demo_mode(self, demo_mode):
         """Switch between demo and real trading"""
         settings.SETTINGS["DEMO_MODE"] = demo_mode
@@ -0,0 +1,62 @@
+"""
+utils.py - Market sentiment from news headlines
+
+get_market_sentiment scores recent English headlines that mention a
+currency (NewsAPI, keyed by API_KEYS['NEWS_API']) with a small keyword
+lexicon. It runs on SentimentService's worker thread, which caches the
+result and backs off after a failure, so request errors are raised
+rather than hidden here.
+"""
+
+import re
+import logging
+import requests
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+NEWS_URL = "https://newsapi.org/v2/everything"
+
+BULLISH_WORDS = {'rally', 'rallies', 'surge', 'surges', 'gain', 'gains', 'rise', 'rises', 'climb',
+                 'climbs', 'jump', 'jumps', 'strengthen', 'strengthens', 'strong', 'hawkish',
+                 'upbeat', 'rebound', 'rebounds', 'high', 'higher', 'boost', 'boosts'}
+BEARISH_WORDS = {'fall', 'falls', 'drop', 'drops', 'slide', 'slides', 'slump', 'slumps', 'plunge',
+                 'plunges', 'weaken', 'weakens', 'weak', 'dovish', 'loss', 'losses', 'decline',
+                 'declines', 'low', 'lower', 'tumble', 'tumbles', 'recession', 'sell-off'}
+
+
+def headline_score(text):
+    """+1 for a mostly bullish headline, -1 for a mostly bearish one, else 0"""
+    words = re.findall(r"[a-z][a-z-]*", text.lower())
+    score = sum(word in BULLISH_WORDS for word in words) - sum(word in BEARISH_WORDS for word in words)
+    return (score > 0) - (score < 0)
+
+
+def get_market_sentiment(currency, articles=20, timeout=10):
+    """'bullish', 'bearish' or 'neutral' for a currency code such as EUR
+
+    Neutral without a news API key, without headlines, or when bullish and
+    bearish headlines are within a fifth of the sample of each other.
+    """
+    api_key = settings.API_KEYS.get('NEWS_API')
+    if not api_key:
+        return 'neutral'
+
+    response = requests.get(NEWS_URL, params={
+        'q': currency,
+        'language': 'en',
+        'sortBy': 'publishedAt',
+        'pageSize': articles,
+        'apiKey': api_key
+    }, timeout=timeout)
+    response.raise_for_status()
+
+    headlines = response.json().get('articles') or []
+    net = sum(headline_score(f"{article.get('title') or ''} {article.get('description') or ''}")
+              for article in headlines)
+    margin = max(1, len(headlines) // 5)
+    if net >= margin:
+        return 'bullish'
+    if net <= -margin:
+        return 'bearish'
+    return 'neutral'
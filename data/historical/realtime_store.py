@@ -1,56 +1,422 @@
 """
 realtime_store.py - Store real-time market data
+
+Ticks are stored in one table per UTC day (ticks_YYYYMMDD) keyed by
+(instrument, ts) with integer nanosecond timestamps, so latest-N and
+range queries are index seeks regardless of how much history is kept.
 """
 
 import sqlite3
 import time
+import calendar
 import json
+import queue
+import atexit
+import threading
 import logging
+from collections import defaultdict
 from config import settings
+from data.historical.tick_archive import TickArchive
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 2
+PARTITION_PREFIX = "ticks_"
+LEGACY_TABLE = "market_data"
+NS_PER_DAY = 86400 * 10**9
+
+_FLUSH = object()
+_STOP = object()
+
+
+def connect(db_file):
+    """Open a connection configured for concurrent WAL access"""
+    conn = sqlite3.connect(db_file, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def partition_name(ts_ns):
+    """Name of the daily partition holding a nanosecond timestamp"""
+    return PARTITION_PREFIX + time.strftime('%Y%m%d', time.gmtime(ts_ns // 10**9))
+
+
+def partition_start_ns(name):
+    """First nanosecond covered by a partition"""
+    day = time.strptime(name[len(PARTITION_PREFIX):], '%Y%m%d')
+    return calendar.timegm(day) * 10**9
+
+
+def ensure_partition(conn, name):
+    """Create a daily partition table if it does not exist"""
+    conn.execute(f'''CREATE TABLE IF NOT EXISTS {name} (
+                     instrument TEXT NOT NULL,
+                     ts INTEGER NOT NULL,
+                     price REAL,
+                     volume REAL,
+                     source TEXT,
+                     PRIMARY KEY (instrument, ts)) WITHOUT ROWID''')
+
+
+def list_partitions(conn):
+    """All partition table names, oldest first"""
+    rows = conn.execute("SELECT name FROM sqlite_master WHERE type='table' "
+                        "AND name LIKE ? ORDER BY name", (PARTITION_PREFIX + '%',))
+    return [row[0] for row in rows]
+
+
+def insert_ticks(conn, rows, known=None):
+    """Insert (ts_ns, instrument, price, volume, source) rows into their partitions
+
+    Returns the number of rows inserted; rows already stored are ignored.
+    """
+    by_partition = defaultdict(list)
+    for ts, instrument, price, volume, source in rows:
+        by_partition[partition_name(ts)].append((instrument, ts, price, volume, source))
+    before = conn.total_changes
+    for name, batch in by_partition.items():
+        if known is None or name not in known:
+            ensure_partition(conn, name)
+            if known is not None:
+                known.add(name)
+        conn.executemany(f"INSERT OR IGNORE INTO {name} VALUES (?, ?, ?, ?, ?)", batch)
+    return conn.total_changes - before
+
+
+class TickWriter:
+    """Write-behind tick writer backed by a single long-lived WAL connection
+
+    Ticks are queued by the caller and persisted from a dedicated thread in
+    batches of up to `batch_size` rows, or every `flush_interval` seconds,
+    whichever comes first. `flush_interval` is therefore the loss window:
+    at most that many seconds of ticks can be lost on a hard crash.
+
+    `flush()` and `close()` never wait longer than their timeout, even when
+    the queue is full or the writer thread has died.
+    """
+
+    def __init__(self, db_file, batch_size=500, flush_interval=1.0, max_queue=100000):
+        self.db_file = db_file
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.stats = {
+            'written': 0,
+            'ignored': 0,
+            'dropped': 0,
+            'flushes': 0,
+            'last_flush_ms': 0.0,
+            'max_flush_ms': 0.0,
+            'total_flush_ms': 0.0
+        }
+        self._partitions = set()
+        self._closed = False
+        self._stop = threading.Event()
+        self._stats_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="tick-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, row):
+        """Queue a row for writing without blocking the caller"""
+        if self._closed:
+            return False
+        try:
+            self.queue.put_nowait(row)
+            return True
+        except queue.Full:
+            with self._stats_lock:
+                self.stats['dropped'] += 1
+            return False
+
+    def flush(self, timeout=5.0):
+        """Block until everything queued so far has been committed
+
+        Returns False if that did not happen within `timeout` seconds.
+        """
+        if self._closed or not self._thread.is_alive():
+            return False
+        deadline = time.monotonic() + timeout
+        done = threading.Event()
+        try:
+            self.queue.put((_FLUSH, done), timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(max(0.0, deadline - time.monotonic()))
+
+    def close(self, timeout=10.0):
+        """Flush pending ticks and stop the writer thread"""
+        if self._closed:
+            return
+        self._closed = True
+        self._stop.set()
+        if not self._thread.is_alive():
+            return
+        deadline = time.monotonic() + timeout
+        try:
+            # Only wakes the writer; it drains the queue before exiting
+            self.queue.put((_STOP, None), timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(max(0.0, deadline - time.monotonic()))
+        if self._thread.is_alive():
+            logger.warning(f"Tick writer still draining {self.queue.qsize()} ticks after {timeout}s")
+
+    def get_stats(self):
+        """Return queue depth and flush latency counters"""
+        with self._stats_lock:
+            stats = dict(self.stats)
+        stats['queue_depth'] = self.queue.qsize()
+        stats['avg_flush_ms'] = (stats['total_flush_ms'] / stats['flushes']
+                                 if stats['flushes'] else 0.0)
+        return stats
+
+    def _write(self, conn, batch):
+        start = time.perf_counter()
+        written, dropped = 0, 0
+        try:
+            written = insert_ticks(conn, batch, self._partitions)
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            self._partitions.clear()
+            written, dropped = 0, len(batch)
+            logger.error(f"Error writing {len(batch)} ticks: {str(e)}")
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self._stats_lock:
+            self.stats['written'] += written
+            self.stats['ignored'] += len(batch) - written - dropped
+            self.stats['dropped'] += dropped
+            self.stats['flushes'] += 1
+            self.stats['last_flush_ms'] = elapsed_ms
+            self.stats['total_flush_ms'] += elapsed_ms
+            self.stats['max_flush_ms'] = max(self.stats['max_flush_ms'], elapsed_ms)
+
+    def _run(self):
+        try:
+            conn = connect(self.db_file)
+        except Exception as e:
+            logger.error(f"Tick writer cannot open {self.db_file}: {str(e)}")
+            return
+        batch = []
+        waiters = []
+        deadline = time.monotonic() + self.flush_interval
+        running = True
+        while running:
+            try:
+                item = self.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                if isinstance(item, tuple) and item[0] is _FLUSH:
+                    waiters.append(item[1])
+                elif not (isinstance(item, tuple) and item[0] is _STOP):
+                    batch.append(item)
+            except queue.Empty:
+                pass
+            running = not (self._stop.is_set() and self.queue.empty())
+
+            if (len(batch) >= self.batch_size or waiters or not running
+                    or time.monotonic() >= deadline):
+                if batch:
+                    self._write(conn, batch)
+                    batch = []
+                for waiter in waiters:
+                    waiter.set()
+                waiters = []
+                deadline = time.monotonic() + self.flush_interval
+        conn.close()
 
-logger = logging.getLogger(_name_)
 
 class RealTimeStore:
-    def _init_(self):
-        self.db_file = "data/historical/realtime.db"
+    def __init__(self, db_file="data/historical/realtime.db"):
+        self.db_file = db_file
+        self.retention_days = settings.SETTINGS["TICK_RETENTION_DAYS"]
         self.create_table()
+        self.migration_thread = None
+        self.writer = None
+        if settings.SETTINGS["TICK_WRITE_BEHIND"]:
+            self.writer = TickWriter(
+                self.db_file,
+                batch_size=settings.SETTINGS["TICK_FLUSH_ROWS"],
+                flush_interval=settings.SETTINGS["TICK_FLUSH_INTERVAL"],
+                max_queue=settings.SETTINGS["TICK_QUEUE_SIZE"]
+            )
+        self.start_migration()
         
     def create_table(self):
-        """Create database table if not exists"""
-        conn = sqlite3.connect(self.db_file)
-        c = conn.cursor()
-        c.execute('''CREATE TABLE IF NOT EXISTS market_data (
-                     timestamp REAL PRIMARY KEY,
-                     instrument TEXT,
-                     price REAL,
-                     volume REAL,
-                     source TEXT)''')
+        """Create schema and today's partition if not exists"""
+        conn = connect(self.db_file)
+        ensure_partition(conn, partition_name(time.time_ns()))
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
         conn.commit()
         conn.close()
+
+    def has_legacy_table(self):
+        """Check for a pre-partitioning market_data table"""
+        conn = connect(self.db_file)
+        row = conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?",
+                           (LEGACY_TABLE,)).fetchone()
+        conn.close()
+        return row is not None
+
+    def start_migration(self):
+        """Migrate a legacy market_data table in the background"""
+        if not self.has_legacy_table():
+            return
+        self.migration_thread = threading.Thread(
+            target=self.migrate_legacy, name="tick-migration", daemon=True)
+        self.migration_thread.start()
+
+    def migrate_legacy(self, chunk_size=5000, pause=0.01):
+        """Move legacy rows into partitions, newest first, in small transactions
+
+        Each chunk is copied and deleted in one transaction so the migration
+        can be interrupted and resumed, and live writes are never blocked for
+        longer than a single chunk.
+        """
+        conn = connect(self.db_file)
+        moved = 0
+        try:
+            while True:
+                rows = conn.execute(
+                    f"SELECT rowid, timestamp, instrument, price, volume, source "
+                    f"FROM {LEGACY_TABLE} ORDER BY rowid DESC LIMIT ?", (chunk_size,)
+                ).fetchall()
+                if not rows:
+                    break
+                insert_ticks(conn, [(int(ts * 10**9), instrument, price, volume, source)
+                                    for _, ts, instrument, price, volume, source in rows])
+                conn.execute(f"DELETE FROM {LEGACY_TABLE} WHERE rowid >= ?", (rows[-1][0],))
+                conn.commit()
+                moved += len(rows)
+                time.sleep(pause)
+            conn.execute(f"DROP TABLE IF EXISTS {LEGACY_TABLE}")
+            conn.commit()
+            logger.info(f"Migrated {moved} legacy ticks to partitioned schema")
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Tick migration error after {moved} rows: {str(e)}")
+        finally:
+            conn.close()
         
     def save_tick(self, instrument, price, volume, source="ws"):
         """Save market tick to database"""
+        row = (time.time_ns(), instrument, price, volume, source)
+        if self.writer:
+            self.writer.submit(row)
+            return
         try:
-            conn = sqlite3.connect(self.db_file)
-            c = conn.cursor()
-            c.execute("INSERT INTO market_data VALUES (?, ?, ?, ?, ?)",
-                     (time.time(), instrument, price, volume, source))
+            conn = connect(self.db_file)
+            insert_ticks(conn, [row])
             conn.commit()
             conn.close()
         except Exception as e:
             logger.error(f"Error saving tick: {str(e)}")
             
     def get_recent_ticks(self, instrument, limit=100):
-        """Get recent market ticks"""
-        try:
-            conn = sqlite3.connect(self.db_file)
-            c = conn.cursor()
-            c.execute("SELECT timestamp, price, volume FROM market_data "
-                      "WHERE instrument = ? ORDER BY timestamp DESC LIMIT ?",
-                     (instrument, limit))
-            data = c.fetchall()
+        """Get recent market ticks as (timestamp, price, volume), newest first"""
+        try:
+            conn = connect(self.db_file)
+            data = []
+            for name in reversed(list_partitions(conn)):
+                rows = conn.execute(f"SELECT ts, price, volume FROM {name} "
+                                    "WHERE instrument = ? ORDER BY ts DESC LIMIT ?",
+                                    (instrument, limit - len(data))).fetchall()
+                data.extend((ts / 10**9, price, volume) for ts, price, volume in rows)
+                if len(data) >= limit:
+                    break
+            conn.close()
+            return data
+        except Exception as e:
+            logger.error(f"Error retrieving ticks: {str(e)}")
+            return []
+
+    def get_ticks_range(self, instrument, start_ns, end_ns):
+        """Get (ts_ns, price, volume) ticks in [start_ns, end_ns), oldest first"""
+        try:
+            conn = connect(self.db_file)
+            data = []
+            for name in list_partitions(conn):
+                first = partition_start_ns(name)
+                if first >= end_ns or first + NS_PER_DAY <= start_ns:
+                    continue
+                data.extend(conn.execute(f"SELECT ts, price, volume FROM {name} "
+                                         "WHERE instrument = ? AND ts >= ? AND ts < ? "
+                                         "ORDER BY ts", (instrument, start_ns, end_ns)))
             conn.close()
             return data
         except Exception as e:
             logger.error(f"Error retrieving ticks: {str(e)}")
             return []
+
+    def apply_retention(self, retention_days=None):
+        """Drop daily partitions older than the retention window"""
+        days = self.retention_days if retention_days is None else retention_days
+        cutoff = partition_name(time.time_ns() - days * NS_PER_DAY)
+        dropped = []
+        try:
+            conn = connect(self.db_file)
+            for name in list_partitions(conn):
+                if name < cutoff:
+                    conn.execute(f"DROP TABLE {name}")
+                    dropped.append(name)
+            conn.commit()
+            if dropped:
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            conn.close()
+        except Exception as e:
+            logger.error(f"Retention error: {str(e)}")
+        if dropped:
+            logger.info(f"Dropped {len(dropped)} tick partitions older than {days} days")
+        return dropped
+
+    def compact_to_archive(self, archive=None, keep_days=None):
+        """Move closed partitions older than keep_days into the tick archive
+
+        Partitions are only dropped after their rows are fsynced to the
+        archive; a crash in between is safe because archive appends skip
+        rows that are already there.
+        """
+        archive = archive or TickArchive(settings.TICK_ARCHIVE_DIR)
+        days = settings.SETTINGS["TICK_LIVE_DAYS"] if keep_days is None else keep_days
+        cutoff = partition_name(time.time_ns() - days * NS_PER_DAY)
+        today = partition_name(time.time_ns())
+        compacted = []
+        try:
+            conn = connect(self.db_file)
+            for name in list_partitions(conn):
+                if name >= cutoff or name >= today:
+                    continue
+                instruments = [row[0] for row in conn.execute(
+                    f"SELECT DISTINCT instrument FROM {name}")]
+                for instrument in instruments:
+                    rows = conn.execute(f"SELECT ts, price, volume FROM {name} "
+                                        "WHERE instrument = ? ORDER BY ts", (instrument,)).fetchall()
+                    if rows:
+                        ts, prices, volumes = zip(*rows)
+                        archive.append(instrument, ts, prices, volumes)
+                conn.execute(f"DROP TABLE {name}")
+                conn.commit()
+                compacted.append(name)
+            if compacted:
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            conn.close()
+        except Exception as e:
+            logger.error(f"Tick compaction error: {str(e)}")
+        if compacted:
+            logger.info(f"Compacted {len(compacted)} tick partitions into archive")
+        return compacted
+
+    def flush(self):
+        """Persist any queued ticks"""
+        if self.writer:
+            return self.writer.flush()
+        return True
+
+    def close(self):
+        """Flush-on-shutdown hook"""
+        if self.writer:
+            self.writer.close()
+
+    def get_stats(self):
+        """Write-behind queue depth and flush latency counters"""
+        return self.writer.get_stats() if self.writer else {}
@@ -0,0 +1,182 @@
+"""
+tick_archive.py - Append-only memory-mapped tick archive for research
+
+One file per instrument per UTC day (<root>/<SYMBOL>/<YYYYMMDD>.ticks) of
+fixed-width little-endian records (ts int64 ns, price float64, volume
+float64). Columns are read through np.memmap, so range reads are zero-copy
+strided views. A sparse index (<YYYYMMDD>.idx) holds the timestamp of every
+INDEX_STRIDE-th record, which keeps time seeks O(log n) while touching only
+a couple of data pages. The index is derived data: it is written after the
+records it covers, checked against the data file before use and rebuilt
+when a crash left the two out of step.
+
+Readers never modify files. They map only the complete records and fall
+back to an in-memory index when the one on disk is stale; torn records and
+stale indexes are repaired by the writer before its next append.
+"""
+
+import os
+import time
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+TICK_DTYPE = np.dtype([('ts', '<i8'), ('price', '<f8'), ('volume', '<f8')])
+INDEX_STRIDE = 1024
+NS_PER_DAY = 86400 * 10**9
+
+
+def day_key(ts_ns):
+    """UTC day (YYYYMMDD) of a nanosecond timestamp"""
+    return time.strftime('%Y%m%d', time.gmtime(ts_ns // 10**9))
+
+
+class TickArchive:
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _paths(self, symbol, day):
+        folder = os.path.join(self.root, symbol.replace('/', ''))
+        return os.path.join(folder, f"{day}.ticks"), os.path.join(folder, f"{day}.idx")
+
+    def symbols(self):
+        return sorted(os.listdir(self.root))
+
+    def days(self, symbol):
+        """Archived days for a symbol, oldest first"""
+        folder = os.path.join(self.root, symbol.replace('/', ''))
+        if not os.path.isdir(folder):
+            return []
+        return sorted(name[:-6] for name in os.listdir(folder) if name.endswith('.ticks'))
+
+    def _rows(self, path):
+        """Complete records in a data file; a partial trailing record is ignored"""
+        if not os.path.exists(path):
+            return 0
+        return os.path.getsize(path) // TICK_DTYPE.itemsize
+
+    def _trim_torn_tail(self, path):
+        """Writer side: drop a partial record left by a crashed append"""
+        if not os.path.exists(path):
+            return
+        size = os.path.getsize(path)
+        if size % TICK_DTYPE.itemsize:
+            logger.warning(f"Trimming torn record from {path}")
+            with open(path, 'r+b') as f:
+                f.truncate(size - size % TICK_DTYPE.itemsize)
+
+    def open_day(self, symbol, day):
+        """Read-only memmap of one day's records (None when missing or empty)"""
+        path, _ = self._paths(symbol, day)
+        rows = self._rows(path)
+        if not rows:
+            return None
+        return np.memmap(path, dtype=TICK_DTYPE, mode='r', shape=(rows,))
+
+    def last_timestamp(self, symbol, day):
+        records = self.open_day(symbol, day)
+        return int(records['ts'][-1]) if records is not None else None
+
+    def append(self, symbol, ts_ns, prices, volumes):
+        """Append ticks (any order, any days); returns the number of rows written
+
+        Rows at or before the last archived timestamp of their day are
+        skipped, which keeps files sorted and makes re-running a compaction
+        idempotent.
+        """
+        records = np.empty(len(ts_ns), dtype=TICK_DTYPE)
+        records['ts'] = ts_ns
+        records['price'] = prices
+        records['volume'] = volumes
+        records.sort(order='ts', kind='stable')
+
+        days = (records['ts'] // NS_PER_DAY)
+        written = 0
+        for day_number in np.unique(days):
+            chunk = records[days == day_number]
+            day = day_key(int(chunk['ts'][0]))
+            last = self.last_timestamp(symbol, day)
+            if last is not None:
+                chunk = chunk[chunk['ts'] > last]
+            if len(chunk):
+                self._append_day(symbol, day, chunk)
+                written += len(chunk)
+        return written
+
+    def _append_day(self, symbol, day, chunk):
+        path, index_path = self._paths(symbol, day)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._trim_torn_tail(path)
+        start = self._rows(path)
+        if start:
+            # Positions below assume the index covers exactly the rows on disk
+            self._load_index(self.open_day(symbol, day), index_path, repair=True)
+        with open(path, 'ab') as f:
+            f.write(chunk.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+
+        # Extend the sparse index with every stride boundary we crossed
+        first = -(-start // INDEX_STRIDE) * INDEX_STRIDE
+        positions = np.arange(first, start + len(chunk), INDEX_STRIDE)
+        if len(positions):
+            with open(index_path, 'ab') as f:
+                f.write(chunk['ts'][positions - start].astype('<i8').tobytes())
+
+    def _load_index(self, records, index_path, repair=False):
+        """Sparse index of a day's records, rebuilt if it does not match them
+
+        The rebuilt index is only written back with repair=True (the writer);
+        readers use it in memory.
+        """
+        expected = -(-len(records) // INDEX_STRIDE)
+        if os.path.exists(index_path) and os.path.getsize(index_path) == 8 * expected:
+            sparse = np.fromfile(index_path, dtype='<i8')
+            if not expected or (sparse[0] == records['ts'][0]
+                                and sparse[-1] == records['ts'][(expected - 1) * INDEX_STRIDE]):
+                return sparse
+        sparse = np.ascontiguousarray(records['ts'][::INDEX_STRIDE], dtype='<i8')
+        if not repair:
+            return sparse
+        logger.warning(f"Rebuilding tick index {index_path}")
+        tmp_path = index_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(sparse.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, index_path)
+        return sparse
+
+    def _seek(self, records, sparse, ts_ns):
+        """First row with ts >= ts_ns"""
+        if not len(sparse):
+            return int(np.searchsorted(records['ts'], ts_ns, side='left'))
+        block = max(int(np.searchsorted(sparse, ts_ns, side='left')) - 1, 0)
+        lo = block * INDEX_STRIDE
+        hi = min(lo + 2 * INDEX_STRIDE, len(records))
+        return lo + int(np.searchsorted(records['ts'][lo:hi], ts_ns, side='left'))
+
+    def iter_range(self, symbol, start_ns, end_ns):
+        """Yield zero-copy record views for [start_ns, end_ns), one per day"""
+        first, last = day_key(start_ns), day_key(max(end_ns - 1, start_ns))
+        for day in self.days(symbol):
+            if day < first or day > last:
+                continue
+            records = self.open_day(symbol, day)
+            if records is None:
+                continue
+            _, index_path = self._paths(symbol, day)
+            sparse = self._load_index(records, index_path)
+            lo = self._seek(records, sparse, start_ns)
+            hi = self._seek(records, sparse, end_ns)
+            if hi > lo:
+                yield records[lo:hi]
+
+    def read_range(self, symbol, start_ns, end_ns):
+        """Records for [start_ns, end_ns); zero-copy when the range is one day"""
+        parts = list(self.iter_range(symbol, start_ns, end_ns))
+        if not parts:
+            return np.empty(0, dtype=TICK_DTYPE)
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
@@ -1,4 +1,7 @@
+import os
 import argparse
+import asyncio
+from config import settings
 from core.pocket_option_api import PocketOptionAPI
 from core.trading_engine import TradingEngine
 from utilities.logger import configure_logger
@@ -12,20 +15,51 @@ def parse_args():
                         default='moderate', help='Risk management profile')
     parser.add_argument('--capital', type=float, default=10000,
                         help='Initial trading capital')
+    parser.add_argument('--runtime', choices=['threaded', 'async'], default=settings.SETTINGS["RUNTIME"],
+                        help='Engine runtime: worker threads or a single asyncio loop')
     return parser.parse_args()
 
-if _name_ == "_main_":
+async def run_async():
+    """Build and run the asyncio engine"""
+    from core.async_api import AsyncPocketOptionAPI
+    from core.async_engine import AsyncTradingEngine
+    
+    api = await AsyncPocketOptionAPI().open()
+    engine = AsyncTradingEngine(api)
+    
+    try:
+        await engine.initialize_models_async()
+    except Exception as e:
+        logger.error(f"Model initialization failed: {str(e)}")
+        await api.close()
+        return
+    
+    await engine.run_async()
+
+if __name__ == "__main__":
     # Configure logger
     configure_logger()
-    logger = logging.getLogger(_name_)
+    logger = logging.getLogger(__name__)
     
     # Parse command line arguments
     args = parse_args()
     
-    # Update settings based on command line arguments
+    # Update settings based on command line arguments; SETTINGS was read at
+    # import, the environment carries them to child processes
     os.environ['DEMO_MODE'] = str(args.mode == 'demo')
     os.environ['RISK_PROFILE'] = args.risk
     os.environ['INITIAL_CAPITAL'] = str(args.capital)
+    settings.SETTINGS.update(DEMO_MODE=args.mode == 'demo', RISK_PROFILE=args.risk,
+                             INITIAL_CAPITAL=args.capital)
+    
+    if args.runtime == 'async':
+        try:
+            asyncio.run(run_async())
+        except KeyboardInterrupt:
+            pass
+        except Exception as e:
+            logger.critical(f"Fatal error in trading engine: {str(e)}")
+        exit(0)
     
     # Initialize API
     api = PocketOptionAPI()
@@ -10,10 +10,10 @@ import logging
 from utilities.logger import configure_logger
 
 configure_logger()
-logger = logging.getLogger(_name_)
+logger = logging.getLogger(__name__)
 
 class AutoDeploy:
-    def _init_(self, mode='demo', risk='moderate', capital=10000):
+    def __init__(self, mode='demo', risk='moderate', capital=10000):
         self.mode = mode
         self.risk = risk
         self.capital = capital
@@ -117,7 +117,7 @@ class AutoDeploy:
         
         return True
 
-if _name_ == "_main_":
+if __name__ == "__main__":
     import argparse
     parser = argparse.ArgumentParser(description="Auto Deploy Trading System")
     parser.add_argument('--mode', choices=['demo', 'real'], default='demo')
@@ -0,0 +1,73 @@
+"""
+benchmark_breakout.py - Compare DataFrame and monotonic-deque breakout detection
+
+Runs both on a synthetic 100k-bar history and reports the cost of answering
+"is the latest bar a breakout?" once per new bar, which is what every scan
+does, plus full-history batch throughput (pandas rolling vs the vectorized
+detect_breakouts) for backtests.
+
+Usage: python -m scripts.benchmark_breakout [--bars 100000] [--lookback 20]
+"""
+
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from core.breakout import BreakoutDetector, detect_breakouts
+
+
+def dataframe_breakouts(df, lookback):
+    """Rolling-window detection over the whole frame, as done per scan"""
+    resistance = df['high'].rolling(lookback).max().shift(1)
+    support = df['low'].rolling(lookback).min().shift(1)
+    return np.where(df['close'] > resistance, 1, np.where(df['close'] < support, -1, 0))
+
+
+def synthetic_history(bars, seed=42):
+    rng = np.random.default_rng(seed)
+    close = 1.1 + np.cumsum(rng.normal(0, 0.0005, bars))
+    spread = np.abs(rng.normal(0, 0.0003, bars))
+    return pd.DataFrame({'high': close + spread, 'low': close - spread, 'close': close})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Breakout detection benchmark")
+    parser.add_argument('--bars', type=int, default=100_000)
+    parser.add_argument('--lookback', type=int, default=20)
+    parser.add_argument('--scans', type=int, default=200,
+                        help='Per-bar DataFrame recomputations to sample')
+    args = parser.parse_args()
+
+    df = synthetic_history(args.bars)
+    high, low, close = (df[c].to_numpy() for c in ('high', 'low', 'close'))
+
+    # Batch: full history in one call
+    start = time.perf_counter()
+    expected = dataframe_breakouts(df, args.lookback)
+    df_batch = time.perf_counter() - start
+
+    start = time.perf_counter()
+    flags = detect_breakouts(high, low, close, args.lookback)
+    numpy_batch = time.perf_counter() - start
+    assert np.array_equal(flags, expected), "implementations disagree"
+
+    # Streaming: one new bar at a time
+    start = time.perf_counter()
+    for _ in range(args.scans):
+        dataframe_breakouts(df, args.lookback)[-1]
+    df_per_bar = (time.perf_counter() - start) / args.scans
+
+    detector = BreakoutDetector(args.lookback)
+    start = time.perf_counter()
+    for h, l, c in zip(high.tolist(), low.tolist(), close.tolist()):
+        detector.update(h, l, c)
+    deque_per_bar = (time.perf_counter() - start) / args.bars
+
+    print(f"Bars: {args.bars:,} | Lookback: {args.lookback}")
+    print(f"Batch      DataFrame: {df_batch * 1000:9.2f} ms | numpy: {numpy_batch * 1000:9.2f} ms")
+    print(f"Per bar    DataFrame: {df_per_bar * 1e6:9.2f} us | deque: {deque_per_bar * 1e6:9.2f} us "
+          f"({df_per_bar / deque_per_bar:,.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+benchmark_runtime.py - Compare the threaded and asyncio runtime components
+
+A component benchmark: it drives the event-handling pieces each engine is
+built from, not TradingEngine and AsyncTradingEngine themselves (those
+need a broker API, models and the feature store). Order placement,
+Telegram traffic and REST fallbacks are not part of the measurement.
+
+Replays one synthetic session through both runtimes: a tick stream for
+every instrument, trades opened on a fixed schedule and a signal
+evaluation (a small dense forward pass) on every bar close. The threaded
+runtime delivers ticks from a feeder thread like the WebSocket client and
+uses SignalDispatcher workers and TradeScheduler; the async runtime feeds
+ticks from a coroutine, evaluates on a CPU executor and monitors trades
+with AsyncTradeScheduler. Each runtime runs in a fresh process and reports
+event delivery lag, bar-to-signal latency, settlement lateness, early-exit
+reaction time, peak thread count and memory.
+
+Usage: python -m scripts.benchmark_runtime [--instruments 50] [--seconds 20] [--trades 500]
+"""
+
+import time
+import asyncio
+import argparse
+import threading
+import tracemalloc
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import numpy as np
+import psutil
+from core.signal_dispatcher import SignalDispatcher
+from core.trade_scheduler import TradeScheduler, AsyncTradeScheduler
+
+WORKERS = 2
+_rng = np.random.default_rng(0)
+W1 = _rng.normal(size=(40, 64))
+W2 = _rng.normal(size=(64, 1))
+
+
+def synthetic_session(instruments, seconds, trades, tick_interval, seed=7):
+    """Time-ordered (offset, kind, symbol, payload) events"""
+    rng = np.random.default_rng(seed)
+    events = []
+    for i in range(instruments):
+        symbol = f"SYM{i:03d}"
+        times = np.arange(rng.uniform(0, tick_interval), seconds, tick_interval)
+        prices = 1.0 + np.cumsum(rng.normal(0, 0.0008, len(times)))
+        events += [(float(t), 'tick', symbol, float(p)) for t, p in zip(times, prices)]
+        events += [(float(t), 'bar', symbol, None) for t in np.arange(1.0, seconds, 1.0)]
+    for n, t in enumerate(np.sort(rng.uniform(0, max(seconds - 6, 1), trades))):
+        symbol = f"SYM{rng.integers(instruments):03d}"
+        direction = 'BUY' if rng.random() < 0.5 else 'SELL'
+        events.append((float(t), 'open', symbol, (f"T{n}", direction, float(rng.uniform(1, 5)))))
+    events.sort(key=lambda event: event[0])
+    return events
+
+
+def evaluate(symbol):
+    """Stand-in for feature assembly and inference on one instrument"""
+    X = np.random.default_rng().normal(size=(200, 40))
+    for _ in range(10):
+        np.tanh(X @ W1) @ W2
+
+
+class Recorder:
+    def __init__(self, trades):
+        self.trades = trades
+        self.lag, self.signal, self.settle, self.early = [], [], [], []
+        self.threads = threading.active_count()
+        self.done = threading.Event()
+
+    def on_settle(self, trade, result, profit_factor):
+        now = time.monotonic()
+        if result == "early_loss":
+            self.early.append(now - trade.last_update)
+        else:
+            self.settle.append(now - trade.expiry)
+        if len(self.settle) + len(self.early) == self.trades:
+            self.done.set()
+
+    def delivered(self, start, offset):
+        self.lag.append(time.monotonic() - start - offset)
+        self.threads = max(self.threads, threading.active_count())
+
+
+def run_threaded(events, recorder):
+    scheduler = TradeScheduler(recorder.on_settle, settle_workers=WORKERS)
+    dispatcher = SignalDispatcher(evaluate, workers=WORKERS, max_pending=100_000, debounce=0)
+    last_price = {}
+    start = time.monotonic()
+
+    def feed():
+        for offset, kind, symbol, payload in events:
+            delay = start + offset - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            recorder.delivered(start, offset)
+            if kind == 'tick':
+                last_price[symbol] = payload
+                scheduler.on_price(symbol, None, payload)
+            elif kind == 'bar':
+                # Wall-clock time the bar was due to close
+                dispatcher.on_bar(symbol, time.time() - (time.monotonic() - start - offset))
+            else:
+                trade_id, direction, duration = payload
+                scheduler.open(trade_id, symbol, direction, last_price.get(symbol, 1.0), duration, duration / 2)
+
+    feeder = threading.Thread(target=feed, name="feeder")
+    feeder.start()
+    feeder.join()
+    recorder.done.wait(30)
+    scheduler.stop()
+    dispatcher.stop()
+    recorder.signal = list(dispatcher.latencies)
+
+
+async def run_async(events, recorder):
+    loop = asyncio.get_running_loop()
+    scheduler = AsyncTradeScheduler(recorder.on_settle, settle_workers=WORKERS)
+    cpu = ThreadPoolExecutor(max_workers=WORKERS)
+    pending = set()
+    last_price = {}
+
+    async def evaluate_bar(symbol, event_time):
+        await loop.run_in_executor(cpu, evaluate, symbol)
+        recorder.signal.append(time.time() - event_time)
+
+    start = time.monotonic()
+    for offset, kind, symbol, payload in events:
+        delay = start + offset - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        recorder.delivered(start, offset)
+        if kind == 'tick':
+            last_price[symbol] = payload
+            scheduler.on_price(symbol, None, payload)
+        elif kind == 'bar':
+            task = loop.create_task(evaluate_bar(symbol, time.time()))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+        else:
+            trade_id, direction, duration = payload
+            scheduler.open(trade_id, symbol, direction, last_price.get(symbol, 1.0), duration, duration / 2)
+
+    await loop.run_in_executor(None, recorder.done.wait, 30)
+    await asyncio.gather(*pending)
+    scheduler.stop()
+    cpu.shutdown()
+
+
+def measure(runtime, instruments, seconds, trades, tick_interval):
+    """Run one runtime over the session; meant for a fresh process"""
+    events = synthetic_session(instruments, seconds, trades, tick_interval)
+    recorder = Recorder(trades)
+    rss = psutil.Process().memory_info().rss
+    tracemalloc.start()
+    if runtime == 'threaded':
+        run_threaded(events, recorder)
+    else:
+        asyncio.run(run_async(events, recorder))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    def percentiles(values):
+        values = np.asarray(values) * 1000
+        if not len(values):
+            return "n/a"
+        p50, p99 = np.percentile(values, [50, 99])
+        return f"{p50:7.2f} / {p99:7.2f} / {values.max():7.2f}"
+
+    return {
+        'event lag ms (p50/p99/max)': percentiles(recorder.lag),
+        'bar->signal ms': percentiles(recorder.signal),
+        'settle lateness ms': percentiles(recorder.settle),
+        'early exit ms': percentiles(recorder.early),
+        'trades settled': f"{len(recorder.settle) + len(recorder.early)} / {trades}",
+        'peak threads': recorder.threads,
+        'peak traced MB': f"{peak / 2**20:.1f}",
+        'rss growth MB': f"{(psutil.Process().memory_info().rss - rss) / 2**20:.1f}",
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Threaded vs asyncio runtime component benchmark")
+    parser.add_argument('--instruments', type=int, default=50)
+    parser.add_argument('--seconds', type=float, default=20)
+    parser.add_argument('--trades', type=int, default=500)
+    parser.add_argument('--tick-interval', type=float, default=0.1,
+                        help='Seconds between ticks per instrument')
+    args = parser.parse_args()
+
+    results = {}
+    context = multiprocessing.get_context('spawn')
+    for runtime in ('threaded', 'async'):
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            results[runtime] = pool.submit(measure, runtime, args.instruments, args.seconds,
+                                           args.trades, args.tick_interval).result()
+
+    print(f"{args.instruments} instruments, {args.trades} trades, "
+          f"1 tick per {args.tick_interval}s per instrument, {args.seconds:.0f}s session")
+    print(f"{'':28}{'threaded':>28}{'async':>28}")
+    for metric in results['threaded']:
+        print(f"{metric:28}{str(results['threaded'][metric]):>28}{str(results['async'][metric]):>28}")
+
+
+if __name__ == '__main__':
+    main()
@@ -41,5 +41,5 @@ def main():
     
     print("\nCopy these to your .env file")
 
-if _name_ == '_main_':
+if __name__ == '__main__':
     main()
@@ -8,10 +8,10 @@ from config import settings
 
 # Configure logger
 configure_logger()
-logger = logging.getLogger(_name_)
+logger = logging.getLogger(__name__)
 
 class SystemMonitor:
-    def _init_(self):
+    def __init__(self):
         self.bot = TelegramBot()
         self.security = SecurityManager()
         self.thresholds = {
@@ -82,6 +82,6 @@ class SystemMonitor:
                 logger.error(f"Monitor error: {str(e)}")
                 time.sleep(60)
 
-if _name_ == '_main_':
+if __name__ == '__main__':
     monitor = SystemMonitor()
     monitor.monitor_loop()
@@ -0,0 +1,185 @@
+import sys
+import types
+import asyncio
+import shutil
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+# aiohttp is not installed here; the async runtime only
+# needs the names below, served by an in-memory HTTP session
+class ClientConnectionError(Exception):
+    pass
+
+class ClientResponseError(Exception):
+    pass
+
+class FakeResponse:
+    def __init__(self, status=200, body=None, headers=None):
+        self.status = status
+        self.body = body
+        self.headers = headers or {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise ClientResponseError(self.status)
+
+    async def json(self, content_type=None):
+        return self.body
+
+class FakeSession:
+    def __init__(self, headers=None, connector=None, timeout=None):
+        self.headers = headers
+        self.requests = []
+        self.replies = []
+        self.closed = False
+
+    def request(self, method, url, **kwargs):
+        self.requests.append((method, url, kwargs))
+        reply = self.replies.pop(0) if self.replies else FakeResponse(body={})
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+    async def close(self):
+        self.closed = True
+
+fake_aiohttp = types.ModuleType('aiohttp')
+fake_aiohttp.ClientSession = FakeSession
+fake_aiohttp.TCPConnector = lambda **kwargs: kwargs
+fake_aiohttp.ClientTimeout = lambda **kwargs: kwargs
+fake_aiohttp.ClientConnectionError = ClientConnectionError
+fake_aiohttp.ClientResponseError = ClientResponseError
+fake_aiohttp.WSMsgType = types.SimpleNamespace(TEXT=1, ERROR=2)
+
+from config import settings
+
+# The stub only lives while this module's tests run; the runtime modules are
+# imported under it and dropped again with it
+modules = patch.dict(sys.modules)
+
+def setUpModule():
+    global async_api, pocket_option_api, AsyncPocketOptionAPI, AsyncTradingEngine, AsyncTelegramBot
+    modules.start()
+    try:
+        import aiohttp
+    except ImportError:
+        sys.modules['aiohttp'] = fake_aiohttp
+    from core import async_api, pocket_option_api
+    from core.async_api import AsyncPocketOptionAPI
+    from core.async_engine import AsyncTradingEngine
+    from core.telegram_bot import AsyncTelegramBot
+
+def tearDownModule():
+    modules.stop()
+
+class AsyncRuntimeTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        patchers = [
+            patch.object(async_api, 'aiohttp', fake_aiohttp),
+            patch.object(pocket_option_api, 'RealTimeStore', MagicMock),
+            patch.dict(settings.SETTINGS, DEMO_MODE=True, TELEGRAM_ENABLED=True),
+            patch.dict(settings.API_KEYS, TELEGRAM_BOT_TOKEN='token', TELEGRAM_CHAT_ID='chat'),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def run_async(self, coro):
+        return asyncio.run(asyncio.wait_for(coro, 10))
+
+class TestAsyncPocketOptionAPI(AsyncRuntimeTest):
+    def test_request_retries_idempotent_calls(self):
+        async def scenario():
+            api = await AsyncPocketOptionAPI().open()
+            api.http.replies = [FakeResponse(503, headers={'Retry-After': '0'}),
+                                ClientConnectionError("reset"),
+                                FakeResponse(body={'ok': True})]
+            with patch.object(async_api, 'backoff_delay', return_value=0):
+                body = await api.request('GET', f"{api.base_url}/v1/quotes")
+            requests = list(api.http.requests)
+            http = api.http
+            await api.close()
+            return body, requests, http
+
+        body, requests, http = self.run_async(scenario())
+        self.assertEqual(body, {'ok': True})
+        self.assertEqual(len(requests), 3)
+        self.assertTrue(http.closed)
+
+    def test_orders_are_not_retried(self):
+        async def scenario():
+            api = await AsyncPocketOptionAPI().open()
+            api.http.replies = [FakeResponse(503)]
+            try:
+                with self.assertRaises(ClientResponseError):
+                    await api.request('POST', f"{api.base_url}/v1/orders", json={})
+                return len(api.http.requests)
+            finally:
+                await api.close()
+
+        self.assertEqual(self.run_async(scenario()), 1)
+
+class TestAsyncTelegramBot(AsyncRuntimeTest):
+    def test_messages_are_posted_on_the_client_loop(self):
+        async def scenario():
+            api = await AsyncPocketOptionAPI().open()
+            bot = AsyncTelegramBot(api)
+            # Called from an executor thread, like engine code would
+            queued = await asyncio.get_running_loop().run_in_executor(None, bot.send_message, "hello")
+            await bot.drain()
+            requests = list(api.http.requests)
+            await api.close()
+            return queued, requests
+
+        queued, requests = self.run_async(scenario())
+        self.assertTrue(queued)
+        method, url, kwargs = requests[0]
+        self.assertEqual((method, url), ('POST', "https://api.telegram.org/bottoken/sendMessage"))
+        self.assertEqual(kwargs['json']['text'], "hello")
+
+class TestAsyncTradingEngine(AsyncRuntimeTest):
+    def setUp(self):
+        super().setUp()
+        for name, value in (('FEATURE_STORE_DIR', self.root + '/features/'),
+                            ('INDICATOR_CHECKPOINT', self.root + '/indicators.json')):
+            patcher = patch.object(settings, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_trade_from_a_worker_thread_is_placed_monitored_and_announced(self):
+        instrument = {'id': 'EUR/USD-OTC', 'symbol': 'EUR/USD', 'payout': 0.9}
+
+        async def scenario():
+            api = await AsyncPocketOptionAPI().open()
+            engine = AsyncTradingEngine(api)
+            self.assertIsInstance(engine.telegram_bot, AsyncTelegramBot)
+            loop = asyncio.get_running_loop()
+            started = await loop.run_in_executor(None, engine.start_trade, instrument, 'BUY', 0.9)
+            while not engine.active_trades:
+                await asyncio.sleep(0.01)
+            await engine.telegram_bot.drain()
+            result = (started, dict(engine.active_trades), engine.trade_scheduler.open_count(),
+                      set(engine.pending_trades), list(api.http.requests))
+            await engine.shutdown_async()
+            return result
+
+        started, active, monitored, pending, requests = self.run_async(scenario())
+        self.assertTrue(started)
+        self.assertEqual([trade['instrument'] for trade in active.values()], ['EUR/USD'])
+        self.assertEqual(monitored, 1)
+        self.assertEqual(pending, set())
+        texts = [kwargs['json']['text'] for _, _, kwargs in requests]
+        self.assertTrue(any("TRADING SYSTEM STARTED" in text for text in texts))
+        self.assertTrue(any("NEW TRADING SIGNAL" in text for text in texts))
+
+if __name__ == '__main__':
+    unittest.main()
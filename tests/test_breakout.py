@@ -0,0 +1,43 @@
+import unittest
+import numpy as np
+from core.breakout import RollingExtremes, BreakoutDetector, detect_breakouts
+from core.indicators import compute_indicator_panel
+
+class TestBreakout(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.close = 1.0 + np.cumsum(rng.normal(0, 0.01, 2000))
+        self.high = self.close + np.abs(rng.normal(0, 0.005, 2000))
+        self.low = self.close - np.abs(rng.normal(0, 0.005, 2000))
+
+    def test_rolling_extremes_match_brute_force(self):
+        extremes = RollingExtremes(window=15)
+        for i in range(len(self.close)):
+            extremes.push(self.high[i], self.low[i])
+            start = max(0, i - 14)
+            self.assertEqual(extremes.high, self.high[start:i + 1].max())
+            self.assertEqual(extremes.low, self.low[start:i + 1].min())
+
+    def test_batch_matches_vectorized_panel(self):
+        flags = detect_breakouts(self.high, self.low, self.close, lookback=20)
+        panel = compute_indicator_panel(self.close[None, :], self.high[None, :], self.low[None, :])
+        np.testing.assert_array_equal(flags, panel['breakout'][0])
+        self.assertTrue((flags != 0).any())
+
+    def test_batch_matches_streaming_detector(self):
+        detector = BreakoutDetector(lookback=20)
+        streamed = [detector.update(h, l, c) for h, l, c in zip(self.high, self.low, self.close)]
+        np.testing.assert_array_equal(detect_breakouts(self.high, self.low, self.close, 20), streamed)
+        self.assertEqual(len(detect_breakouts(self.high[:5], self.low[:5], self.close[:5], 20)), 5)
+
+    def test_checkpoint_round_trip(self):
+        detector = BreakoutDetector(lookback=10)
+        for i in range(500):
+            detector.update(self.high[i], self.low[i], self.close[i])
+        restored = BreakoutDetector.from_state(detector.state())
+        for i in range(500, 700):
+            self.assertEqual(restored.update(self.high[i], self.low[i], self.close[i]),
+                             detector.update(self.high[i], self.low[i], self.close[i]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import time
+import unittest
+from core.candle_aggregator import CandleAggregator
+
+class TestCandleAggregator(unittest.TestCase):
+    def setUp(self):
+        self.closed = []
+        self.candles = CandleAggregator(timeframes=(60,), max_late_bars=1)
+        self.candles.add_listener(lambda symbol, tf, bar: self.closed.append((symbol, tf, bar)))
+
+    def test_builds_ohlcv_and_emits_on_close(self):
+        for ts, price in [(0, 1.0), (10, 1.5), (20, 0.5), (59, 1.2), (61, 2.0)]:
+            self.candles.add_tick("EURUSD", ts, price, 1.0)
+        self.assertEqual(len(self.closed), 1)
+        bar = self.closed[0][2]
+        self.assertEqual((bar['open'], bar['high'], bar['low'], bar['close'], bar['volume']),
+                         (1.0, 1.5, 0.5, 1.2, 4.0))
+        self.assertEqual(len(self.candles.get_candles("EURUSD", include_open=True)), 2)
+
+    def test_out_of_order_ticks_use_tick_time(self):
+        self.candles.add_tick("EURUSD", 30, 1.3)
+        self.candles.add_tick("EURUSD", 5, 1.0)
+        self.candles.add_tick("EURUSD", 20, 1.1)
+        bar = self.candles.get_candles("EURUSD", include_open=True)[0]
+        self.assertEqual((bar['open'], bar['close']), (1.0, 1.3))
+
+    def test_late_ticks_amend_recent_bars_only(self):
+        for ts in (0, 60, 120, 180):
+            self.candles.add_tick("EURUSD", ts, 1.0)
+        self.candles.add_tick("EURUSD", 130, 5.0)  # one bar late: amended
+        self.candles.add_tick("EURUSD", 10, 9.0)   # too late: dropped
+        bars = self.candles.get_candles("EURUSD")
+        self.assertEqual(bars[2]['high'], 5.0)
+        self.assertEqual(bars[0]['high'], 1.0)
+        self.assertEqual(self.candles.stats['late'], 1)
+        self.assertEqual(self.candles.stats['dropped'], 1)
+
+    def test_close_due_closes_quiet_instruments(self):
+        self.candles.add_tick("EURUSD", 0, 1.0)
+        self.candles.close_due(59)
+        self.assertEqual(self.closed, [])
+        self.candles.close_due(60)
+        self.assertEqual(len(self.closed), 1)
+
+    def test_late_tick_after_forced_close_amends_without_reemitting(self):
+        self.candles.add_tick("EURUSD", 0, 1.0)
+        self.candles.close_due(61)
+        self.candles.add_tick("EURUSD", 59, 2.0)
+        self.candles.close_due(200)
+        self.assertEqual(len(self.closed), 1)
+        bars = self.candles.get_candles("EURUSD", include_open=True)
+        self.assertEqual(len(bars), 1)
+        self.assertEqual((bars[0]['high'], bars[0]['close']), (2.0, 2.0))
+        self.assertEqual(self.candles.stats['late'], 1)
+
+        self.candles.add_tick("EURUSD", 65, 3.0)
+        self.assertEqual(len(self.candles.get_candles("EURUSD", include_open=True)), 2)
+
+    def test_clock_thread_closes_bars(self):
+        now = [30.0]
+        self.candles.add_tick("EURUSD", 0, 1.0)
+        self.candles.start_clock(interval=0.01, grace=1.0, clock=lambda: now[0])
+        time.sleep(0.05)
+        self.assertEqual(self.closed, [])
+        now[0] = 61.0
+        deadline = time.monotonic() + 1
+        while not self.closed and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.candles.stop_clock()
+        self.assertEqual(len(self.closed), 1)
+
+if __name__ == '__main__':
+    unittest.main()
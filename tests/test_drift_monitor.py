@@ -0,0 +1,62 @@
+import time
+import unittest
+import numpy as np
+from core.drift_monitor import DriftMonitor, reference_profile, population_stability
+
+class TestDriftMonitor(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.train = rng.normal(size=(2000, 3))
+        self.same = rng.normal(size=(300, 3))
+        self.shifted = self.same + np.array([0, 1.5, 0])
+        self.metadata = {'reference': reference_profile(self.train), 'accuracy': 0.6,
+                         'feature_schema': ['a', 'b', 'c'], 'trained_at': time.time()}
+
+    def test_psi_flags_only_shifted_feature(self):
+        psi = population_stability(self.metadata['reference'], self.shifted)
+        self.assertLess(psi[0], 0.1)
+        self.assertGreater(psi[1], 0.25)
+        self.assertLess(population_stability(self.metadata['reference'], self.same).max(), 0.1)
+
+    def test_assessment_and_plan(self):
+        monitor = DriftMonitor(min_trades=5)
+        stable = monitor.assess("A", self.same, self.metadata)
+        drifted = monitor.assess("B", self.shifted, self.metadata)
+        for _ in range(10):
+            monitor.record_outcome("C", False)
+        losing = monitor.assess("C", self.same, self.metadata)
+        missing = monitor.assess("D", self.same, {})
+        self.assertLess(stable['score'], 1)
+        self.assertIn("psi", drifted['reasons'][0])
+        self.assertIn("(b)", drifted['reasons'][0])
+        self.assertAlmostEqual(losing['score'], 6)
+        self.assertTrue(monitor.is_suspended("C"))
+        self.assertFalse(monitor.is_suspended("D"))
+
+        costs = {"B": 50, "C": 50, "D": 50}
+        plan = monitor.plan([stable, drifted, losing, missing], 100, costs.get)
+        self.assertEqual(plan, ["D", "B"])
+        monitor.reset("C")
+        self.assertFalse(monitor.is_suspended("C"))
+
+    def test_live_accuracy_scores_direction_calls_on_the_next_bar(self):
+        monitor = DriftMonitor(min_trades=3)
+        calls = [(1, 1.2), (0, 1.0), (1, 0.9), (0, 1.1)]  # (prediction, next close) after a 1.0 close
+        for i, (prediction, close) in enumerate(calls):
+            monitor.record_prediction("A", "EURUSD", 60 * (i + 1), 1.0, prediction)
+            monitor.on_bar("EURUSD", 60 * i, 5.0)  # the bar the call was made on
+            monitor.on_bar("EURUSD", 60 * (i + 1), close)
+        self.assertEqual(monitor.live_accuracy("A"), 0.5)
+
+        # A call whose bar never closed is dropped, not scored on a later bar
+        monitor.record_prediction("A", "EURUSD", 600, 1.0, 1)
+        monitor.on_bar("EURUSD", 660, 2.0)
+        self.assertEqual(list(monitor.outcomes["A"]), [1, 1, 0, 0])
+
+    def test_old_models_are_due(self):
+        monitor = DriftMonitor(max_age_hours=24)
+        metadata = dict(self.metadata, trained_at=time.time() - 25 * 3600)
+        self.assertGreaterEqual(monitor.assess("A", self.same, metadata)['score'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
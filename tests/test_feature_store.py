@@ -0,0 +1,56 @@
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from core.feature_store import FeatureStore
+from core.indicators import FEATURE_COLUMNS
+
+class TestFeatureStore(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def fill(self, store, closes):
+        for i, close in enumerate(closes):
+            store.append("EURUSD", 60 * i, np.full(len(FEATURE_COLUMNS), i), close)
+
+    def test_targets_and_persistence(self):
+        store = FeatureStore(self.root, capacity=100)
+        self.fill(store, [1.0, 1.1, 1.05, 1.2])
+        self.assertFalse(store.append("EURUSD", 60, np.zeros(len(FEATURE_COLUMNS)), 1.3))
+        X, y = FeatureStore(self.root, capacity=100).dataset("EURUSD")
+        self.assertEqual(list(X.columns), FEATURE_COLUMNS)
+        self.assertEqual(X.dtypes.iloc[0], np.float32)
+        self.assertEqual(list(X.index), [0, 60, 120])
+        self.assertEqual(list(y), [1, 0, 1])
+        np.testing.assert_array_equal(store.latest("EURUSD"), np.full(len(FEATURE_COLUMNS), 3, dtype=np.float32))
+
+    def test_ring_keeps_last_rows(self):
+        store = FeatureStore(self.root, capacity=5)
+        self.fill(store, np.arange(12, dtype=float))
+        X, y = store.dataset("EURUSD")
+        self.assertEqual(list(X.index), [60 * i for i in range(7, 11)])
+        self.assertTrue((y == 1).all())
+        X, _ = store.dataset("EURUSD", 2)
+        self.assertEqual(list(X.index), [540, 600])
+
+class TestBuildDataset(unittest.TestCase):
+    def test_does_not_mutate_and_drops_incomplete_rows(self):
+        from core.ai_models import build_dataset
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame({column: rng.normal(size=50) for column in FEATURE_COLUMNS[:6]})
+        df['close'] = 1 + rng.random(50)
+        df['high'] = df['close'] + 0.01
+        df['low'] = df['close'] - 0.01
+        df.loc[:4, 'ema20'] = np.nan
+        before = df.copy()
+        X, y = build_dataset(df)
+        pd.testing.assert_frame_equal(df, before)
+        self.assertEqual(len(X), 44)
+        self.assertFalse(X.isna().any().any())
+
+if __name__ == '__main__':
+    unittest.main()
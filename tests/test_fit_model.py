@@ -0,0 +1,67 @@
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from core import ai_models
+from core.ai_models import AIModel, ModelCache, fit_model, training_metadata
+from core.model_registry import ModelRegistry
+
+class TestFitModel(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        rng = np.random.default_rng(3)
+        cls.X = pd.DataFrame(rng.normal(size=(2000, 8)))
+        cls.y = pd.Series((cls.X[0] + cls.X[3] > 0).astype(int))
+
+    def test_full_fit_uses_early_stopping(self):
+        model, accuracy = fit_model(self.X[:1500], self.y[:1500])
+        self.assertIsInstance(model, xgb.XGBClassifier)
+        self.assertLess(model.best_iteration, model.get_booster().num_boosted_rounds())
+        self.assertGreater(accuracy, 0.8)
+
+    def test_continuation_adds_trees_to_previous_booster(self):
+        base, _ = fit_model(self.X[:1500], self.y[:1500])
+        # 500 new rows alone would normally get an MLP
+        model, accuracy = fit_model(self.X[1500:], self.y[1500:], base_model=base)
+        self.assertIsInstance(model, xgb.XGBClassifier)
+        self.assertGreater(model.get_booster().num_boosted_rounds(), base.best_iteration + 1)
+        self.assertGreaterEqual(model.best_iteration, base.best_iteration)
+        self.assertGreater(accuracy, 0.8)
+
+class TestContinuation(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        for name, value in (('MODEL_PATH', self.root + '/'),
+                            ('model_registry', ModelRegistry(self.root + '/registry', keep=0)),
+                            ('model_cache', ModelCache(2**30))):
+            patcher = patch.object(ai_models, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        rng = np.random.default_rng(3)
+        self.X = pd.DataFrame(rng.normal(size=(5000, 8)), index=np.arange(5000) * 60)
+        self.y = pd.Series((self.X[0] + self.X[3] > 0).astype(int), index=self.X.index)
+        self.model = AIModel("EUR/USD-OTC")
+        X, y = self.X[:4700], self.y[:4700]
+        model, accuracy = fit_model(X, y)
+        self.model.install(model, accuracy, training_metadata(X, accuracy, 1.0))
+
+    def test_a_full_window_trains_xgboost(self):
+        self.assertIsInstance(self.model.model, xgb.XGBClassifier)
+
+    def test_continuation_holds_only_rows_newer_than_the_model(self):
+        base, X_new, y_new, continuations = self.model.continuation(self.X, self.y)
+        self.assertIs(base, self.model.model)
+        self.assertEqual(list(X_new.index), list(self.X.index[4700:]))
+        self.assertEqual(list(y_new.index), list(X_new.index))
+        self.assertEqual(continuations, 1)
+
+    def test_too_few_new_rows_means_a_full_rebuild(self):
+        self.assertIsNone(self.model.continuation(self.X[:4760], self.y[:4760]))
+        self.assertIsNone(self.model.continuation(self.X[:4700], self.y[:4700]))
+
+if __name__ == '__main__':
+    unittest.main()
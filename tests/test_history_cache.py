@@ -0,0 +1,78 @@
+import time
+import threading
+import unittest
+from unittest.mock import patch
+from core.history_cache import HistoryCache
+
+class FakeFeed:
+    def __init__(self, now):
+        self.now = now
+        self.calls = []
+
+    def fetch(self, instrument_id, limit=100):
+        self.calls.append(limit)
+        last = int(self.now // 60) * 60
+        return [{'timestamp': last - 60 * i, 'close': float(last - 60 * i)}
+                for i in reversed(range(limit))]
+
+class TestHistoryCache(unittest.TestCase):
+    def setUp(self):
+        self.feed = FakeFeed(now=600000.0)
+        self.cache = HistoryCache(self.feed.fetch, timeframe=60, ttl=5, max_bars=500)
+
+    def get(self, limit, now):
+        self.feed.now = now
+        with patch('core.history_cache.time.time', return_value=now):
+            return self.cache.get("EUR/USD-OTC", limit)
+
+    def test_serves_smaller_limits_from_memory(self):
+        self.get(200, 600000.0)
+        bars = self.get(50, 600001.0)
+        self.assertEqual(len(bars), 50)
+        self.assertEqual(self.feed.calls, [200])
+        self.assertEqual(self.cache.stats['hits'], 1)
+
+    def test_delta_fetch_merges_only_new_bars(self):
+        self.get(200, 600000.0)
+        bars = self.get(200, 600000.0 + 180)
+        self.assertEqual(self.feed.calls, [200, 4])
+        timestamps = [bar['timestamp'] for bar in bars]
+        self.assertEqual(timestamps, sorted(set(timestamps)))
+        self.assertEqual(timestamps[-1], int((600000 + 180) // 60) * 60)
+
+    def test_lru_eviction(self):
+        cache = HistoryCache(self.feed.fetch, max_instruments=2)
+        for instrument in ("A", "B", "C"):
+            cache.get(instrument, 10)
+        self.assertNotIn("A", cache.entries)
+        self.assertEqual(cache.stats['evictions'], 1)
+
+    def test_short_history_is_complete_and_served_from_memory(self):
+        feed = lambda instrument_id, limit=100: [{'timestamp': 600000 - 60 * i} for i in reversed(range(min(limit, 30)))]
+        cache = HistoryCache(feed, ttl=60, max_bars=500)
+        self.assertEqual(len(cache.get("NEW-OTC", 200)), 30)
+        self.assertEqual(len(cache.get("NEW-OTC", 200)), 30)
+        self.assertEqual((cache.stats['misses'], cache.stats['hits']), (1, 1))
+
+    def test_concurrent_misses_fetch_once(self):
+        calls = []
+
+        def slow_fetch(instrument_id, limit=100):
+            calls.append(limit)
+            time.sleep(0.05)
+            return [{'timestamp': 600000 - 60 * i} for i in reversed(range(limit))]
+
+        cache = HistoryCache(slow_fetch, ttl=60, max_bars=500)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get("EUR/USD-OTC", 100)))
+                   for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(2)
+        self.assertEqual(calls, [100])
+        self.assertEqual([len(bars) for bars in results], [100] * 5)
+        self.assertEqual((cache.stats['misses'], cache.stats['hits']), (1, 4))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+import ta
+from core.indicators import (IndicatorEngine, StreamingIndicators, FEATURE_COLUMNS,
+                             compute_indicator_panel, indicator_history)
+
+def batch_features(df):
+    """Reference batch computation with the ta library"""
+    out = pd.DataFrame(index=df.index)
+    out['ema5'] = ta.trend.EMAIndicator(df['close'], window=5).ema_indicator()
+    out['ema20'] = ta.trend.EMAIndicator(df['close'], window=20).ema_indicator()
+    out['rsi6'] = ta.momentum.RSIIndicator(df['close'], window=6).rsi()
+    macd = ta.trend.MACD(df['close'])
+    out['macd'] = macd.macd()
+    out['macd_signal'] = macd.macd_signal()
+    out['macd_hist'] = macd.macd_diff()
+    out['price_change'] = df['close'].pct_change()
+    out['volatility'] = df['high'] - df['low']
+    return out[FEATURE_COLUMNS]
+
+def random_bars(n, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 1.1 + np.cumsum(rng.normal(0, 0.001, n))
+    close[50:53] = close[49]  # flat stretch exercises the zero-change paths
+    spread = np.abs(rng.normal(0, 0.0005, n))
+    return pd.DataFrame({
+        'timestamp': np.arange(n) * 60,
+        'close': close,
+        'high': close + spread,
+        'low': close - spread
+    })
+
+class TestStreamingIndicators(unittest.TestCase):
+    def test_streaming_matches_batch_exactly(self):
+        df = random_bars(400)
+        expected = batch_features(df).to_numpy()
+        indicators = StreamingIndicators()
+        streamed = np.array([indicators.features(indicators.update(row.close, row.high, row.low))
+                             for row in df.itertuples()])
+        np.testing.assert_array_equal(streamed, expected)
+
+    def test_peek_matches_batch_without_mutating(self):
+        df = random_bars(120)
+        expected = batch_features(df).iloc[-1].to_numpy()
+        indicators = StreamingIndicators()
+        indicators.seed(df.iloc[:-1].to_dict('records'))
+        before = indicators.state()
+        last = df.iloc[-1]
+        peeked = indicators.features(indicators.peek(last.close, last.high, last.low))
+        np.testing.assert_array_equal(peeked, expected)
+        self.assertEqual(indicators.state()['bars'], before['bars'])
+
+    def test_engine_incremental_features_and_checkpoint(self):
+        df = random_bars(300)
+        bars = df.to_dict('records')
+        engine = IndicatorEngine()
+        engine.features_for("EURUSD", bars[:200])
+        features = engine.features_for("EURUSD", bars[150:260])
+        np.testing.assert_array_equal(features, batch_features(df.iloc[:260]).iloc[-1].to_numpy())
+
+        path = os.path.join(tempfile.mkdtemp(), "indicators.json")
+        engine.save(path)
+        restored = IndicatorEngine()
+        self.assertTrue(restored.load(path))
+        features = restored.features_for("EURUSD", bars[250:])
+        np.testing.assert_array_equal(features, batch_features(df).iloc[-1].to_numpy())
+
+    def test_checkpoint_without_breakout_state_loads(self):
+        df = random_bars(100)
+        indicators = StreamingIndicators()
+        indicators.seed(df.to_dict('records'))
+        state = indicators.state()
+        del state['breakout']
+        del state['values']['breakout']
+        restored = StreamingIndicators.from_state(state)
+        self.assertEqual(restored.values['breakout'], 0)
+        self.assertEqual(restored.features(), indicators.features())
+
+class TestIndicatorPanel(unittest.TestCase):
+    def test_panel_matches_per_instrument_batch(self):
+        frames = [random_bars(300, seed=seed) for seed in (1, 2, 3)]
+        close, high, low = (np.vstack([df[column].to_numpy() for df in frames])
+                            for column in ('close', 'high', 'low'))
+        panel = compute_indicator_panel(close, high, low)
+        for row, df in enumerate(frames):
+            X = np.column_stack([panel[column][row] for column in FEATURE_COLUMNS])
+            np.testing.assert_array_equal(X, batch_features(df).to_numpy())
+
+    def test_history_of_one_candle_list(self):
+        df = random_bars(180)
+        history = indicator_history(df.to_dict('records'))
+        X = np.column_stack([history[column] for column in FEATURE_COLUMNS])
+        np.testing.assert_array_equal(X, batch_features(df).to_numpy())
+        self.assertEqual(len(history['breakout']), 180)
+
+    def test_breakout_against_prior_range(self):
+        close = np.array([[1.0] * 25 + [2.0], [1.0] * 25 + [0.5], [1.0] * 26])
+        panel = compute_indicator_panel(close, close + 0.1, close - 0.1, lookback=20)
+        np.testing.assert_array_equal(panel['breakout'][:, -1], [1, -1, 0])
+
+if __name__ == '__main__':
+    unittest.main()
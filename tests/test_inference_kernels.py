@@ -0,0 +1,41 @@
+import unittest
+import numpy as np
+from sklearn.neural_network import MLPClassifier
+import xgboost as xgb
+from core.inference_kernels import MLPKernel, TreeEnsembleKernel
+
+class TestInferenceKernels(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        rng = np.random.default_rng(7)
+        X = rng.normal(size=(1500, 8))
+        y = (X[:, 0] + X[:, 3] * X[:, 1] > 0).astype(int)
+        cls.mlp = MLPClassifier(hidden_layer_sizes=(50, 25, 10), max_iter=200, random_state=42).fit(X, y)
+        X_missing = X.copy()
+        X_missing[rng.random(X.shape) < 0.02] = np.nan
+        cls.booster = xgb.XGBClassifier(n_estimators=60, max_depth=5).fit(X_missing, y)
+        cls.early = xgb.XGBClassifier(n_estimators=200, max_depth=3, early_stopping_rounds=5).fit(
+            X[:1200], y[:1200], eval_set=[(X[1200:], y[1200:])], verbose=False)
+        cls.X = rng.normal(size=(500, 8))
+
+    def assert_identical(self, model, kernel, X):
+        np.testing.assert_array_equal(kernel.predict_proba(X), model.predict_proba(X))
+        np.testing.assert_array_equal(kernel.predict(X), model.predict(X))
+        for row in range(20):
+            np.testing.assert_array_equal(kernel.predict_proba(X[row:row + 1]), model.predict_proba(X[row:row + 1]))
+
+    def test_mlp_bit_identical(self):
+        self.assert_identical(self.mlp, MLPKernel.export(self.mlp), self.X)
+
+    def test_xgboost_bit_identical_with_missing_values(self):
+        X = self.X.copy()
+        X[::7, 2] = np.nan
+        self.assert_identical(self.booster, TreeEnsembleKernel.export(self.booster), X)
+
+    def test_xgboost_respects_best_iteration(self):
+        kernel = TreeEnsembleKernel.export(self.early)
+        self.assertEqual(len(kernel.roots), self.early.best_iteration + 1)
+        self.assert_identical(self.early, kernel, self.X)
+
+if __name__ == '__main__':
+    unittest.main()
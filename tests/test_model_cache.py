@@ -0,0 +1,88 @@
+import os
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+import numpy as np
+import joblib
+from sklearn.neural_network import MLPClassifier
+from core import ai_models
+from core.ai_models import ModelCache, array_bytes
+
+class TestModelCache(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        rng = np.random.default_rng(0)
+        cls.X = rng.normal(size=(200, 8))
+        cls.y = (cls.X[:, 0] > 0).astype(int)
+        cls.model = MLPClassifier(hidden_layer_sizes=(32,), max_iter=50, random_state=0).fit(cls.X, cls.y)
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.path = os.path.join(self.root, "model.pkl")
+        joblib.dump(self.model, self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_put_sizes_models_without_pickling_and_evicts_lru(self):
+        size = array_bytes(self.model)
+        self.assertGreaterEqual(size, sum(w.nbytes for w in self.model.coefs_))
+        cache = ModelCache(budget_bytes=int(size * 2.5))
+        with patch('pickle.dumps', side_effect=AssertionError("pickled")):
+            for key in ('A', 'B', 'C'):
+                cache.put(key, self.model)
+        self.assertNotIn('A', cache)
+        self.assertIn('B', cache)
+        self.assertEqual(cache.stats['evictions'], 1)
+
+        cache.put('B', self.model, size=10)
+        cache.put('B', self.model)
+        self.assertEqual(cache.entries['B'][1], 10)
+
+    def test_concurrent_loads_read_the_file_once(self):
+        cache = ModelCache(budget_bytes=2**30)
+        real_load = joblib.load
+
+        def slow_load(*args, **kwargs):
+            time.sleep(0.1)
+            return real_load(*args, **kwargs)
+
+        results = []
+        with patch.object(ai_models.joblib, 'load', side_effect=slow_load) as load:
+            threads = [threading.Thread(target=lambda: results.append(cache.get('A', self.path)))
+                       for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(5)
+        self.assertEqual(load.call_count, 1)
+        self.assertEqual(len(results), 4)
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertEqual(cache.stats['loads'], 1)
+
+    def test_model_put_during_a_load_is_not_overwritten(self):
+        cache = ModelCache(budget_bytes=2**30)
+        newer = MLPClassifier()
+        real_load = joblib.load
+
+        def racing_load(*args, **kwargs):
+            cache.put('A', newer)
+            return real_load(*args, **kwargs)
+
+        with patch.object(ai_models.joblib, 'load', side_effect=racing_load):
+            self.assertIs(cache.get('A', self.path), newer)
+        self.assertIs(cache.get('A', self.path), newer)
+
+    def test_read_only_mmap_still_allows_online_updates(self):
+        cache = ModelCache(budget_bytes=2**30, mmap_mode='r')
+        model = cache.get('A', self.path)
+        self.assertIsInstance(model.coefs_[0], np.memmap)
+        model.partial_fit(self.X[:10], self.y[:10])
+        # Copy-on-write: the artifact on disk is untouched
+        np.testing.assert_array_equal(joblib.load(self.path).coefs_[0], self.model.coefs_[0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+from types import SimpleNamespace
+import numpy as np
+from sklearn.neural_network import MLPClassifier
+import xgboost as xgb
+from core.ai_models import ModelPool
+
+class TestModelPool(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        X = rng.normal(size=(400, 8))
+        y = (X[:, 0] + X[:, 3] > 0).astype(int)
+        mlp = MLPClassifier(hidden_layer_sizes=(10,), max_iter=300, random_state=42).fit(X, y)
+        booster = xgb.XGBClassifier(n_estimators=20, max_depth=3).fit(X, y)
+        self.pool = ModelPool()
+        self.pool["EUR/USD-OTC"] = SimpleNamespace(model=mlp)
+        self.pool["GBP/USD-OTC"] = SimpleNamespace(model=booster)
+        self.pool["EUR/GBP-OTC"] = SimpleNamespace(model=mlp)
+        self.pool["USD/JPY-OTC"] = SimpleNamespace(model=None)
+        self.X = rng.normal(size=(5, 8))
+        self.ids = ["EUR/USD-OTC", "GBP/USD-OTC", "EUR/GBP-OTC", "USD/JPY-OTC", "BTC/USD-OTC"]
+
+    def test_batch_matches_single_row_predictions(self):
+        classes, probabilities = self.pool.predict_batch(self.X, self.ids)
+        for row, instrument_id in enumerate(self.ids[:3]):
+            model = self.pool[instrument_id].model
+            self.assertEqual(classes[row], model.predict(self.X[row:row + 1])[0])
+            self.assertAlmostEqual(probabilities[row], model.predict_proba(self.X[row:row + 1])[0, 1], places=6)
+        self.assertEqual(list(classes[3:]), [-1, -1])
+        self.assertTrue(np.isnan(probabilities[3:]).all())
+
+    def test_incomplete_features_are_skipped(self):
+        self.X[0, 2] = np.nan
+        classes, _ = self.pool.predict_batch(self.X, self.ids)
+        self.assertEqual(classes[0], -1)
+        self.assertNotEqual(classes[2], -1)
+
+    def test_same_architecture_mlps_are_scored_in_one_stacked_pass(self):
+        rng = np.random.default_rng(1)
+        X = rng.normal(size=(300, 8))
+        pool = ModelPool()
+        ids = []
+        for seed in range(4):
+            y = (X[:, seed] > 0).astype(int)
+            pool[f"I{seed}"] = SimpleNamespace(model=MLPClassifier(hidden_layer_sizes=(10,), max_iter=300,
+                                                                   random_state=seed).fit(X, y))
+            ids.append(f"I{seed}")
+        pool["WIDE"] = SimpleNamespace(model=MLPClassifier(hidden_layer_sizes=(12,), max_iter=300,
+                                                           random_state=0).fit(X, (X[:, 0] > 0).astype(int)))
+        ids.append("WIDE")
+        rows = rng.normal(size=(5, 8))
+
+        classes, probabilities = pool.predict_batch(rows, ids)
+        for row, instrument_id in enumerate(ids):
+            model = pool[instrument_id].model
+            np.testing.assert_allclose(probabilities[row], model.predict_proba(rows[row:row + 1])[0, 1], rtol=1e-12)
+            self.assertEqual(classes[row], model.predict(rows[row:row + 1])[0])
+        self.assertEqual(len(pool._stacks), 1)
+        stack = next(iter(pool._stacks.values()))
+        self.assertEqual(len(stack.kernels), 4)
+
+        # Reused while the models stay the same
+        pool.predict_batch(rows, ids)
+        self.assertIs(next(iter(pool._stacks.values())), stack)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+import joblib
+from core.model_registry import ModelRegistry
+
+class TestModelRegistry(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.registry = ModelRegistry(self.root, keep=3)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_publish_promotes_and_keeps_metadata(self):
+        self.assertIsNone(self.registry.current("EUR/USD-OTC"))
+        v1 = self.registry.publish("EUR/USD-OTC", {"w": 1}, {"accuracy": 0.6})
+        v2 = self.registry.publish("EUR/USD-OTC", {"w": 2}, {"accuracy": 0.7})
+        self.assertEqual((v1, v2), ("v000001", "v000002"))
+        self.assertEqual(self.registry.current("EUR/USD-OTC"), v2)
+        self.assertEqual(joblib.load(self.registry.current_path("EUR/USD-OTC")), {"w": 2})
+        self.assertEqual(self.registry.metadata("EUR/USD-OTC", v1)["accuracy"], 0.6)
+        # Pointer survives a restart
+        self.assertEqual(ModelRegistry(self.root).current("EUR/USD-OTC"), v2)
+
+    def test_rollback_and_prune(self):
+        for i in range(5):
+            self.registry.publish("EUR/USD-OTC", {"w": i})
+        self.assertEqual(self.registry.versions("EUR/USD-OTC"), ["v000003", "v000004", "v000005"])
+        self.assertEqual(self.registry.rollback("EUR/USD-OTC"), "v000004")
+        self.assertEqual(joblib.load(self.registry.current_path("EUR/USD-OTC")), {"w": 3})
+        self.registry.publish("EUR/USD-OTC", {"w": 5})
+        self.assertEqual(self.registry.current("EUR/USD-OTC"), "v000006")
+
+    def test_online_checkpoints_never_push_out_trained_versions(self):
+        self.registry.publish("EUR/USD-OTC", {"w": 0}, {"source": "retrain"})
+        self.registry.publish("EUR/USD-OTC", {"w": 1}, {"source": "retrain"})
+        for i in range(10):
+            self.registry.publish("EUR/USD-OTC", {"w": 1, "online": i}, {"source": "online"})
+        self.assertEqual(self.registry.versions("EUR/USD-OTC"),
+                         ["v000001", "v000002", "v000010", "v000011", "v000012"])
+        self.registry.publish("EUR/USD-OTC", {"w": 2}, {"source": "retrain"})
+        self.registry.publish("EUR/USD-OTC", {"w": 3}, {"source": "retrain"})
+        self.assertEqual(self.registry.versions("EUR/USD-OTC"),
+                         ["v000002", "v000010", "v000011", "v000012", "v000013", "v000014"])
+
+    def test_metadata_is_read_once_per_version(self):
+        version = self.registry.publish("EUR/USD-OTC", {"w": 1}, {"accuracy": 0.6})
+        os.remove(os.path.join(self.root, "EUR_USD-OTC", f"{version}.json"))
+        self.assertEqual(self.registry.metadata("EUR/USD-OTC")["accuracy"], 0.6)
+
+        # A fresh registry reads it from disk, then serves it from memory
+        registry = ModelRegistry(self.root, keep=3)
+        registry.publish("EUR/USD-OTC", {"w": 2}, {"accuracy": 0.7})
+        with patch('builtins.open', side_effect=AssertionError("re-read")):
+            self.assertEqual(registry.metadata("EUR/USD-OTC")["accuracy"], 0.7)
+
+    def test_no_temp_files_left_behind(self):
+        self.registry.publish("EUR/USD-OTC", {"w": 1})
+        names = os.listdir(os.path.join(self.root, "EUR_USD-OTC"))
+        self.assertEqual(sorted(names), ["CURRENT", "v000001.json", "v000001.pkl"])
+
+if __name__ == '__main__':
+    unittest.main()
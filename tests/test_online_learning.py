@@ -0,0 +1,112 @@
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+from sklearn.neural_network import MLPClassifier
+from core import ai_models
+from core.ai_models import AIModel, ModelCache
+from core.model_registry import ModelRegistry
+from core.online_learning import OnlineLearner
+
+class FakeModel:
+    def __init__(self, instrument_id):
+        self.instrument_id = instrument_id
+        self.batches = []
+        self.saves = 0
+
+    def update(self, X, y):
+        self.batches.append((X.shape, len(y)))
+        return True
+
+    def save(self):
+        self.saves += 1
+
+class TestOnlineLearner(unittest.TestCase):
+    def test_mini_batches_with_replay(self):
+        learner = OnlineLearner(batch_size=4, replay_size=3, checkpoint_interval=3600)
+        model = FakeModel("EUR/USD-OTC")
+        for i in range(12):
+            learner.submit(model, np.full(8, float(i)), i % 2)
+        learner.stop()
+        self.assertEqual(len(model.batches), 3)
+        self.assertEqual(model.batches[0], ((4, 8), 4))
+        self.assertEqual(model.batches[2], ((7, 8), 7))
+
+    def test_checkpoints_are_debounced(self):
+        learner = OnlineLearner(batch_size=1, checkpoint_interval=3600)
+        model = FakeModel("EUR/USD-OTC")
+        for i in range(10):
+            learner.submit(model, np.zeros(8), 1)
+        learner.stop()
+        # One checkpoint when first dirtied, one final flush on stop
+        self.assertEqual(model.saves, 2)
+        self.assertEqual(learner.get_stats()['updates'], 10)
+
+    def test_nan_rows_are_ignored(self):
+        learner = OnlineLearner(batch_size=1)
+        model = FakeModel("EUR/USD-OTC")
+        learner.submit(model, np.array([np.nan] * 8), 1)
+        learner.stop()
+        self.assertEqual(model.batches, [])
+
+class HookedMLP(MLPClassifier):
+    """MLP that runs `hook` in the middle of an online update"""
+    hook = None
+
+    def partial_fit(self, X, y):
+        super().partial_fit(X, y)
+        if HookedMLP.hook:
+            HookedMLP.hook()
+        return self
+
+class TestAIModelOnlineUpdates(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        for name, value in (('MODEL_PATH', self.root + '/'),
+                            ('model_registry', ModelRegistry(self.root + '/registry', keep=0)),
+                            ('model_cache', ModelCache(2**30))):
+            patcher = patch.object(ai_models, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(setattr, HookedMLP, 'hook', None)
+        rng = np.random.default_rng(0)
+        self.X = rng.normal(size=(200, 8))
+        self.y = (self.X[:, 0] > 0).astype(int)
+        self.model = AIModel("EUR/USD-OTC")
+        self.model.install(HookedMLP(hidden_layer_sizes=(8,), max_iter=20).fit(self.X, self.y), 0.6)
+
+    def test_update_then_checkpoint(self):
+        self.assertTrue(self.model.update(self.X[:8], self.y[:8]))
+        self.assertTrue(self.model.save())
+        self.assertEqual(self.model.metadata['source'], 'online')
+        self.assertEqual(self.model.metadata['parent'], 'v000001')
+        self.assertFalse(self.model.save())
+
+    def test_updated_model_is_not_evicted_before_its_checkpoint(self):
+        self.assertTrue(self.model.update(self.X[:8], self.y[:8]))
+        updated = self.model.model
+        cache = ai_models.model_cache
+        cache.budget_bytes = 1
+        for key in ('A', 'B'):
+            cache.put(key, MLPClassifier(), size=100)
+        self.assertIs(self.model.model, updated)
+        self.assertNotIn('A', cache)
+
+        self.assertTrue(self.model.save())
+        cache.put('C', MLPClassifier(), size=100)
+        self.assertNotIn(self.model.instrument_id, cache)
+        # The checkpoint is what gets reloaded
+        np.testing.assert_array_equal(self.model.model.coefs_[0], updated.coefs_[0])
+
+    def test_retrain_during_update_wins(self):
+        retrained = MLPClassifier(hidden_layer_sizes=(4,), max_iter=20).fit(self.X, self.y)
+        HookedMLP.hook = lambda: self.model.install(retrained, 0.7)
+        self.assertFalse(self.model.update(self.X[:8], self.y[:8]))
+        self.assertIs(self.model.model, retrained)
+        self.assertFalse(self.model.save())
+        self.assertEqual(self.model.version, 'v000002')
+
+if __name__ == '__main__':
+    unittest.main()
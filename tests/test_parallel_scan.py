@@ -0,0 +1,61 @@
+import time
+import threading
+import unittest
+from core.parallel_scan import ScanPool
+
+def instrument(symbol):
+    return {'id': f"{symbol}-OTC", 'symbol': symbol}
+
+class TestScanPool(unittest.TestCase):
+    def test_runs_in_parallel_and_keeps_order(self):
+        delays = {'A': 0.2, 'B': 0.05, 'C': 0.1, 'D': 0.2}
+
+        def prepare(inst):
+            time.sleep(delays[inst['symbol']])
+            return None if inst['symbol'] == 'C' else inst['symbol'].lower()
+
+        pool = ScanPool(prepare, workers=4, deadline=2)
+        start = time.monotonic()
+        results = pool.run([instrument(s) for s in 'ABCD'])
+        elapsed = time.monotonic() - start
+        pool.stop()
+        self.assertEqual([result for _, result in results], ['a', 'b', 'd'])
+        self.assertLess(elapsed, 0.35)
+        self.assertEqual([symbol for symbol, _, _ in pool.slowest(2)], ['A', 'D'])
+
+    def test_late_jobs_are_dropped_counted_and_not_resubmitted(self):
+        release = threading.Event()
+        calls = []
+
+        def prepare(inst):
+            calls.append(inst['symbol'])
+            if inst['symbol'] == 'SLOW':
+                release.wait(5)
+            if inst['symbol'] == 'BAD':
+                raise ValueError("no data")
+            return inst['symbol']
+
+        pool = ScanPool(prepare, workers=3, deadline=0.1)
+        universe = [instrument('SLOW'), instrument('FAST'), instrument('BAD')]
+        finished = []
+        first = pool.run(universe, finished)
+        second = pool.run(universe)
+        release.set()
+        time.sleep(0.05)
+        stats = pool.get_stats()
+        pool.stop()
+
+        self.assertEqual([result for _, result in first], ['FAST'])
+        self.assertEqual([result for _, result in second], ['FAST'])
+        self.assertEqual(calls.count('SLOW'), 1)
+        # Failed jobs finished; the late one did not
+        self.assertEqual(finished, ['FAST-OTC', 'BAD-OTC'])
+        self.assertEqual(stats['late'], 1)
+        self.assertEqual(stats['busy'], 1)
+        self.assertEqual(stats['errors'], 2)
+        self.assertEqual(stats['finished'], 5)
+        # Late jobs are still timed once they return
+        self.assertEqual(stats['slowest'][0][0], 'SLOW')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+import os
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+from data.historical import realtime_store
+from data.historical.realtime_store import (RealTimeStore, TickWriter, connect, list_partitions,
+                                            partition_name, NS_PER_DAY)
+
+DAY0 = 1_700_000_000 * 10**9 - (1_700_000_000 * 10**9) % NS_PER_DAY
+
+class TestTickWriter(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.db_file = os.path.join(self.root, "ticks.db")
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def count(self):
+        conn = connect(self.db_file)
+        total = sum(conn.execute(f"SELECT COUNT(*) FROM {name}").fetchone()[0]
+                    for name in list_partitions(conn))
+        conn.close()
+        return total
+
+    def test_flush_commits_and_duplicates_are_not_counted_as_written(self):
+        writer = TickWriter(self.db_file, batch_size=1000, flush_interval=60)
+        for i in range(10):
+            writer.submit((DAY0 + i, "EURUSD", 1.0 + i, 0.0, "ws"))
+        writer.submit((DAY0 + NS_PER_DAY, "EURUSD", 2.0, 0.0, "ws"))
+        writer.submit((DAY0, "EURUSD", 1.0, 0.0, "ws"))
+        self.assertTrue(writer.flush())
+        stats = writer.get_stats()
+        writer.close()
+
+        self.assertEqual(self.count(), 11)
+        self.assertEqual(stats['written'], 11)
+        self.assertEqual(stats['ignored'], 1)
+        self.assertEqual(stats['queue_depth'], 0)
+
+    def test_close_drains_the_queue(self):
+        writer = TickWriter(self.db_file, batch_size=7, flush_interval=60)
+        for i in range(100):
+            writer.submit((DAY0 + i, "BTCUSD", 1.0, 0.0, "ws"))
+        writer.close()
+        self.assertFalse(writer.submit((DAY0 + 100, "BTCUSD", 1.0, 0.0, "ws")))
+        self.assertEqual(self.count(), 100)
+
+    def test_full_queue_or_dead_writer_never_blocks(self):
+        writer = TickWriter(self.db_file, batch_size=10, flush_interval=60, max_queue=2)
+        release = threading.Event()
+        writer._write = lambda conn, batch: release.wait(5)
+        for i in range(20):
+            writer.submit((DAY0 + i, "EURUSD", 1.0, 0.0, "ws"))
+        self.assertGreater(writer.get_stats()['dropped'], 0)
+
+        start = time.monotonic()
+        self.assertFalse(writer.flush(timeout=0.2))
+        writer.close(timeout=0.2)
+        self.assertLess(time.monotonic() - start, 1.0)
+        release.set()
+
+        dead = TickWriter(os.path.join(self.root, "missing", "ticks.db"))
+        dead._thread.join(1)
+        self.assertFalse(dead.flush())
+        dead.close()
+
+class TestRealTimeStore(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.db_file = os.path.join(self.root, "realtime.db")
+        self.now = time.time_ns()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def store(self):
+        store = RealTimeStore(self.db_file)
+        self.addCleanup(store.close)
+        return store
+
+    def write(self, store, instrument, days_ago, n):
+        start = self.now - days_ago * NS_PER_DAY
+        for i in range(n):
+            store.writer.submit((start + i, instrument, float(days_ago), 0.0, "ws"))
+        store.flush()
+
+    def test_ticks_land_in_daily_partitions(self):
+        store = self.store()
+        self.write(store, "EURUSD", 2, 3)
+        self.write(store, "EURUSD", 0, 2)
+        conn = connect(self.db_file)
+        self.assertEqual(list_partitions(conn), [partition_name(self.now - 2 * NS_PER_DAY),
+                                                 partition_name(self.now)])
+        conn.close()
+
+        ticks = store.get_ticks_range("EURUSD", self.now - 3 * NS_PER_DAY, self.now + 10)
+        self.assertEqual([price for _, price, _ in ticks], [2.0] * 3 + [0.0] * 2)
+
+    def test_recent_ticks_stop_at_the_partition_that_fills_the_limit(self):
+        store = self.store()
+        for days_ago in (3, 2, 1, 0):
+            self.write(store, "EURUSD", days_ago, 5)
+
+        statements = []
+
+        def traced(db_file):
+            conn = connect(db_file)
+            conn.set_trace_callback(statements.append)
+            return conn
+
+        with patch.object(realtime_store, 'connect', traced):
+            ticks = store.get_recent_ticks("EURUSD", limit=8)
+        self.assertEqual([price for _, price, _ in ticks], [0.0] * 5 + [1.0] * 3)
+        self.assertEqual(len([sql for sql in statements if sql.startswith("SELECT ts")]), 2)
+        self.assertGreater(ticks[0][0], ticks[-1][0])
+
+    def test_retention_drops_old_partitions(self):
+        store = self.store()
+        for days_ago in (40, 31, 5, 0):
+            self.write(store, "BTCUSD", days_ago, 1)
+        dropped = store.apply_retention(30)
+        self.assertEqual(dropped, [partition_name(self.now - 40 * NS_PER_DAY),
+                                   partition_name(self.now - 31 * NS_PER_DAY)])
+        self.assertEqual(len(store.get_recent_ticks("BTCUSD", 10)), 2)
+
+    def test_legacy_table_is_migrated_in_the_background(self):
+        conn = connect(self.db_file)
+        conn.execute("CREATE TABLE market_data (timestamp REAL, instrument TEXT, price REAL, "
+                     "volume REAL, source TEXT)")
+        now = self.now / 10**9
+        conn.executemany("INSERT INTO market_data VALUES (?, ?, ?, ?, ?)",
+                         [(now - 86400 + i, "EURUSD", 1.0 + i, 0.0, "rest") for i in range(12)])
+        conn.commit()
+        conn.close()
+
+        store = self.store()
+        self.assertIsNotNone(store.migration_thread)
+        store.migration_thread.join(5)
+        self.assertFalse(store.has_legacy_table())
+        ticks = store.get_recent_ticks("EURUSD", 100)
+        self.assertEqual(len(ticks), 12)
+        self.assertEqual(ticks[0][1], 12.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import time
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+import requests
+from requests.adapters import HTTPAdapter
+from core import rest_client
+from core.rest_client import SingleFlight, TokenBucket, ThrottledAdapter, parse_retry_after
+
+def response(status, retry_after=None):
+    resp = MagicMock(status_code=status, headers={})
+    if retry_after is not None:
+        resp.headers['Retry-After'] = retry_after
+    return resp
+
+def request(method='GET', url='https://api.example.com/v1/quotes'):
+    return requests.Request(method, url).prepare()
+
+class TestSingleFlight(unittest.TestCase):
+    def test_concurrent_calls_share_one_execution(self):
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            release.wait(2)
+            return 'data'
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(flight.do('key', fetch)))
+                   for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join(2)
+
+        self.assertEqual(calls, [1])
+        self.assertEqual(results, ['data'] * 5)
+        self.assertEqual(flight.stats, {'executed': 1, 'coalesced': 4})
+        self.assertEqual(flight.calls, {})
+
+    def test_errors_reach_every_caller_and_are_not_cached(self):
+        flight = SingleFlight()
+        with self.assertRaises(ValueError):
+            flight.do('key', lambda: (_ for _ in ()).throw(ValueError("down")))
+        self.assertEqual(flight.do('key', lambda: 'ok'), 'ok')
+
+class TestTokenBucket(unittest.TestCase):
+    def test_burst_then_rate(self):
+        now = [100.0]
+        with patch.object(rest_client.time, 'monotonic', lambda: now[0]):
+            bucket = TokenBucket(rate=2, burst=3)
+            self.assertEqual([bucket.reserve() for _ in range(3)], [0, 0, 0])
+            self.assertAlmostEqual(bucket.reserve(), 0.5)
+            now[0] += 0.5
+            self.assertEqual(bucket.reserve(), 0)
+            now[0] += 10
+            self.assertEqual([bucket.reserve() for _ in range(3)], [0, 0, 0])
+            self.assertGreater(bucket.reserve(), 0)
+
+class TestThrottledAdapter(unittest.TestCase):
+    def setUp(self):
+        self.adapter = ThrottledAdapter(default_limit=(1000, 1000), endpoint_limits={'/v1/orders': (1, 1)},
+                                        retries=3, backoff=0.5, backoff_cap=8.0)
+        self.sleeps = []
+        sleep = patch.object(rest_client.time, 'sleep', self.sleeps.append)
+        sleep.start()
+        self.addCleanup(sleep.stop)
+
+    def test_unlisted_paths_share_the_default_bucket(self):
+        quotes = self.adapter.bucket_for('/v1/quotes/EURUSD')
+        self.assertIs(self.adapter.bucket_for('/v1/history/BTCUSD'), quotes)
+        orders = self.adapter.bucket_for('/v1/orders/123')
+        self.assertIsNot(orders, quotes)
+        self.assertEqual(orders.rate, 1)
+        self.assertEqual(len(self.adapter.buckets), 2)
+
+    def test_retries_idempotent_requests_honouring_retry_after(self):
+        replies = [response(503), response(429, '30'), response(200)]
+        with patch.object(HTTPAdapter, 'send', side_effect=replies) as send:
+            result = self.adapter.send(request())
+        self.assertEqual(result.status_code, 200)
+        self.assertEqual(send.call_count, 3)
+        self.assertLessEqual(self.sleeps[0], 0.5)
+        self.assertEqual(self.sleeps[1], 30.0)
+
+    def test_connection_errors_are_retried_then_raised(self):
+        errors = [requests.ConnectionError("reset")] * 4
+        with patch.object(HTTPAdapter, 'send', side_effect=errors) as send:
+            with self.assertRaises(requests.ConnectionError):
+                self.adapter.send(request())
+        self.assertEqual(send.call_count, 4)
+        self.assertEqual(len(self.sleeps), 3)
+
+    def test_non_idempotent_requests_are_not_retried(self):
+        with patch.object(HTTPAdapter, 'send', side_effect=[response(503)]) as send:
+            result = self.adapter.send(request('POST', 'https://api.example.com/v1/orders'))
+        self.assertEqual(result.status_code, 503)
+        self.assertEqual(send.call_count, 1)
+
+    def test_retry_after_formats(self):
+        self.assertEqual(parse_retry_after('120'), 120.0)
+        self.assertAlmostEqual(parse_retry_after('Wed, 21 Oct 2015 07:28:30 GMT', now=1445412480), 30.0)
+        self.assertIsNone(parse_retry_after('soon'))
+        self.assertIsNone(parse_retry_after(''))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import time
+import signal
+import unittest
+import multiprocessing
+import numpy as np
+import pandas as pd
+from core.retrain_pool import ParallelRetrainer
+
+class StuckData:
+    """Stands in for a dataset whose training is stuck in native code
+
+    SIGALRM is blocked, as it effectively is while a C extension runs, so
+    the worker's own time budget never fires.
+    """
+    def __len__(self):
+        signal.pthread_sigmask(signal.SIG_BLOCK, [signal.SIGALRM])
+        time.sleep(60)
+        return 0
+
+def dataset(n, seed=0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.normal(size=(n, 8)))
+    return X, pd.Series((X[0] > 0).astype(int))
+
+class TestParallelRetrainer(unittest.TestCase):
+    def setUp(self):
+        self.retrainer = ParallelRetrainer(workers=2, time_budget=30, cpus=[0], nice=0, grace=1)
+        self.addCleanup(self.retrainer.stop)
+
+    def test_failures_are_skipped_and_the_pool_is_reused(self):
+        X, y = dataset(200)
+        jobs = [('SHORT', X[:50], y[:50], None),
+                ('BAD', X, y[:10], None),
+                ('GOOD', X, y, None)]
+        results = list(self.retrainer.run(jobs))
+        self.assertEqual([instrument_id for instrument_id, *_ in results], ['GOOD'])
+        self.assertTrue(hasattr(results[0][1], 'predict_proba'))
+
+        executor = self.retrainer.executor
+        self.assertEqual(len(list(self.retrainer.run([('GOOD', X, y, None)]))), 1)
+        self.assertIs(self.retrainer.executor, executor)
+
+    @unittest.skipUnless(hasattr(signal, 'pthread_sigmask'), "needs POSIX signals")
+    def test_overrun_terminates_stuck_workers(self):
+        retrainer = ParallelRetrainer(workers=1, time_budget=0.5, cpus=[0], nice=0, grace=2)
+        self.addCleanup(retrainer.stop)
+        start = time.monotonic()
+        results = list(retrainer.run([('STUCK', StuckData(), None, None)]))
+        self.assertEqual(results, [])
+        self.assertLess(time.monotonic() - start, 20)
+        self.assertIsNone(retrainer.executor)
+        self.assertEqual(multiprocessing.active_children(), [])
+
+        # The next cycle gets a fresh pool
+        X, y = dataset(200)
+        retrainer.time_budget = 30
+        self.assertEqual(len(list(retrainer.run([('GOOD', X, y, None)]))), 1)
+
+if __name__ == '__main__':
+    unittest.main()
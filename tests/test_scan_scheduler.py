@@ -0,0 +1,58 @@
+import unittest
+import numpy as np
+from core.scan_scheduler import ScanScheduler, tick_volatility
+
+def instrument(symbol, payout):
+    return {'id': f"{symbol}-OTC", 'symbol': symbol, 'payout': payout}
+
+class TestScanScheduler(unittest.TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.scheduler = ScanScheduler(payout_threshold=0.8, min_interval=30, max_interval=600,
+                                       clock=lambda: self.now)
+        self.universe = [instrument('HOT', 0.95), instrument('WARM', 0.9),
+                         instrument('COLD', 0.8), instrument('LOW', 0.7)]
+        self.volatility = {'HOT': 0.003, 'WARM': 0.002, 'COLD': 0.0001, 'LOW': 0.01}
+        self.accuracy = {'HOT-OTC': 0.7, 'COLD-OTC': 0.4}
+
+    def due(self, scanned=None):
+        due = self.scheduler.due(self.universe, lambda inst: self.volatility[inst['symbol']], self.accuracy.get)
+        self.scheduler.mark_scanned(inst['id'] for inst in due if scanned is None or inst['symbol'] in scanned)
+        return [inst['symbol'] for inst in due]
+
+    def test_hot_instruments_are_scanned_more_often(self):
+        counts = {'HOT': 0, 'WARM': 0, 'COLD': 0, 'LOW': 0}
+        for step in range(120):
+            self.now = step * 30.0
+            for symbol in self.due():
+                counts[symbol] += 1
+        self.assertEqual(counts['LOW'], 0)
+        self.assertEqual(counts['HOT'], 120)
+        self.assertGreater(counts['WARM'], counts['COLD'])
+        self.assertLessEqual(counts['COLD'], 10)
+        self.assertEqual(self.scheduler.stats['low_payout'], 120)
+
+    def test_first_scan_covers_everything_eligible_hottest_first(self):
+        self.assertEqual(self.due(), ['HOT', 'WARM', 'COLD'])
+        self.assertEqual(self.due(), [])
+        priorities = self.scheduler.priorities
+        self.assertAlmostEqual(priorities['HOT-OTC'], 0.3 + 0.4 + 0.3 * 0.7)
+        self.assertAlmostEqual(self.scheduler.interval(1.0), 30)
+        self.assertAlmostEqual(self.scheduler.interval(0.0), 600)
+
+    def test_instruments_not_scanned_stay_due(self):
+        self.assertEqual(self.due(scanned={'HOT'}), ['HOT', 'WARM', 'COLD'])
+        self.now = 1.0
+        self.assertEqual(self.due(scanned=set()), ['WARM', 'COLD'])
+        self.assertEqual(self.due(), ['WARM', 'COLD'])
+        self.assertEqual(self.due(), [])
+
+    def test_missing_data_is_neutral(self):
+        priorities = self.scheduler.prioritize([instrument('NEW', 0.8)], lambda inst: None, lambda _: None)
+        self.assertAlmostEqual(priorities['NEW-OTC'], 0.3 + 0.4 * 0.5 + 0.3 * 0.5)
+        self.assertIsNone(tick_volatility([1.0, 1.1]))
+        self.assertAlmostEqual(tick_volatility([1.0, 1.0, 1.0, 1.0]), 0.0)
+        self.assertAlmostEqual(tick_volatility(np.exp([0, 0.01, 0, 0.01, 0])), 0.01)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,13 +1,31 @@
+import shutil
+import tempfile
 import unittest
 from unittest.mock import MagicMock, patch
+from config import settings
 from core.trading_engine import TradingEngine
 from core.pocket_option_api import PocketOptionAPI
 from core.risk_manager import RiskManager
 
 class TestTradingSystem(unittest.TestCase):
     def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        patchers = [patch.object(settings, 'FEATURE_STORE_DIR', self.root + '/features/'),
+                    patch.object(settings, 'INDICATOR_CHECKPOINT', self.root + '/indicators.json'),
+                    # set_demo_mode writes the global settings
+                    patch.dict(settings.SETTINGS)]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
         self.mock_api = MagicMock(spec=PocketOptionAPI)
+        # Set in PocketOptionAPI.__init__, so not part of the class spec
+        self.mock_api.demo_mode = True
+        self.mock_api.ws_connected = False
+        self.mock_api.candles = MagicMock()
+        self.mock_api.data_store = MagicMock()
         self.engine = TradingEngine(self.mock_api)
+        self.addCleanup(self.engine.trade_executor.shutdown)
         self.engine.risk_manager = MagicMock(spec=RiskManager)
         self.engine.telegram_bot = MagicMock()
         
@@ -23,11 +41,14 @@ class TestTradingSystem(unittest.TestCase):
         self.engine.set_demo_mode(True)
         self.assertTrue(self.engine.demo_mode)
         
+    @patch('core.trading_engine.time.sleep', side_effect=KeyboardInterrupt)  # stop after one report
     @patch('core.trading_engine.datetime')
-    def test_performance_reporting(self, mock_datetime):
+    def test_performance_reporting(self, mock_datetime, mock_sleep):
         mock_datetime.utcnow.return_value.hour = 10  # Within trading hours
-        self.engine.performance_reporting()
+        self.engine.risk_manager.get_performance_report.return_value = {'total_trades': 3}
+        with self.assertRaises(KeyboardInterrupt):
+            self.engine.performance_reporting()
         self.engine.telegram_bot.send_performance_report.assert_called()
 
-if _name_ == '_main_':
+if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,63 @@
+import time
+import unittest
+from core.sentiment import SentimentService, base_currency
+
+def wait_for(condition, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+class TestSentimentService(unittest.TestCase):
+    def test_lookups_are_shared_per_base_currency(self):
+        calls = []
+
+        def fetch(currency):
+            calls.append(currency)
+            return 'bullish'
+
+        service = SentimentService(fetch, ttl=60, refresh_ahead=5)
+        self.addCleanup(service.stop)
+        self.assertEqual(service.get("EUR/USD-OTC"), 'neutral')
+        self.assertTrue(wait_for(lambda: "EUR" in service.cache))
+        self.assertEqual(service.get("EUR/GBP"), 'bullish')
+        self.assertEqual(service.get("EUR/JPY-OTC"), 'bullish')
+        self.assertEqual(calls, ["EUR"])
+        self.assertEqual(base_currency("GBP/USD-OTC"), "GBP")
+
+    def test_failed_fetch_backs_off_instead_of_refetching_on_every_read(self):
+        calls = []
+        outcomes = [RuntimeError("rate limited"), RuntimeError("rate limited"), 'bearish']
+
+        def fetch(currency):
+            calls.append(currency)
+            outcome = outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        service = SentimentService(fetch, ttl=60, refresh_ahead=5, retry_base=60, retry_cap=600)
+        self.addCleanup(service.stop)
+        service.get("USD/JPY")
+        self.assertTrue(wait_for(lambda: service.stats['errors'] == 1 and not service.pending))
+        for _ in range(20):
+            self.assertEqual(service.get("USD/JPY"), 'neutral')
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(service.stats['backoff'], 20)
+        first_delay = service.retry_at["USD"] - time.time()
+        self.assertGreater(first_delay, 25)
+
+        service.retry_at["USD"] = 0
+        service.get("USD/JPY")
+        self.assertTrue(wait_for(lambda: service.stats['errors'] == 2 and not service.pending))
+        self.assertGreater(service.retry_at["USD"] - time.time(), 55)
+
+        service.retry_at["USD"] = 0
+        service.get("USD/JPY")
+        self.assertTrue(wait_for(lambda: "USD" in service.cache))
+        self.assertEqual(service.get("USD/CHF"), 'bearish')
+        self.assertNotIn("USD", service.failures)
+        self.assertEqual(len(calls), 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import time
+import threading
+import unittest
+from core.signal_dispatcher import SignalDispatcher
+
+class TestSignalDispatcher(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+        self.release = threading.Event()
+
+    def evaluate(self, symbol):
+        self.release.wait(2)
+        self.calls.append(symbol)
+
+    def wait_idle(self, dispatcher, count):
+        deadline = time.time() + 2
+        while dispatcher.stats['evaluated'] < count and time.time() < deadline:
+            time.sleep(0.01)
+
+    def test_coalesce_debounce_and_latency(self):
+        dispatcher = SignalDispatcher(self.evaluate, workers=1, debounce=60)
+        dispatcher.on_bar("EURUSD", time.time())
+        time.sleep(0.05)  # worker picks it up and blocks
+        dispatcher.on_bar("GBPUSD", time.time())
+        dispatcher.on_bar("GBPUSD", time.time())
+        self.release.set()
+        self.wait_idle(dispatcher, 2)
+        dispatcher.on_bar("EURUSD", time.time())
+        stats = dispatcher.get_stats()
+        dispatcher.stop()
+        self.assertEqual(self.calls, ["EURUSD", "GBPUSD"])
+        self.assertEqual((stats['coalesced'], stats['debounced']), (1, 1))
+        self.assertIn('p95', stats['latency_ms'])
+
+    def test_latency_is_measured_from_the_bar_close(self):
+        self.release.set()
+        dispatcher = SignalDispatcher(self.evaluate, workers=1)
+        # Delivered half a second after the bar closed
+        dispatcher.on_bar("EURUSD", time.time() - 0.5)
+        self.wait_idle(dispatcher, 1)
+        stats = dispatcher.get_stats()
+        dispatcher.stop()
+        self.assertGreaterEqual(stats['latency_ms']['max'], 500)
+
+    def test_tick_threshold_and_bounded_queue(self):
+        dispatcher = SignalDispatcher(self.evaluate, workers=1, max_pending=1, debounce=0, tick_threshold=0.001)
+        dispatcher.on_tick("EURUSD", time.time(), 1.0)
+        dispatcher.on_tick("EURUSD", time.time(), 1.0005)
+        self.assertEqual(dispatcher.stats['tick'], 0)
+        dispatcher.on_tick("EURUSD", time.time(), 1.002)
+        time.sleep(0.05)  # blocked in evaluate, queue empty again
+        dispatcher.on_bar("GBPUSD", time.time())
+        dispatcher.on_bar("USDJPY", time.time())
+        self.assertEqual(dispatcher.stats['dropped'], 1)
+        self.release.set()
+        self.wait_idle(dispatcher, 2)
+        dispatcher.stop()
+        self.assertEqual(self.calls, ["EURUSD", "GBPUSD"])
+
+if __name__ == '__main__':
+    unittest.main()
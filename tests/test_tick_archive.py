@@ -0,0 +1,77 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from data.historical.tick_archive import TickArchive, INDEX_STRIDE, NS_PER_DAY
+
+DAY0 = 1_700_000_000 * 10**9 - (1_700_000_000 * 10**9) % NS_PER_DAY
+
+class TestTickArchive(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.archive = TickArchive(self.root)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_range_read_matches_appended_ticks(self):
+        ts = DAY0 + np.arange(5 * INDEX_STRIDE) * 10**6
+        prices = np.linspace(1.0, 2.0, len(ts))
+        self.archive.append("EURUSD", ts[:3000], prices[:3000], np.zeros(3000))
+        self.archive.append("EURUSD", ts[3000:], prices[3000:], np.zeros(len(ts) - 3000))
+
+        records = self.archive.read_range("EURUSD", int(ts[1500]), int(ts[4000]))
+        np.testing.assert_array_equal(records['ts'], ts[1500:4000])
+        np.testing.assert_array_equal(records['price'], prices[1500:4000])
+        self.assertIsInstance(records.base, np.memmap)
+
+    def test_append_is_idempotent_and_split_by_day(self):
+        ts = np.array([DAY0 + 5, DAY0 + NS_PER_DAY + 5, DAY0 + 1])
+        self.assertEqual(self.archive.append("BTCUSD", ts, [1.0, 2.0, 3.0], [0, 0, 0]), 3)
+        self.assertEqual(self.archive.append("BTCUSD", ts, [1.0, 2.0, 3.0], [0, 0, 0]), 0)
+        self.assertEqual(len(self.archive.days("BTCUSD")), 2)
+        records = self.archive.read_range("BTCUSD", DAY0, DAY0 + 2 * NS_PER_DAY)
+        np.testing.assert_array_equal(records['price'], [3.0, 1.0, 2.0])
+
+    def test_readers_ignore_a_torn_write_and_the_writer_trims_it(self):
+        self.archive.append("EURUSD", [DAY0 + 1], [1.0], [0.0])
+        day = self.archive.days("EURUSD")[0]
+        path = os.path.join(self.root, "EURUSD", f"{day}.ticks")
+        with open(path, 'ab') as f:
+            f.write(b'\x00' * 7)
+        size = os.path.getsize(path)
+        self.assertEqual(len(self.archive.open_day("EURUSD", day)), 1)
+        # The partial record may be an append in progress; readers leave it alone
+        self.assertEqual(os.path.getsize(path), size)
+
+        self.archive.append("EURUSD", [DAY0 + 2], [2.0], [0.0])
+        np.testing.assert_array_equal(self.archive.open_day("EURUSD", day)['price'], [1.0, 2.0])
+
+    def test_index_out_of_step_with_data_is_rebuilt(self):
+        ts = DAY0 + np.arange(3 * INDEX_STRIDE) * 10**6
+        prices = np.arange(len(ts), dtype=np.float64)
+        split = INDEX_STRIDE + 10
+        self.archive.append("EURUSD", ts[:split], prices[:split], np.zeros(split))
+        day = self.archive.days("EURUSD")[0]
+        index_path = os.path.join(self.root, "EURUSD", f"{day}.idx")
+
+        # Crash after the data write but before the index write
+        os.remove(index_path)
+        self.archive.append("EURUSD", ts[split:], prices[split:], np.zeros(len(ts) - split))
+        np.testing.assert_array_equal(np.fromfile(index_path, dtype='<i8'), ts[::INDEX_STRIDE])
+
+        # A stale index from some other state of the file
+        with open(index_path, 'wb') as f:
+            f.write(ts[1:3].astype('<i8').tobytes() + b'\x00' * 3)
+        stale = open(index_path, 'rb').read()
+        records = self.archive.read_range("EURUSD", int(ts[2000]), int(ts[2100]))
+        np.testing.assert_array_equal(records['price'], prices[2000:2100])
+        # Readers rebuild in memory only; the writer repairs the file
+        self.assertEqual(open(index_path, 'rb').read(), stale)
+        self.archive.append("EURUSD", [int(ts[-1]) + 1], [0.0], [0.0])
+        np.testing.assert_array_equal(np.fromfile(index_path, dtype='<i8'),
+                                      np.append(ts[::INDEX_STRIDE], ts[-1] + 1))
+
+if __name__ == '__main__':
+    unittest.main()
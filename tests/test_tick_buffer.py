@@ -0,0 +1,47 @@
+import unittest
+import numpy as np
+from core.tick_buffer import TickRingBuffer, TickBufferSet, symbol_for
+
+class TestTickRingBuffer(unittest.TestCase):
+    def test_view_is_latest_ticks_in_order(self):
+        buffer = TickRingBuffer(capacity=8)
+        for i in range(21):
+            buffer.append(float(i), 100.0 + i, 1.0)
+        ts, prices, volumes = buffer.view(5)
+        np.testing.assert_array_equal(ts, [16, 17, 18, 19, 20])
+        np.testing.assert_array_equal(prices, [116, 117, 118, 119, 120])
+        self.assertEqual(len(buffer.view(100)[0]), 8)
+
+    def test_view_is_zero_copy(self):
+        buffer = TickRingBuffer(capacity=4)
+        for i in range(6):
+            buffer.append(float(i), float(i))
+        _, prices, _ = buffer.view(3)
+        self.assertTrue(np.shares_memory(prices, buffer.prices))
+
+    def test_view_survives_capacity_minus_n_appends(self):
+        buffer = TickRingBuffer(capacity=8)
+        for i in range(10):
+            buffer.append(float(i), float(i))
+        _, prices, _ = buffer.view(5)
+        for i in range(3):
+            buffer.append(0.0, -1.0)
+        np.testing.assert_array_equal(prices, [5, 6, 7, 8, 9])
+        buffer.append(0.0, -1.0)
+        self.assertEqual(prices[0], -1.0)
+
+    def test_last_and_empty(self):
+        buffer = TickRingBuffer(capacity=4)
+        self.assertIsNone(buffer.last())
+        self.assertEqual(len(buffer.view(3)[0]), 0)
+        buffer.append(1.0, 1.2345, 10.0)
+        self.assertEqual(buffer.last(), (1.0, 1.2345, 10.0))
+
+    def test_buffer_set_maps_instrument_symbols(self):
+        buffers = TickBufferSet(capacity=4)
+        buffers.append(symbol_for("EUR/USD-OTC"), 1.0, 1.1)
+        self.assertEqual(buffers.last("EURUSD")[1], 1.1)
+        self.assertIsNone(buffers.last("GBPUSD"))
+
+if __name__ == '__main__':
+    unittest.main()
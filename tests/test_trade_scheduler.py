@@ -0,0 +1,111 @@
+import time
+import asyncio
+import threading
+import unittest
+from core.trade_scheduler import TradeScheduler, AsyncTradeScheduler
+
+class TestTradeScheduler(unittest.TestCase):
+    def setUp(self):
+        self.settled = []
+        self.done = threading.Event()
+
+    def on_settle(self, trade, result, profit_factor):
+        self.settled.append((trade.trade_id, result, round(profit_factor, 4), time.monotonic() - trade.expiry))
+        self.done.set()
+
+    def wait_for(self, count, timeout=3):
+        deadline = time.time() + timeout
+        while len(self.settled) < count and time.time() < deadline:
+            time.sleep(0.01)
+
+    def test_settles_at_expiry_in_order(self):
+        scheduler = TradeScheduler(self.on_settle, settle_workers=1)
+        threads = threading.active_count()
+        for i in range(50):
+            scheduler.open(f"T{i}", "EURUSD", "BUY", 1.0, 0.2 + 0.002 * (49 - i), 10)
+        self.assertEqual(threading.active_count(), threads)
+        scheduler.on_price("EURUSD", None, 1.001)
+        self.wait_for(50)
+        scheduler.stop()
+        self.assertEqual(len(self.settled), 50)
+        self.assertEqual(self.settled[0][0], "T49")
+        self.assertTrue(all(result == "win" and pf == 0.001 for _, result, pf, _ in self.settled))
+        self.assertLess(max(lateness for *_, lateness in self.settled), 0.1)
+
+    def test_early_exit_on_price_update(self):
+        scheduler = TradeScheduler(self.on_settle)
+        scheduler.open("A", "EURUSD", "SELL", 1.0, 60, 0)
+        scheduler.open("B", "GBPUSD", "SELL", 1.0, 60, 0)
+        scheduler.on_price("EURUSD", None, 1.01)
+        self.wait_for(1)
+        self.assertEqual(self.settled[0][:3], ("A", "early_loss", -0.01))
+        self.assertEqual(scheduler.open_count(), 1)
+        scheduler.stop()
+
+    def test_polls_instruments_without_ticks(self):
+        calls = []
+
+        def price_source(trade):
+            calls.append(trade.symbol)
+            return 0.99
+
+        scheduler = TradeScheduler(self.on_settle, price_source=price_source, poll_interval=0.05)
+        scheduler.open("A", "EURUSD", "BUY", 1.0, 0.3, 0.1)
+        scheduler.open("B", "EURUSD", "BUY", 1.0, 0.3, 0.1)
+        self.wait_for(2)
+        scheduler.stop()
+        self.assertEqual({result for _, result, _, _ in self.settled}, {"early_loss"})
+        # One poll per instrument per interval, not per trade
+        self.assertLessEqual(len(calls), 4)
+
+    def test_slow_polls_never_delay_expiry(self):
+        release = threading.Event()
+        calls = []
+
+        def price_source(trade):
+            calls.append(trade.symbol)
+            if trade.symbol == "SLOW":
+                release.wait(2)
+            return 1.0
+
+        scheduler = TradeScheduler(self.on_settle, price_source=price_source, poll_interval=0.02)
+        scheduler.open("A", "SLOW", "BUY", 1.0, 60, 60)
+        time.sleep(0.05)  # the poll for SLOW is now stuck
+        scheduler.open("B", "EURUSD", "BUY", 1.0, 0.1, 60)
+        self.wait_for(1)
+        self.assertEqual(self.settled[0][0], "B")
+        self.assertLess(self.settled[0][3], 0.1)
+        # A stuck poll is not resubmitted
+        self.assertEqual(calls.count("SLOW"), 1)
+        release.set()
+        scheduler.stop()
+
+    def test_async_scheduler_expiry_polls_and_early_exit(self):
+        polls = []
+
+        async def price_source(trade):
+            polls.append(trade.symbol)
+            return 0.99
+
+        async def scenario():
+            threads = threading.active_count()
+            scheduler = AsyncTradeScheduler(self.on_settle, price_source=price_source, poll_interval=0.05)
+            scheduler.open("A", "EURUSD", "BUY", 1.0, 0.1, 10)
+            scheduler.open("B", "GBPUSD", "SELL", 1.0, 60, 0)
+            # Opened from another thread, like a dispatcher worker would
+            opener = threading.Thread(target=scheduler.open, args=("C", "USDJPY", "BUY", 1.0, 60, 0.05))
+            opener.start()
+            opener.join()
+            self.assertEqual(threading.active_count(), threads)
+            scheduler.on_price("GBPUSD", None, 1.01)
+            while len(self.settled) < 3:
+                await asyncio.sleep(0.01)
+            scheduler.stop()
+
+        asyncio.run(asyncio.wait_for(scenario(), 3))
+        results = {trade_id: result for trade_id, result, _, _ in self.settled}
+        self.assertEqual(results, {"A": "loss", "B": "early_loss", "C": "early_loss"})
+        self.assertIn("USDJPY", polls)
+
+if __name__ == '__main__':
+    unittest.main()
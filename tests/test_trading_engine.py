@@ -0,0 +1,169 @@
+import threading
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+
+from config import settings
+from core import trading_engine
+from core.scan_scheduler import ScanScheduler
+from core.trading_engine import TradingEngine
+
+def instrument(symbol):
+    return {'id': f"{symbol}-OTC", 'symbol': symbol, 'payout': 0.9}
+
+class TestTradeSlots(unittest.TestCase):
+    def setUp(self):
+        self.release = threading.Event()
+        self.executed = []
+        self.evaluated = []
+        engine = TradingEngine.__new__(TradingEngine)
+        engine.active_trades = {}
+        engine.pending_trades = set()
+        engine._trade_slots = threading.Lock()
+        engine.trading_active = True
+        engine.risk_manager = SimpleNamespace(max_concurrent_trades=2)
+        engine.trade_scheduler = SimpleNamespace(by_symbol={})
+        engine.trade_executor = ThreadPoolExecutor(max_workers=8)
+        engine.instruments_by_symbol = {s: instrument(s) for s in ('EURUSD', 'GBPUSD', 'USDJPY', 'AUDUSD')}
+        engine.generate_signals = self.generate_signals
+        engine.execute_trade = self.execute_trade
+        self.engine = engine
+        self.addCleanup(engine.trade_executor.shutdown)
+        self.addCleanup(self.release.set)
+
+    def generate_signals(self, instruments):
+        self.evaluated.extend(inst['symbol'] for inst in instruments)
+        return [(inst, 'CALL', None, 0.9, [0.0]) for inst in instruments]
+
+    def execute_trade(self, instrument, signal, confidence, features=None):
+        self.executed.append(instrument['symbol'])
+        self.release.wait(5)
+
+    def test_concurrent_workers_respect_max_concurrent_trades(self):
+        barrier = threading.Barrier(4)
+
+        def worker(symbol):
+            barrier.wait()
+            self.engine.evaluate_symbol(symbol)
+
+        threads = [threading.Thread(target=worker, args=(s,)) for s in self.engine.instruments_by_symbol]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(2)
+        self.assertEqual(len(self.engine.pending_trades), 2)
+
+        self.release.set()
+        self.engine.trade_executor.shutdown(wait=True)
+        self.assertEqual(len(self.executed), 2)
+        self.assertEqual(self.engine.pending_trades, set())
+
+    def test_symbols_with_open_or_in_flight_trades_are_skipped(self):
+        self.engine.trade_scheduler.by_symbol['EURUSD'] = {'T1'}
+        self.engine.evaluate_symbol('EURUSD')
+        self.assertEqual(self.evaluated, [])
+
+        self.engine.evaluate_symbol('GBPUSD')
+        self.engine.evaluate_symbol('GBPUSD')
+        self.assertEqual(self.evaluated, ['GBPUSD'])
+        self.assertFalse(self.engine.start_trade(instrument('GBPUSD'), 'CALL', 0.9))
+
+class TestScanMarksScanned(unittest.TestCase):
+    def test_instruments_left_over_at_max_concurrent_trades_stay_due(self):
+        now = [0.0]
+        engine = TradingEngine.__new__(TradingEngine)
+        engine.active_trades = {}
+        engine.pending_trades = set()
+        engine.trading_active = True
+        engine.risk_manager = SimpleNamespace(max_concurrent_trades=1)
+        engine.scan_scheduler = ScanScheduler(payout_threshold=0.8, clock=lambda: now[0])
+        universe = [instrument(s) for s in ('EURUSD', 'GBPUSD', 'USDJPY', 'AUDUSD')]
+
+        def generate_signals(instruments, evaluated):
+            # AUDUSD missed the scan deadline, USDJPY had no data
+            evaluated.extend(inst['id'] for inst in instruments if inst['symbol'] != 'AUDUSD')
+            return [(inst, 'CALL', None, 0.9, [0.0]) for inst in instruments
+                    if inst['symbol'] in ('EURUSD', 'GBPUSD')]
+
+        def start_trade(instrument, signal, confidence, features=None):
+            engine.active_trades[instrument['id']] = {}
+
+        engine.generate_signals = generate_signals
+        engine.start_trade = start_trade
+        with patch.object(trading_engine.time, 'sleep'):
+            engine.scan(engine.scan_scheduler.due(universe, lambda inst: None, lambda _: None))
+        now[0] = 1.0
+        due = engine.scan_scheduler.due(universe, lambda inst: None, lambda _: None)
+        self.assertEqual(sorted(inst['symbol'] for inst in due), ['AUDUSD', 'GBPUSD'])
+
+    def test_nothing_is_due_while_all_trade_slots_are_taken(self):
+        engine = TradingEngine.__new__(TradingEngine)
+        engine.active_trades = {'T1': {}}
+        engine.pending_trades = set()
+        engine.risk_manager = SimpleNamespace(max_concurrent_trades=1)
+        engine.scan_scheduler = ScanScheduler(payout_threshold=0.8, clock=lambda: 0.0)
+        engine.drift = SimpleNamespace(live_accuracy=lambda instrument_id: None)
+        engine.instrument_volatility = lambda inst: None
+        universe = [instrument(s) for s in ('EURUSD', 'GBPUSD')]
+        self.assertEqual(engine.due_instruments(universe), [])
+
+        engine.active_trades.clear()
+        self.assertEqual(len(engine.due_instruments(universe)), 2)
+
+class TestRunEvents(unittest.TestCase):
+    def test_an_error_is_logged_and_the_loop_keeps_refreshing(self):
+        calls = []
+
+        def get_instruments():
+            calls.append(1)
+            if len(calls) == 1:
+                raise ConnectionError("reset")
+            raise KeyboardInterrupt  # stops the loop on the second pass
+
+        engine = TradingEngine.__new__(TradingEngine)
+        engine.api = SimpleNamespace(get_instruments=get_instruments)
+        with patch.object(trading_engine.time, 'sleep') as sleep, \
+                self.assertLogs(trading_engine.logger, 'ERROR') as logs:
+            with self.assertRaises(KeyboardInterrupt):
+                engine.run_events()
+        self.assertEqual(len(calls), 2)
+        sleep.assert_called_once()
+        self.assertIn("reset", logs.output[0])
+
+class TestTrainingData(unittest.TestCase):
+    def test_history_download_is_capped_at_the_cache_size(self):
+        stored = pd.DataFrame({'x': range(10)}), pd.Series(range(10))
+        requested = []
+        engine = TradingEngine.__new__(TradingEngine)
+        engine.feature_store = SimpleNamespace(dataset=lambda symbol, limit: stored)
+        engine.api = SimpleNamespace(get_history=lambda instrument_id, limit: requested.append(limit) or [])
+        with patch.dict(settings.SETTINGS, HISTORY_CACHE_BARS=1000):
+            X, y = engine.training_data('EURUSD-OTC', 5000)
+        self.assertEqual(requested, [1000])
+        self.assertIs(X, stored[0])
+
+class TestSettleTrade(unittest.TestCase):
+    def test_online_learning_uses_entry_time_features_and_realised_direction(self):
+        submitted = []
+        engine = TradingEngine.__new__(TradingEngine)
+        engine.active_trades = {'T1': {}}
+        engine.risk_manager = SimpleNamespace(update_trade_result=lambda *args: None, capital=100.0)
+        engine.ai_models = {'EURUSD-OTC': 'model'}
+        engine.online_learner = SimpleNamespace(submit=lambda model, x, y: submitted.append((model, x, y)))
+        engine.feature_store = SimpleNamespace(latest=lambda symbol: ['settlement-time row'])
+        engine.telegram_bot = SimpleNamespace(send_trade_result=lambda *args: None)
+        entry_row = ['entry-time row']
+        trade = SimpleNamespace(trade_id='T1', direction='SELL',
+                                context={'instrument_id': 'EURUSD-OTC', 'symbol': 'EURUSD',
+                                         'size': 1.0, 'payout': 0.9, 'features': entry_row})
+
+        engine.settle_trade(trade, 'win', 1.0)
+
+        # A winning SELL means the price went down
+        self.assertEqual(submitted, [('model', entry_row, 0)])
+        self.assertEqual(engine.active_trades, {})
+
+if __name__ == '__main__':
+    unittest.main()
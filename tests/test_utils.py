@@ -0,0 +1,35 @@
+import unittest
+from unittest.mock import MagicMock, patch
+from config import settings
+from core import utils
+from core.utils import get_market_sentiment, headline_score
+
+def news(*titles):
+    response = MagicMock()
+    response.json.return_value = {'articles': [{'title': title, 'description': None} for title in titles]}
+    return response
+
+class TestMarketSentiment(unittest.TestCase):
+    def test_headline_score(self):
+        self.assertEqual(headline_score("Euro rallies as ECB turns hawkish"), 1)
+        self.assertEqual(headline_score("Yen slides to a seven-month low"), -1)
+        self.assertEqual(headline_score("Dollar gains, then falls back"), 0)
+
+    def test_net_headline_balance_decides(self):
+        with patch.dict(settings.API_KEYS, NEWS_API='key'):
+            with patch.object(utils.requests, 'get', return_value=news(
+                    "Euro rallies", "Euro climbs higher", "Euro steady", "Euro slips")) as get:
+                self.assertEqual(get_market_sentiment('EUR'), 'bullish')
+            self.assertEqual(get.call_args.kwargs['params']['q'], 'EUR')
+            with patch.object(utils.requests, 'get', return_value=news("Euro rallies", "Euro drops")):
+                self.assertEqual(get_market_sentiment('EUR'), 'neutral')
+            with patch.object(utils.requests, 'get', return_value=news("Pound slumps", "Pound weakens")):
+                self.assertEqual(get_market_sentiment('GBP'), 'bearish')
+
+    def test_no_api_key_is_neutral_without_a_request(self):
+        with patch.dict(settings.API_KEYS, NEWS_API=''), patch.object(utils.requests, 'get') as get:
+            self.assertEqual(get_market_sentiment('EUR'), 'neutral')
+        get.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
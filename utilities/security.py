@@ -7,7 +7,7 @@ from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from cryptography.hazmat.backends import default_backend
 import binascii
 
-logger = logging.getLogger(_name_)
+logger = logging.getLogger(__name__)
 
 class SecurityManager:
     def _init_(self):